@@ -0,0 +1,527 @@
+"""
+Schreibt die Auswertung (Excel in-place, eigene Arbeitsmappe, CSV oder JSON-Lines)
+
+Stile werden einmal als Modulkonstanten angelegt und von allen Zeilen
+geteilt; in Write-only-Arbeitsmappen sind sogar die Schwellen-Zellen
+(JA/NEIN) vorgefertigt, sodass je Zeile nur eine Werteliste angehängt wird.
+
+In eine vorhandene Plan-Datei wird die Auswertung ohne openpyxl
+geschrieben: patch_auswertung ersetzt nur die Blätter Auswertung und Checks
+im ZIP-Archiv (xlsx_patch.py), alle anderen Teile bleiben Byte für Byte
+erhalten.
+
+AuswertungWriter führt das Speichern optional in einem Hintergrund-Thread
+aus. Im Batch-Modus überlappt so das Speichern (XML-Serialisierung und
+ZIP-Kompression) einer Datei mit dem Einlesen und Berechnen der nächsten.
+
+openpyxl wird erst beim ersten Schreiben einer Arbeitsmappe importiert;
+CSV-/JSON-Ausgabe und reine Berechnungen kommen ohne openpyxl aus.
+"""
+
+from collections import defaultdict
+from itertools import zip_longest
+from pathlib import Path
+import csv
+import functools
+import json
+
+from records import ERGEBNIS_FELDER
+
+
+# Spaltenköpfe der Auswertung (Layout der einfachen Vorlage)
+AUSWERTUNG_HEADERS = [
+    "Mitarbeiter",
+    "WT_Dienste",
+    "WE_Dienste_Freitag",
+    "WE_Dienste_Andere",
+    "WE_Gesamt",
+    "Schwelle_erreicht",
+    "Abzug_Freitag",
+    "Abzug_Andere",
+    "WE_bezahlt",
+    "Auszahlung_WT",
+    "Auszahlung_WE",
+    "Auszahlung_Gesamt"
+]
+
+SCHWELLE_SPALTE = 6  # F
+
+# Farben für Schwelle (grün = JA, rot = NEIN) und Checks-Status (OK/FEHLER)
+FARBEN = {'JA': "C6EFCE", 'NEIN': "FFC7CE", 'OK': "C6EFCE", 'FEHLER': "FFC7CE"}
+
+# Jahresübersicht: je Mitarbeiter und Jahr die Auszahlung je Monat plus Jahressummen
+JAHRESUEBERSICHT_SHEET = "Jahresübersicht"
+MONATSNAMEN = ["Jan", "Feb", "Mär", "Apr", "Mai", "Jun", "Jul", "Aug", "Sep", "Okt", "Nov", "Dez"]
+JAHRESUEBERSICHT_HEADERS = [
+    "Mitarbeiter",
+    "Jahr",
+    *MONATSNAMEN,
+    "WT_Einheiten",
+    "WE_Einheiten",
+    "WE_bezahlt",
+    "Monate_Schwelle",
+    "Auszahlung_Gesamt"
+]
+MONAT_SPALTE = 3  # C = Januar
+
+# Checks: Summe der Anteile je Datum (Layout wie in build_template, A–C)
+# und rechts daneben die Fehlerliste der Plan-Prüfung (E–H)
+CHECKS_HEADERS = ["Datum", "Summe_Anteile", "Status"]
+FEHLER_HEADERS = ["Zeile", "Datum", "Mitarbeiter", "Fehler"]
+FEHLER_SPALTE = 5  # E
+DATUM_FORMAT = "DD.MM.YYYY"
+
+OUTPUT_FORMATS = ("xlsx", "csv", "jsonl")
+CSV_DELIMITER = ";"  # deutsches Excel erwartet Semikolon und Dezimalkomma
+
+
+@functools.lru_cache(maxsize=None)
+def _fills():
+    """Ein PatternFill je Wert aus FARBEN, einmal für alle Zeilen und Dateien."""
+    from openpyxl.styles import PatternFill
+
+    return {wert: PatternFill(start_color=farbe, end_color=farbe, fill_type="solid") for wert, farbe in FARBEN.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def _header_font():
+    from openpyxl.styles import Font
+
+    return Font(bold=True)
+
+
+def auswertung_row(result):
+    """Wandelt ein Ergebnis in die zwölf Werte einer Auswertungszeile um."""
+    return [
+        result['mitarbeiter'],
+        round(result['wt_einheiten'], 2),
+        round(result['we_freitag'], 2),
+        round(result['we_andere'], 2),
+        round(result['we_gesamt'], 2),
+        result['schwelle_erreicht'],
+        round(result['abzug_freitag'], 2),
+        round(result['abzug_andere'], 2),
+        round(result['we_bezahlt'], 2),
+        round(result['auszahlung_wt'], 2),
+        round(result['auszahlung_we'], 2),
+        round(result['auszahlung_gesamt'], 2),
+    ]
+
+
+def _write_row(ws, row_idx, result):
+    cell = ws.cell
+    for col_idx, value in enumerate(auswertung_row(result), start=1):
+        cell(row=row_idx, column=col_idx, value=value)
+    cell(row=row_idx, column=SCHWELLE_SPALTE).fill = _fills()[result['schwelle_erreicht']]
+
+
+def write_auswertung(wb, results):
+    """Schreibt die Ergebnisse in das Auswertung-Blatt einer geladenen Arbeitsmappe."""
+    auswertung_ws = wb["Auswertung"]
+
+    # Lösche alte Daten (ab Zeile 2)
+    auswertung_ws.delete_rows(2, auswertung_ws.max_row)
+
+    for row_idx, result in enumerate(results, start=2):
+        _write_row(auswertung_ws, row_idx, result)
+
+
+def update_auswertung_rows(wb, results, mitarbeiter):
+    """
+    Ersetzt nur die Zeilen der angegebenen Mitarbeiter im Auswertung-Blatt.
+
+    Voraussetzung: Die Zeilenreihenfolge entspricht results (gleiche
+    Mitarbeiter wie beim letzten vollständigen Schreiben).
+    """
+    auswertung_ws = wb["Auswertung"]
+
+    for row_idx, result in enumerate(results, start=2):
+        if result['mitarbeiter'] in mitarbeiter:
+            _write_row(auswertung_ws, row_idx, result)
+
+
+def jahresuebersicht_rows(monats_results):
+    """
+    Zeilen der Jahresübersicht aus Monatsergebnissen (calculate_verguetung_monate).
+
+    Je Jahr eine Zeile pro Mitarbeiter (Auszahlung je Monat, Jahressummen)
+    und eine Summenzeile. Liefert (werte, schwellen) je Zeile; schwellen
+    enthält je Monat 'JA', 'NEIN' oder None (keine Dienste).
+    """
+    jahre = defaultdict(dict)
+    for result in monats_results:
+        zeile = jahre[result['jahr']].get(result['mitarbeiter'])
+        if zeile is None:
+            zeile = jahre[result['jahr']][result['mitarbeiter']] = {
+                'monate': [None] * 12, 'schwellen': [None] * 12,
+                'wt': 0.0, 'we': 0.0, 'we_bezahlt': 0.0, 'monate_schwelle': 0, 'gesamt': 0.0,
+            }
+        index = result['monat'] - 1
+        zeile['monate'][index] = result['auszahlung_gesamt']
+        zeile['schwellen'][index] = result['schwelle_erreicht']
+        zeile['wt'] += result['wt_einheiten']
+        zeile['we'] += result['we_gesamt']
+        zeile['we_bezahlt'] += result['we_bezahlt']
+        zeile['monate_schwelle'] += result['schwelle_erreicht'] == 'JA'
+        zeile['gesamt'] += result['auszahlung_gesamt']
+
+    rows = []
+    for jahr in sorted(jahre):
+        summe_monate = [0.0] * 12
+        summe = {'wt': 0.0, 'we': 0.0, 'we_bezahlt': 0.0, 'monate_schwelle': 0, 'gesamt': 0.0}
+
+        for mitarbeiter, zeile in sorted(jahre[jahr].items()):
+            for index, betrag in enumerate(zeile['monate']):
+                if betrag is not None:
+                    summe_monate[index] += betrag
+            for feld in summe:
+                summe[feld] += zeile[feld]
+            rows.append(([
+                mitarbeiter,
+                jahr,
+                *(round(betrag, 2) if betrag is not None else None for betrag in zeile['monate']),
+                round(zeile['wt'], 2),
+                round(zeile['we'], 2),
+                round(zeile['we_bezahlt'], 2),
+                zeile['monate_schwelle'],
+                round(zeile['gesamt'], 2),
+            ], zeile['schwellen']))
+
+        rows.append(([
+            "Summe",
+            jahr,
+            *(round(betrag, 2) for betrag in summe_monate),
+            round(summe['wt'], 2),
+            round(summe['we'], 2),
+            round(summe['we_bezahlt'], 2),
+            summe['monate_schwelle'],
+            round(summe['gesamt'], 2),
+        ], [None] * 12))
+
+    return rows
+
+
+def _jahresuebersicht_cells(ws, werte, schwellen):
+    """Zeile als Werteliste; Monatszellen mit Diensten bekommen die Schwellen-Farbe."""
+    from openpyxl.cell import WriteOnlyCell
+
+    row = list(werte)
+    for index, schwelle in enumerate(schwellen):
+        if schwelle is not None:
+            cell = WriteOnlyCell(ws, value=row[MONAT_SPALTE - 1 + index])
+            cell.fill = _fills()[schwelle]
+            row[MONAT_SPALTE - 1 + index] = cell
+    return row
+
+
+def _append_jahresuebersicht(ws, monats_results):
+    from openpyxl.cell import WriteOnlyCell
+
+    header = []
+    for titel in JAHRESUEBERSICHT_HEADERS:
+        cell = WriteOnlyCell(ws, value=titel)
+        cell.font = _header_font()
+        header.append(cell)
+    ws.append(header)
+
+    for werte, schwellen in jahresuebersicht_rows(monats_results):
+        ws.append(_jahresuebersicht_cells(ws, werte, schwellen))
+
+
+def write_jahresuebersicht(wb, monats_results):
+    """Schreibt das Blatt Jahresübersicht in eine geladene Arbeitsmappe (ersetzt ein vorhandenes)."""
+    if JAHRESUEBERSICHT_SHEET in wb.sheetnames:
+        del wb[JAHRESUEBERSICHT_SHEET]
+    ws = wb.create_sheet(JAHRESUEBERSICHT_SHEET)
+    _append_jahresuebersicht(ws, monats_results)
+    ws.freeze_panes = "C2"
+
+
+def write_checks(wb, checks, fehler=()):
+    """
+    Schreibt Ampel (validation.check_anteile) und Fehlerliste in das Blatt Checks.
+
+    fehler sind (zeile, datum, mitarbeiter, text)-Tupel (PlanValidator).
+    Vorhandene Zeilen (z. B. die Formelzeilen der Vorlage) werden durch
+    Werte ersetzt; fehlt das Blatt, wird es angelegt.
+    """
+    if "Checks" in wb.sheetnames:
+        ws = wb["Checks"]
+        ws.delete_rows(2, ws.max_row)
+    else:
+        ws = wb.create_sheet("Checks")
+        for col_idx, titel in enumerate(CHECKS_HEADERS, start=1):
+            ws.cell(row=1, column=col_idx, value=titel).font = _header_font()
+
+    cell = ws.cell
+    for col_idx, titel in enumerate(FEHLER_HEADERS, start=FEHLER_SPALTE):
+        cell(row=1, column=col_idx, value=titel).font = _header_font()
+
+    for row_idx, (datum, summe, status) in enumerate(checks, start=2):
+        cell(row=row_idx, column=1, value=datum).number_format = DATUM_FORMAT
+        cell(row=row_idx, column=2, value=round(summe, 4))
+        cell(row=row_idx, column=3, value=status).fill = _fills()[status]
+
+    for row_idx, (zeile, datum, mitarbeiter, text) in enumerate(fehler, start=2):
+        cell(row=row_idx, column=FEHLER_SPALTE, value=zeile)
+        cell(row=row_idx, column=FEHLER_SPALTE + 1, value=datum).number_format = DATUM_FORMAT
+        cell(row=row_idx, column=FEHLER_SPALTE + 2, value=mitarbeiter)
+        cell(row=row_idx, column=FEHLER_SPALTE + 3, value=text)
+
+
+def _append_checks(ws, checks, fehler=()):
+    from openpyxl.cell import WriteOnlyCell
+
+    header = []
+    for titel in [*CHECKS_HEADERS, None, *FEHLER_HEADERS]:
+        cell = WriteOnlyCell(ws, value=titel)
+        cell.font = _header_font()
+        header.append(cell)
+    ws.append(header)
+
+    status_cells = {}
+    for status in ('OK', 'FEHLER'):
+        status_cells[status] = WriteOnlyCell(ws, value=status)
+        status_cells[status].fill = _fills()[status]
+
+    def datum_cell(datum):
+        cell = WriteOnlyCell(ws, value=datum)
+        cell.number_format = DATUM_FORMAT
+        return cell
+
+    # Ampel (A–C) und Fehlerliste (E–H) teilen sich die Zeilen
+    for check, eintrag in zip_longest(checks, fehler):
+        row = [None] * (FEHLER_SPALTE - 1)
+        if check is not None:
+            datum, summe, status = check
+            row[:3] = [datum_cell(datum), round(summe, 4), status_cells[status]]
+        if eintrag is not None:
+            zeile, datum, mitarbeiter, text = eintrag
+            row += [zeile, datum_cell(datum), mitarbeiter, text]
+        ws.append(row)
+
+
+def write_auswertung_workbook(output_path, results, monats_results=None, checks=None, fehler=()):
+    """
+    Schreibt die Auswertung als eigene Arbeitsmappe (write-only, ohne Eingabedatei).
+
+    Mit monats_results kommt das Blatt Jahresübersicht hinzu, mit checks
+    das Blatt Checks (Ampel und Fehlerliste fehler).
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Auswertung")
+    ws.append(AUSWERTUNG_HEADERS)
+
+    # Write-only-Zeilen werden beim Anhängen serialisiert; die beiden
+    # gestylten Schwellen-Zellen können daher für alle Zeilen dienen.
+    schwelle_cells = {}
+    for wert in ('JA', 'NEIN'):
+        schwelle_cells[wert] = WriteOnlyCell(ws, value=wert)
+        schwelle_cells[wert].fill = _fills()[wert]
+
+    for result in results:
+        row = auswertung_row(result)
+        row[SCHWELLE_SPALTE - 1] = schwelle_cells[result['schwelle_erreicht']]
+        ws.append(row)
+
+    if monats_results is not None:
+        jahres_ws = wb.create_sheet(JAHRESUEBERSICHT_SHEET)
+        jahres_ws.freeze_panes = "C2"
+        _append_jahresuebersicht(jahres_ws, monats_results)
+
+    if checks is not None:
+        _append_checks(wb.create_sheet("Checks"), checks, fehler)
+
+    wb.save(output_path)
+
+
+def patch_auswertung(filepath, results, checks=(), fehler=(), checks_schreiben=False, geaendert=None):
+    """
+    Bereitet das direkte Ersetzen von Auswertung (und Checks) in einer .xlsx-Datei vor.
+
+    Gleicher Inhalt wie write_auswertung und write_checks, aber ohne die
+    Arbeitsmappe zu laden (siehe xlsx_patch.py). Mit geaendert werden wie
+    in update_auswertung_rows nur die Zeilen dieser Mitarbeiter gesetzt
+    (XlsxPatch.set_cells), alle anderen Zeilen bleiben unverändert. Checks
+    wird geschrieben, wenn checks_schreiben gesetzt ist oder das Blatt
+    existiert. Gibt einen XlsxPatch zurück, der mit save() gespeichert
+    wird. KeyError, wenn das Blatt Auswertung fehlt; NichtPatchbar, wenn ein
+    Blatt angelegt werden müsste oder das Archiv nicht unterstützt wird.
+    """
+    from xlsx_patch import NichtPatchbar, XlsxPatch, Zelle
+
+    patch = XlsxPatch(filepath)
+    if "Auswertung" not in patch.sheetnames:
+        raise KeyError("Auswertung")
+
+    schwelle = {wert: patch.style(fuellung=FARBEN[wert]) for wert in ('JA', 'NEIN')}
+    rows = []
+    for result in results:
+        row = auswertung_row(result)
+        row[SCHWELLE_SPALTE - 1] = Zelle(result['schwelle_erreicht'], schwelle[result['schwelle_erreicht']])
+        rows.append(row)
+
+    if geaendert is None:
+        patch.replace_rows("Auswertung", rows)
+    else:
+        # Spalten A–L; die Zeilenreihenfolge entspricht results
+        patch.set_cells("Auswertung", {
+            f"{chr(64 + col_idx)}{row_idx}": wert
+            for row_idx, (result, row) in enumerate(zip(results, rows), start=2)
+            if result['mitarbeiter'] in geaendert
+            for col_idx, wert in enumerate(row, start=1)
+        })
+
+    if not checks_schreiben and "Checks" not in patch.sheetnames:
+        return patch
+    if "Checks" not in patch.sheetnames:
+        raise NichtPatchbar("Blatt 'Checks' fehlt")
+
+    status = {wert: patch.style(fuellung=FARBEN[wert]) for wert in ('OK', 'FEHLER')}
+    datum_stil = patch.style(zahlenformat=DATUM_FORMAT)
+    fett = patch.style(fett=True)
+
+    # Ampel (A–C) und Fehlerliste (E–H) teilen sich die Zeilen wie in write_checks
+    rows = []
+    for check, eintrag in zip_longest(checks, fehler):
+        row = [None] * (FEHLER_SPALTE - 1)
+        if check is not None:
+            datum, summe, wert = check
+            row[:3] = [Zelle(datum, datum_stil), round(summe, 4), Zelle(wert, status[wert])]
+        if eintrag is not None:
+            zeile, datum, mitarbeiter, text = eintrag
+            row += [zeile, Zelle(datum, datum_stil), mitarbeiter, text]
+        rows.append(row)
+    patch.replace_rows(
+        "Checks", rows, kopf=[Zelle(titel, fett) for titel in FEHLER_HEADERS], kopf_spalte=FEHLER_SPALTE,
+    )
+    return patch
+
+
+def _csv_value(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"{value:.2f}".replace(".", ",")
+    return value
+
+
+def write_auswertung_csv(output_path, results):
+    """Schreibt die Auswertung als CSV (Semikolon, Dezimalkomma, UTF-8 mit BOM für Excel)."""
+    with open(output_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f, delimiter=CSV_DELIMITER)
+        writer.writerow(AUSWERTUNG_HEADERS)
+        writer.writerows([_csv_value(value) for value in auswertung_row(result)] for result in results)
+
+
+def write_auswertung_jsonl(output_path, results):
+    """
+    Schreibt die Auswertung als JSON-Lines: ein Objekt je Mitarbeiter mit
+    den Schlüsseln aus ERGEBNIS_FELDER, Zahlen gerundet wie in der Auswertung.
+    """
+    with open(output_path, "w", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(dict(zip(ERGEBNIS_FELDER, auswertung_row(result))), ensure_ascii=False))
+            f.write("\n")
+
+
+def write_jahresuebersicht_csv(output_path, monats_results):
+    """Schreibt die Jahresübersicht als CSV (Format wie write_auswertung_csv, Monate ohne Dienst leer)."""
+    with open(output_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f, delimiter=CSV_DELIMITER)
+        writer.writerow(JAHRESUEBERSICHT_HEADERS)
+        for werte, _ in jahresuebersicht_rows(monats_results):
+            *betraege, monate_schwelle, gesamt = werte[MONAT_SPALTE - 1:]
+            writer.writerow([
+                *werte[:MONAT_SPALTE - 1],
+                *(_csv_value(wert) if wert is not None else "" for wert in betraege),
+                monate_schwelle,
+                _csv_value(gesamt),
+            ])
+
+
+def write_jahresuebersicht_file(output_path, monats_results):
+    """Schreibt nur die Jahresübersicht in eine neue Datei (.csv, sonst .xlsx)."""
+    if Path(output_path).suffix.lower() == ".csv":
+        write_jahresuebersicht_csv(output_path, monats_results)
+        return
+
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(JAHRESUEBERSICHT_SHEET)
+    ws.freeze_panes = "C2"
+    _append_jahresuebersicht(ws, monats_results)
+    wb.save(output_path)
+
+
+def write_auswertung_file(output_path, results, monats_results=None, checks=None, fehler=()):
+    """
+    Schreibt die Auswertung in eine neue Datei; das Format folgt der Endung (.csv, .jsonl, sonst .xlsx).
+
+    monats_results und checks ergänzen in .xlsx-Dateien die Blätter
+    Jahresübersicht und Checks; CSV und JSON-Lines enthalten nur die Auswertung.
+    """
+    suffix = Path(output_path).suffix.lower()
+    if suffix == ".csv":
+        write_auswertung_csv(output_path, results)
+    elif suffix == ".jsonl":
+        write_auswertung_jsonl(output_path, results)
+    else:
+        write_auswertung_workbook(output_path, results, monats_results, checks, fehler)
+
+
+class AuswertungWriter:
+    """
+    Führt Schreib-/Speichervorgänge aus und liefert je Vorgang ein Future.
+
+    Mit background=False wird sofort geschrieben (das Future ist bereits
+    erledigt, Fehler kommen über future.result()). Mit background=True
+    übernimmt ein einzelner Hintergrund-Thread das Speichern in
+    Auftragsreihenfolge; close() wartet auf alle offenen Vorgänge.
+    """
+
+    def __init__(self, background=False):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.background = background
+        self._executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="auswertung") if background else None
+        )
+
+    def _run(self, func, *args):
+        if self._executor is not None:
+            return self._executor.submit(func, *args)
+
+        from concurrent.futures import Future
+
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def write_file(self, output_path, results, monats_results=None, checks=None, fehler=()):
+        """Auswertung als neue Datei (.xlsx oder .csv)."""
+        return self._run(write_auswertung_file, output_path, results, monats_results, checks, fehler)
+
+    def save_workbook(self, wb, path):
+        """Speichert eine bereits befüllte Arbeitsmappe (wird danach nicht mehr verändert)."""
+        return self._run(wb.save, path)
+
+    def save_patch(self, patch, path):
+        """Schreibt einen vorbereiteten XlsxPatch (patch_auswertung) nach path."""
+        return self._run(patch.save, path)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,214 @@
+"""
+Benchmark und Paritätsprüfung: Python-, NumPy- und Festkomma-Engine
+
+Erzeugt synthetische Pläne (ein Plan je Standort über ein Jahr, 1–3
+Mitarbeiter je Tag, gelegentlich ein Springer), prüft, dass Python- und
+NumPy-Engine identische Ergebnisse liefern – auch je Monat mit
+eingetragenen Anteilen an Split-Tagen – und die Festkomma-Engine auf den
+Cent mit der Python-Engine übereinstimmt, und misst die Laufzeit von
+calculate_verguetung je Engine über alle Pläne. numpy/plan rechnet auf
+PlanEntries (Spalten wie von read_plan_data geliefert) statt auf Tupeln.
+
+Vor der Messung wird geprüft, dass die Daten die Regeln tatsächlich
+abdecken (Schwelle erreicht und nicht erreicht, Abzug auf Freitag und
+andere WE-Tage verteilt) und alle Tage im 1/840-Raster der
+Festkomma-Engine liegen. Fehlt etwas davon oder ist die Festkomma-Engine
+langsamer als die Python-Engine (Median der Laufzeitverhältnisse je
+Runde), endet das Skript mit Exit-Code 1.
+
+Verwendung:
+    python src/bench_engine.py [--eintraege 200000] [--mitarbeiter 300] [--wiederholungen 10]
+"""
+
+from collections import Counter
+from datetime import date, timedelta
+import random
+import statistics
+import sys
+import time
+
+from calculate import calculate_verguetung, calculate_verguetung_monate
+from calculate_exact import EINHEIT, calculate_verguetung_exact
+from calculate_numpy import calculate_verguetung_monate_numpy, calculate_verguetung_numpy
+from records import PlanEntries
+
+
+NRW_FEIERTAGE_2025 = {
+    date(2025, 1, 1), date(2025, 4, 18), date(2025, 4, 21), date(2025, 5, 1),
+    date(2025, 5, 29), date(2025, 6, 9), date(2025, 6, 19), date(2025, 10, 3),
+    date(2025, 11, 1), date(2025, 12, 25), date(2025, 12, 26),
+}
+
+MIN_MESSZEIT = 0.5  # Sekunden über alle Engines
+TEAMGROESSE = (4, 10)  # Mitarbeiter je Standort (min, max)
+SPRINGER_QUOTE = 0.025  # Anteil der Tage, an denen der Springer einen Dienst übernimmt
+
+# Eingetragene Anteile je Tagesbesetzung (Spalte C); None = automatisch 1/n
+ANTEILE = {1: [(None,)], 2: [(None, None), (0.5, 0.5), (0.75, 0.25)], 3: [(None, None, None), (0.5, 0.25, 0.25)]}
+
+
+def generate_plans(eintraege, mitarbeiter, seed=42):
+    """
+    Erzeugt Pläne mit (datum, mitarbeiter, anteil)-Tupeln, einen je Standort.
+
+    Jeder Standort besetzt jeden Tag des Jahres mit 1–3 Mitarbeitern aus
+    seinem Team (Split-Tage teils mit eingetragenem Anteil); an
+    SPRINGER_QUOTE der Tage übernimmt ein Springer aus dem ganzen Pool
+    einen der Dienste. Es kommen Standorte hinzu, bis eintraege erreicht
+    ist; der letzte Plan wird dort abgeschnitten.
+    """
+    rng = random.Random(seed)
+    namen = [f"Mitarbeiter {i:04d}" for i in range(mitarbeiter)]
+    start = date(2025, 1, 1)
+    tage = [start + timedelta(days=i) for i in range(365)]
+    plaene = []
+    gesamt = 0
+
+    while gesamt < eintraege:
+        team = rng.sample(namen, min(len(namen), rng.randint(*TEAMGROESSE)))
+        springer = rng.choice(namen)
+        plan = []
+        for datum in tage:
+            besetzung = rng.sample(team, min(len(team), rng.choice((1, 1, 2, 3))))
+            if springer not in besetzung and rng.random() < SPRINGER_QUOTE:
+                besetzung[0] = springer
+            for name, anteil in zip(besetzung, rng.choice(ANTEILE[len(besetzung)])):
+                plan.append((datum, name, anteil))
+        plan = plan[:eintraege - gesamt]
+        plaene.append(plan)
+        gesamt += len(plan)
+
+    return plaene
+
+
+def _abdeckung(name, results):
+    """
+    Prüft, dass die Ergebnisse die Regeln abdecken; beendet sonst mit Exit-Code 1.
+
+    Verlangt werden Mitarbeiter mit und ohne erreichte Schwelle und
+    mindestens einer, dessen Abzug sich auf Freitag und andere WE-Tage
+    verteilt.
+    """
+    ja = sum(1 for r in results if r['schwelle_erreicht'] == 'JA')
+    geteilt = sum(1 for r in results if r['abzug_freitag'] > 0 and r['abzug_andere'] > 0)
+    if not ja or ja == len(results) or not geteilt:
+        print(f"❌ Testdaten decken die Regeln nicht ab ({name}): {ja} von {len(results)} mit Schwelle, "
+              f"{geteilt} mit geteiltem Abzug")
+        sys.exit(1)
+    print(f"📋 {name}: {ja} von {len(results)} mit Schwelle, {geteilt} mit geteiltem Abzug")
+
+
+def _alle(func):
+    """Rechnet func(plan_data, holidays) für jeden Plan einer Liste (wie ein Batch)."""
+    def rechnen(plaene, holidays):
+        return [result for plan_data in plaene for result in func(plan_data, holidays)]
+    return rechnen
+
+
+def _paritaet(name, erwartet, *vergleiche):
+    """Ergebnisse müssen exakt übereinstimmen (nicht nur gerundet); sonst Exit-Code 1."""
+    if any(ergebnis != erwartet for ergebnis in vergleiche):
+        abweichend = [
+            p['mitarbeiter'] for p, *andere in zip(erwartet, *vergleiche)
+            if any(p != a for a in andere)
+        ]
+        print(f"❌ Engines liefern unterschiedliche Ergebnisse ({name}): {abweichend[:10]}")
+        sys.exit(1)
+    print(f"✅ Parität {name}: {len(erwartet)} Ergebnisse identisch")
+
+
+def _time(laeufe, holidays, wiederholungen):
+    """
+    Laufzeiten (Sekunden, eine je Runde) und letztes Ergebnis je Lauf.
+
+    laeufe ist eine Liste (name, func, plaene). Die Läufe wechseln sich
+    Runde für Runde ab, damit Schwankungen der Maschine alle gleich treffen;
+    gemessen wird mindestens wiederholungen Runden und MIN_MESSZEIT Sekunden.
+    """
+    zeiten = {name: [] for name, _, _ in laeufe}
+    results = {}
+    gesamt = 0.0
+    runde = 0
+    while runde < wiederholungen or gesamt < MIN_MESSZEIT:
+        for name, func, plan_data in laeufe:
+            start = time.perf_counter()
+            results[name] = func(plan_data, holidays)
+            dauer = time.perf_counter() - start
+            zeiten[name].append(dauer)
+            gesamt += dauer
+        runde += 1
+    return zeiten, results
+
+
+def main(argv):
+    eintraege = int(argv[argv.index("--eintraege") + 1]) if "--eintraege" in argv else 200000
+    mitarbeiter = int(argv[argv.index("--mitarbeiter") + 1]) if "--mitarbeiter" in argv else 300
+    wiederholungen = int(argv[argv.index("--wiederholungen") + 1]) if "--wiederholungen" in argv else 10
+
+    plaene_anteil = generate_plans(eintraege, mitarbeiter)
+    plaene = [[(datum, name) for datum, name, _ in plan] for plan in plaene_anteil]
+    print(f"🛠️ {eintraege} Einträge in {len(plaene)} Plänen, {mitarbeiter} Mitarbeiter, "
+          f"{len(NRW_FEIERTAGE_2025)} Feiertage")
+
+    # Alle Tagesbesetzungen im Raster: gemessen wird der Normalfall der Festkomma-Engine
+    anzahlen = {n for plan in plaene for n in Counter(datum for datum, _ in plan).values()}
+    if any(EINHEIT % n for n in anzahlen):
+        print(f"❌ Tagesbesetzungen außerhalb des 1/840-Rasters: {sorted(anzahlen)}")
+        sys.exit(1)
+
+    # Je Monat mit eingetragenen Anteilen (Tupel und Spalten wie aus read_plan_data)
+    monate_python = _alle(calculate_verguetung_monate)(plaene_anteil, NRW_FEIERTAGE_2025)
+    _abdeckung("je Monat", monate_python)
+    _paritaet(
+        "je Monat mit Anteil", monate_python,
+        _alle(calculate_verguetung_monate_numpy)(plaene_anteil, NRW_FEIERTAGE_2025),
+        _alle(calculate_verguetung_monate_numpy)(
+            [PlanEntries(plan, with_anteil=True) for plan in plaene_anteil], NRW_FEIERTAGE_2025
+        ),
+    )
+
+    zeiten, ergebnisse = _time([
+        ("python", _alle(calculate_verguetung), plaene),
+        ("numpy", _alle(calculate_verguetung_numpy), plaene),
+        # Wie von read_plan_data geliefert: Spalten statt Tupel, ohne Umkodieren
+        ("numpy/plan", _alle(calculate_verguetung_numpy), [PlanEntries(plan) for plan in plaene]),
+        ("exact", _alle(calculate_verguetung_exact), plaene),
+    ], NRW_FEIERTAGE_2025, wiederholungen)
+    # Vergleich über den Median der Verhältnisse je Runde: robuster gegen
+    # einzelne Ausreißer der Maschine als der Vergleich der Bestzeiten
+    verhaeltnis = statistics.median(e / p for p, e in zip(zeiten["python"], zeiten["exact"]))
+    zeiten = {name: min(runden) for name, runden in zeiten.items()}
+    zeit_python = zeiten["python"]
+    ergebnis_python, ergebnis_exact = ergebnisse["python"], ergebnisse["exact"]
+
+    _abdeckung("Jahr", ergebnis_python)
+    _paritaet("Jahr", ergebnis_python, ergebnisse["numpy"], ergebnisse["numpy/plan"])
+
+    # Festkomma: gleiche Schwelle, gleicher Abzug und auf den Cent gleiche Auszahlung
+    abweichend = [
+        p['mitarbeiter'] for p, e in zip(ergebnis_python, ergebnis_exact)
+        if p['schwelle_erreicht'] != e['schwelle_erreicht']
+        or abs(p['abzug_freitag'] - e['abzug_freitag']) > 1e-9
+        or round(p['auszahlung_wt'], 2) != e['auszahlung_wt']
+        or round(p['auszahlung_we'], 2) != e['auszahlung_we']
+    ]
+    if abweichend or len(ergebnis_python) != len(ergebnis_exact):
+        print(f"❌ Festkomma-Engine weicht ab: {abweichend[:10]}")
+        sys.exit(1)
+    print(f"✅ Festkomma: {len(ergebnis_exact)} Ergebnisse auf den Cent gleich")
+
+    print(f"\n{'='*60}")
+    print(f"{'Engine':<10} {'Zeit (s)':>10} {'Einträge/s':>14} {'Faktor':>8}")
+    print(f"{'='*60}")
+    for name, dauer in zeiten.items():
+        print(f"{name:<10} {dauer:>10.4f} {eintraege / dauer:>14.0f} {zeit_python / dauer:>7.1f}x")
+    print(f"{'='*60}")
+
+    if verhaeltnis > 1:
+        print(f"❌ Festkomma-Engine langsamer als Python-Engine (Median je Runde: {verhaeltnis:.2f}x der Laufzeit)")
+        sys.exit(1)
+    print(f"✅ Festkomma-Engine braucht im Median je Runde {verhaeltnis:.2f}x der Laufzeit der Python-Engine")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
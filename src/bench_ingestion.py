@@ -0,0 +1,178 @@
+"""
+Benchmark: Einlesen großer Pläne (Vollmodus vs. read-only Streaming vs. XML vs. CSV)
+
+Erzeugt einen synthetischen Plan (Standard: 50.000 Zeilen inkl. Formelspalten
+D–K wie in der Vorlage) und dieselben Einträge als CSV (Datum;Mitarbeiter;Anteil)
+und misst Laufzeit und Spitzen-RSS der Lesepfade.
+Jeder Modus läuft in einem eigenen Prozess, damit die RSS-Werte vergleichbar sind.
+xml liest die Blatt-XML direkt (xlsx_reader.py) mit einem Prozess,
+xml_parallel mit einem Prozess je CPU-Kern; eine Prüfsumme über die
+gelesenen Einträge muss mit streaming (openpyxl) übereinstimmen.
+
+Verwendung:
+    python src/bench_ingestion.py [--rows 50000] [--ohne-formeln] [--datei pfad.xlsx]
+"""
+
+from pathlib import Path
+from datetime import date, timedelta
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+from openpyxl import Workbook, load_workbook
+
+from calculate import read_plan_data, _read_plan_rows, calculate_verguetung
+from plan_text import read_plan_text
+
+
+MITARBEITER = [f"Mitarbeiter {i:03d}" for i in range(1, 301)]
+
+
+def _plan_rows(rows):
+    start = date(2025, 1, 1)
+    for i in range(rows):
+        yield start + timedelta(days=(i // 2) % 365), MITARBEITER[i % len(MITARBEITER)], 0.5
+
+
+def generate_plan_csv(path, rows):
+    """Schreibt dieselben Einträge wie generate_plan_workbook als CSV (Format aus plan_text.py)."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("Datum;Mitarbeiter;Anteil\n")
+        for datum, mitarbeiter, anteil in _plan_rows(rows):
+            f.write(f"{datum:%d.%m.%Y};{mitarbeiter};{str(anteil).replace('.', ',')}\n")
+
+
+def generate_plan_workbook(path, rows, with_formulas=True):
+    """Schreibt einen synthetischen Plan mit `rows` Einträgen (write-only)."""
+    wb = Workbook(write_only=True)
+
+    feiertage_ws = wb.create_sheet("Feiertage")
+    feiertage_ws.append(["Datum", "Name", "BL"])
+    for datum, name in [(date(2025, 1, 1), "Neujahr"), (date(2025, 12, 25), "1. Weihnachtstag")]:
+        feiertage_ws.append([datum, name, "NRW"])
+
+    plan_ws = wb.create_sheet("Plan")
+    plan_ws.append([
+        "Datum", "Mitarbeiter", "Anteil",
+        "Ist_FEIERTAG", "Ist_VORTAG", "Ist_Freitag", "Ist_WE_Tag", "Ist_WT_Tag",
+        "WT_Einheit", "WE_Freitag_Einheit", "WE_Andere_Einheit"
+    ])
+
+    for row_num, (datum, mitarbeiter, anteil) in enumerate(_plan_rows(rows), start=2):
+        row = [datum, mitarbeiter, anteil]
+        if with_formulas:
+            row += [
+                f"=COUNTIF(Feiertage!A:A,A{row_num})>0",
+                f"=COUNTIF(Feiertage!A:A,A{row_num}+1)>0",
+                f"=WEEKDAY(A{row_num},2)=5",
+                f"=OR($F{row_num},WEEKDAY(A{row_num},2)>=6,$D{row_num},$E{row_num})",
+                f"=NOT($G{row_num})",
+                f"=IF($H{row_num},C{row_num},0)",
+                f"=IF(AND($G{row_num},$F{row_num}),C{row_num},0)",
+                f"=IF(AND($G{row_num},NOT($F{row_num})),C{row_num},0)",
+            ]
+        plan_ws.append(row)
+
+    wb.create_sheet("Auswertung").append(["Mitarbeiter"])
+    wb.save(path)
+
+
+def _peak_rss_mb():
+    """Spitzen-RSS des aktuellen Prozesses in MB (None wenn nicht verfügbar)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux liefert KB, macOS Bytes
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _run_mode(mode, path):
+    """Führt einen Lesepfad aus und gibt Messwerte als Dictionary zurück."""
+    start = time.perf_counter()
+
+    if mode == "voll":
+        # Bisheriger Pfad: komplette Arbeitsmappe im Bearbeitungsmodus laden
+        wb = load_workbook(path)
+        plan_data = _read_plan_rows(wb["Plan"])
+    elif mode == "csv":
+        plan_data = read_plan_text(path.with_suffix(".csv"))
+    elif mode == "xml":
+        _, plan_data, _ = read_plan_data(path, reader="xml", workers=1)
+    elif mode == "xml_parallel":
+        _, plan_data, _ = read_plan_data(path, reader="xml", workers=os.cpu_count())
+    else:
+        _, plan_data, _ = read_plan_data(path)
+
+    lese_zeit = time.perf_counter() - start
+    calculate_verguetung(plan_data, set())
+    gesamt_zeit = time.perf_counter() - start
+
+    return {
+        "modus": mode,
+        "zeilen": len(plan_data),
+        "lesezeit_s": round(lese_zeit, 3),
+        "gesamtzeit_s": round(gesamt_zeit, 3),
+        "peak_rss_mb": _peak_rss_mb(),
+        "pruefsumme": hashlib.sha1(repr(list(plan_data)).encode()).hexdigest()[:12],
+    }
+
+
+def main(argv):
+    rows = 50000
+    with_formulas = True
+    path = Path("output/bench_plan.xlsx")
+
+    if "--mode" in argv:
+        # Kindprozess: einen Modus messen und JSON ausgeben
+        mode = argv[argv.index("--mode") + 1]
+        path = Path(argv[argv.index("--datei") + 1])
+        print(json.dumps(_run_mode(mode, path)))
+        return
+
+    if "--rows" in argv:
+        rows = int(argv[argv.index("--rows") + 1])
+    if "--ohne-formeln" in argv:
+        with_formulas = False
+    if "--datei" in argv:
+        path = Path(argv[argv.index("--datei") + 1])
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    print(f"🛠️ Erzeuge Plan mit {rows} Zeilen: {path}")
+    generate_plan_workbook(path, rows, with_formulas)
+    generate_plan_csv(path.with_suffix(".csv"), rows)
+
+    messungen = []
+    for mode in ("voll", "streaming", "xml", "xml_parallel", "csv"):
+        proc = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--datei", str(path)],
+            capture_output=True, text=True, check=True,
+        )
+        messungen.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"\n{'='*84}")
+    print(f"{'Modus':<13} {'Zeilen':>8} {'Lesen (s)':>10} {'Gesamt (s)':>11} {'Peak-RSS (MB)':>14} {'Prüfsumme':>13}")
+    print(f"{'='*84}")
+    for m in messungen:
+        rss = f"{m['peak_rss_mb']:.1f}" if m['peak_rss_mb'] is not None else "–"
+        print(f"{m['modus']:<13} {m['zeilen']:>8} {m['lesezeit_s']:>10.3f} {m['gesamtzeit_s']:>11.3f} {rss:>14} "
+              f"{m['pruefsumme']:>13}")
+    print(f"{'='*84}")
+
+    referenz = next(m['pruefsumme'] for m in messungen if m['modus'] == "streaming")
+    abweichend = [m['modus'] for m in messungen if m['modus'].startswith("xml") and m['pruefsumme'] != referenz]
+    if abweichend:
+        print(f"❌ Andere Einträge als streaming: {', '.join(abweichend)}")
+        return 1
+    print("✅ xml liest dieselben Einträge wie streaming")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,165 @@
+"""
+Benchmark: Speicherbedarf der Plan-Einträge (Tupel-Liste vs. PlanEntries)
+
+Erzeugt synthetische Einträge über mehrere Jahre (Standard: 1 Mio.) und
+misst mit tracemalloc den Speicher je Darstellung:
+
+    tupel          Liste von Tupeln, je Zeile neue date-, str- und float-
+                   Objekte (so liefert openpyxl die Zellen)
+    tupel_geteilt  Liste von Tupeln mit einem Objekt je Datum und Name
+    plan_entries   records.PlanEntries (array-Spalten, Codes)
+
+Dazu kommen die Akkumulatoren je (Mitarbeiter, Monat) (Dict je
+Mitarbeiter wie früher in calculate_verguetung vs. Liste je Tagesklasse),
+die Ergebniszeilen (Dict vs. VerguetungResult, ohne die gemeinsamen
+Zahlenwerte) und die Laufzeit von calculate_verguetung_monate auf beiden
+Darstellungen.
+Weichen die Ergebnisse voneinander ab, endet das Skript mit Exit-Code 1.
+
+Verwendung:
+    python src/bench_records.py [--eintraege 1000000] [--mitarbeiter 1000] [--jahre 4]
+"""
+
+from array import array
+from datetime import date
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from calculate import calculate_verguetung_monate, calculation_holidays
+from records import PlanEntries, VerguetungResult
+
+
+def generate_columns(eintraege, mitarbeiter, jahre, seed=42):
+    """Zufällige Ordinalzahlen, Mitarbeiter-Nummern und Anteile (0 = leer) als Arrays."""
+    rng = random.Random(seed)
+    start = date(2025, 1, 1).toordinal()
+    tage = date(2025 + jahre, 1, 1).toordinal() - start
+    ordinale = array("i", (start + rng.randrange(tage) for _ in range(eintraege)))
+    nummern = array("i", (rng.randrange(mitarbeiter) for _ in range(eintraege)))
+    anteile = array("d", (rng.choice((0.0, 0.0, 1.0, 0.5)) for _ in range(eintraege)))
+    return ordinale, nummern, anteile
+
+
+def _name(nummer):
+    return f"Mitarbeiter {nummer:04d}"
+
+
+def build_tupel(ordinale, nummern, anteile):
+    # Neue Objekte je Zeile wie beim Lesen aus der Arbeitsmappe
+    return [
+        (date.fromordinal(o), _name(n), float(a) if a else None)
+        for o, n, a in zip(ordinale, nummern, anteile)
+    ]
+
+
+def build_tupel_geteilt(ordinale, nummern, anteile):
+    daten = {o: date.fromordinal(o) for o in set(ordinale)}
+    namen = {n: _name(n) for n in set(nummern)}
+    return [(daten[o], namen[n], a if a else None) for o, n, a in zip(ordinale, nummern, anteile)]
+
+
+def build_plan_entries(ordinale, nummern, anteile):
+    entries = PlanEntries(with_anteil=True)
+    for o, n, a in zip(ordinale, nummern, anteile):
+        entries.append(date.fromordinal(o), _name(n), float(a) if a else None)
+    return entries
+
+
+def build_accumulator_dicts(schluessel):
+    return {k: {'wt_einheiten': 0.0, 'we_freitag': 0.0, 'we_andere': 0.0} for k in schluessel}
+
+
+def build_accumulator_lists(schluessel):
+    return {k: [0.0, 0.0, 0.0] for k in schluessel}
+
+
+def copy_results_dicts(results):
+    return [dict(result) for result in results]
+
+
+def copy_results_slots(results):
+    return [VerguetungResult(**result) for result in results]
+
+
+def measure(builder, *args):
+    """Gibt (objekt, bytes, sekunden) zurück; bytes ist der von tracemalloc gemessene Zuwachs."""
+    tracemalloc.start()
+    vorher = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    objekt = builder(*args)
+    dauer = time.perf_counter() - start
+    nachher = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objekt, nachher - vorher, dauer
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Speicherbedarf der Plan-Einträge messen.")
+    parser.add_argument("--eintraege", type=int, default=1_000_000, help="Anzahl Einträge (Standard: 1000000)")
+    parser.add_argument("--mitarbeiter", type=int, default=1000, help="Anzahl Mitarbeiter (Standard: 1000)")
+    parser.add_argument("--jahre", type=int, default=4, help="Planzeitraum in Jahren ab 2025 (Standard: 4)")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = _parse_args(argv)
+    ordinale, nummern, anteile = generate_columns(args.eintraege, args.mitarbeiter, args.jahre)
+    print(f"🛠️ {args.eintraege} Einträge, {args.mitarbeiter} Mitarbeiter, {args.jahre} Jahre")
+
+    messungen = {}
+    plaene = {}
+    for name, builder in (
+        ("tupel", build_tupel),
+        ("tupel_geteilt", build_tupel_geteilt),
+        ("plan_entries", build_plan_entries),
+    ):
+        plaene[name], groesse, dauer = measure(builder, ordinale, nummern, anteile)
+        messungen[name] = (groesse, dauer)
+        if name != "plan_entries":
+            del plaene[name]  # nur den Vergleichsplan behalten
+
+    basis = messungen["tupel"][0]
+    print(f"\n{'='*70}")
+    print(f"{'Darstellung':<16} {'MB':>10} {'Bytes/Eintrag':>15} {'Anteil':>9} {'Aufbau (s)':>12}")
+    print(f"{'='*70}")
+    for name, (groesse, dauer) in messungen.items():
+        print(f"{name:<16} {groesse / 1e6:>10.1f} {groesse / args.eintraege:>15.1f} "
+              f"{groesse / basis:>8.0%} {dauer:>12.2f}")
+
+    entries = plaene["plan_entries"]
+    tupel = build_tupel(ordinale, nummern, anteile)
+    holidays = calculation_holidays(entries, "NRW")
+
+    start = time.perf_counter()
+    erwartet = calculate_verguetung_monate(tupel, holidays, "NRW")
+    zeit_tupel = time.perf_counter() - start
+    start = time.perf_counter()
+    ergebnis = calculate_verguetung_monate(entries, holidays, "NRW")
+    zeit_entries = time.perf_counter() - start
+
+    schluessel = [(r['mitarbeiter'], (r['jahr'], r['monat'])) for r in erwartet]
+    _, dicts, _ = measure(build_accumulator_dicts, schluessel)
+    _, listen, _ = measure(build_accumulator_lists, schluessel)
+    _, result_dicts, _ = measure(copy_results_dicts, ergebnis)
+    _, result_slots, _ = measure(copy_results_slots, ergebnis)
+
+    print(f"{'-'*70}")
+    print(f"Akkumulatoren ({len(schluessel)} Mitarbeiter × Monat): Dict {dicts / 1e6:.1f} MB, "
+          f"Liste {listen / 1e6:.1f} MB")
+    print(f"Ergebnisse ({len(ergebnis)} Zeilen): Dict {result_dicts / 1e6:.1f} MB, "
+          f"VerguetungResult {result_slots / 1e6:.1f} MB")
+    print(f"Berechnung je Monat: Tupel {zeit_tupel:.2f} s, PlanEntries {zeit_entries:.2f} s")
+    print(f"{'='*70}")
+
+    if ergebnis != erwartet:
+        print("❌ Ergebnisse weichen voneinander ab")
+        return 1
+    print(f"✅ Identische Ergebnisse ({len(ergebnis)} Zeilen)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
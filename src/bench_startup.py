@@ -0,0 +1,151 @@
+"""
+Benchmark: Startzeit der Kommandozeile (python -X importtime)
+
+Misst für typische interaktive Aufrufe die Wandzeit (beste aus N Läufen,
+jeweils frischer Prozess) und wertet die Ausgabe von `python -X importtime`
+aus: kumulierte Importzeit und die Module mit der höchsten Eigenzeit.
+Gemessen wird mit Bytecode-Cache (__pycache__), wie bei normaler Nutzung;
+PYTHONDONTWRITEBYTECODE wird für die Messläufe ignoriert. Jedes Szenario
+hat ein Budget in ms; Überschreitungen oder ein vorzeitig
+geladenes openpyxl beenden das Skript mit Exit-Code 1.
+
+Verwendung:
+    python src/bench_startup.py [--wiederholungen 5] [--faktor 1.0] [--top 5] [--bericht output/startup.json]
+"""
+
+from pathlib import Path
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+SRC = Path(__file__).resolve().parent
+DIENSTPLAN = str(SRC / "dienstplan.py")
+
+# Name -> (Argumente für python, Budget in ms, Module, die nicht geladen sein dürfen)
+SZENARIEN = {
+    "interpreter": (["-c", "pass"], 50, ()),
+    "dienstplan --help": ([DIENSTPLAN, "--help"], 60, ("openpyxl", "calculate")),
+    "calc --help": ([DIENSTPLAN, "calc", "--help"], 120, ("openpyxl",)),
+    "import calculate": (["-c", "import calculate"], 120, ("openpyxl",)),
+    "import service": (["-c", "import service"], 180, ("openpyxl",)),
+}
+
+
+def _run(args, importtime=False):
+    """Startet python mit args in einem frischen Prozess; gibt (dauer_ms, stderr) zurück."""
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + args
+    start = time.perf_counter()
+    env = {name: wert for name, wert in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"}
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=SRC, env=env)
+    dauer_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or f"Exit-Code {proc.returncode}")
+    return dauer_ms, proc.stderr
+
+
+def parse_importtime(stderr):
+    """
+    Wertet die Ausgabe von -X importtime aus.
+
+    Gibt (module, gesamt_us, top) zurück: module ist ein Dict Modul ->
+    kumulierte µs, gesamt_us die Summe der Module der obersten Ebene und top
+    eine Liste (modul, µs) nach Eigenzeit absteigend.
+    """
+    module = {}
+    gesamt_us = 0
+    top = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        teile = line[len("import time:"):].split("|")
+        if len(teile) != 3 or not teile[1].strip().isdigit():
+            continue  # Kopfzeile
+        name = teile[2].rstrip()
+        tiefe = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        module[name] = int(teile[1])
+        if tiefe == 0:
+            gesamt_us += int(teile[1])
+        top.append((name, int(teile[0])))
+    top.sort(key=lambda eintrag: eintrag[1], reverse=True)
+    return module, gesamt_us, top
+
+
+def measure(name, wiederholungen=5, faktor=1.0, top=5):
+    """Misst ein Szenario aus SZENARIEN und gibt den Messdatensatz zurück."""
+    args, budget_ms, verboten = SZENARIEN[name]
+    budget_ms *= faktor
+
+    _run(args)  # Aufwärmen (Dateisystem-Cache, .pyc)
+    dauer_ms = min(_run(args)[0] for _ in range(wiederholungen))
+
+    _, stderr = _run(args, importtime=True)
+    module, gesamt_us, top_module = parse_importtime(stderr)
+    geladen = [modul for modul in verboten if modul in module]
+
+    return {
+        "zeit_ms": round(dauer_ms, 1),
+        "budget_ms": round(budget_ms, 1),
+        "import_ms": round(gesamt_us / 1000, 1),
+        "module": len(module),
+        "top": [(modul, round(us / 1000, 1)) for modul, us in top_module[:top]],
+        "verboten_geladen": geladen,
+        "ok": dauer_ms <= budget_ms and not geladen,
+    }
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Startzeit der Kommandozeile messen (python -X importtime).")
+    parser.add_argument("--wiederholungen", type=int, default=5, help="Beste Zeit aus N Läufen (Standard: 5)")
+    parser.add_argument("--faktor", type=float, default=1.0,
+                        help="Budgets skalieren, z. B. 2.0 auf langsamen Rechnern (Standard: 1.0)")
+    parser.add_argument("--top", type=int, default=5, help="Anzahl der Module mit der höchsten Eigenzeit je Szenario")
+    parser.add_argument("--szenarien", nargs="+", choices=SZENARIEN, default=list(SZENARIEN),
+                        help="Nur diese Szenarien messen")
+    parser.add_argument("--bericht", help="Messwerte zusätzlich als JSON speichern")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = _parse_args(argv)
+
+    ergebnisse = {}
+    for name in args.szenarien:
+        try:
+            ergebnisse[name] = measure(name, args.wiederholungen, args.faktor, args.top)
+        except RuntimeError as e:
+            print(f"❌ Szenario '{name}' fehlgeschlagen:\n{e}")
+            return 1
+
+    print(f"\n{'='*70}")
+    print(f"{'Szenario':<22} {'Zeit (ms)':>10} {'Budget':>8} {'Importe':>9} {'Module':>7}")
+    print(f"{'='*70}")
+    for name, m in ergebnisse.items():
+        marke = "✅" if m["ok"] else "❌"
+        print(f"{name:<22} {m['zeit_ms']:>10.1f} {m['budget_ms']:>8.0f} {m['import_ms']:>9.1f} {m['module']:>7} {marke}")
+        print("   " + ", ".join(f"{modul} {ms:.1f} ms" for modul, ms in m["top"]))
+        if m["verboten_geladen"]:
+            print(f"   ⚠️ Unerwartet geladen: {', '.join(m['verboten_geladen'])}")
+    print(f"{'='*70}")
+
+    if args.bericht:
+        bericht_path = Path(args.bericht)
+        bericht_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(bericht_path, "w", encoding="utf-8") as f:
+            json.dump(ergebnisse, f, ensure_ascii=False, indent=2)
+        print(f"✅ Bericht gespeichert: {bericht_path}")
+
+    fehler = [name for name, m in ergebnisse.items() if not m["ok"]]
+    if fehler:
+        print(f"❌ Budget überschritten: {', '.join(fehler)}")
+        return 1
+    print("✅ Alle Szenarien im Budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,400 @@
+"""
+Benchmark-Suite mit synthetischem Dienstplan-Generator
+
+Erzeugt einen Dienstplan in konfigurierbarer Größe (Mitarbeiter, Monate,
+Split-Anteil, Feiertagsdichte) und misst die Stufen
+
+    vorlage             build_template (Write-only, Planzeilen = Planumfang)
+    einlesen            read_plan_data (Plan + Feiertage, read-only)
+    berechnen           calculate_verguetung (gewählte Engine)
+    auswertung          write_auswertung_workbook (separate Datei)
+    auswertung_inplace  Plan-Datei laden, write_auswertung, speichern
+    auswertung_patch    patch_auswertung (nur Blatt Auswertung im ZIP ersetzen)
+    monatsplaene        fill_plan_with_dates je Monat (Vorlage jedes Mal laden)
+    monatsplaene_bulk   fill_plans_bulk (Vorlage einmal lesen, parallel schreiben)
+
+jeweils mit Laufzeit, Zeilen/s und Spitzen-RSS (bei den Monatsplänen
+zählt jede erzeugte Datei als Zeile, je --monate eine). Jede Stufe läuft in einem
+eigenen Prozess, damit die Speicherwerte einer Stufe nicht von vorherigen
+Stufen verfälscht werden. Die Messwerte landen in einem JSON-Bericht; mit
+--vergleich wird ein älterer Bericht eingelesen und Regressionen werden
+gemeldet (Exit-Code 1).
+
+Dienstmodell: je Abteilung (MITARBEITER_PRO_ABTEILUNG Mitarbeiter) ein
+Dienst pro Tag; ein Anteil --split der Dienste wird auf zwei Mitarbeiter
+aufgeteilt. --feiertage ist die Zielquote an Feiertagen im Zeitraum; reicht
+die Zahl der gesetzlichen Feiertage nicht, werden zufällige
+Betriebsfeiertage im Blatt 'Feiertage' ergänzt.
+
+Verwendung:
+    python src/bench_suite.py [--mitarbeiter 1000] [--monate 12] [--split 0.3]
+                              [--feiertage 0.05] [--bericht output/bench_bericht.json]
+                              [--vergleich alter_bericht.json] [--toleranz 0.2]
+"""
+
+from pathlib import Path
+from datetime import date, datetime, timedelta
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from openpyxl import Workbook, load_workbook
+
+from auswertung_writer import write_auswertung_workbook
+from build_template import FORMULA_LAYOUTS, PLAN_HEADERS, _plan_formulas, build_template
+from calculate import (
+    ENGINES, calculation_holidays, get_engine, patch_auswertung, read_plan_data, write_auswertung,
+)
+from feiertage import holiday_dates, normalize_bundesland
+from fill_plan_dates import fill_plan_with_dates, fill_plans_bulk
+
+
+BERICHT_VERSION = 1
+MITARBEITER_PRO_ABTEILUNG = 10
+STUFEN = ("vorlage", "einlesen", "berechnen", "auswertung", "auswertung_inplace", "auswertung_patch",
+          "monatsplaene", "monatsplaene_bulk")
+START_DATUM = date(2025, 1, 1)
+
+
+def _add_months(datum, monate):
+    jahr, monat = divmod(datum.month - 1 + monate, 12)
+    return date(datum.year + jahr, monat + 1, 1)
+
+
+def generate_roster(mitarbeiter, monate, split=0.3, feiertage=0.05, bundesland="NRW",
+                    start=START_DATUM, seed=42):
+    """
+    Erzeugt einen synthetischen Dienstplan.
+
+    Gibt (plan_rows, betriebsfeiertage) zurück: plan_rows sind
+    (datum, mitarbeiter, anteil)-Tupel nach Datum sortiert,
+    betriebsfeiertage die zusätzlich erzeugten Feiertagsdaten.
+    """
+    rng = random.Random(seed)
+    bundesland = normalize_bundesland(bundesland)
+    ende = _add_months(start, monate)
+    tage = [start + timedelta(days=i) for i in range((ende - start).days)]
+
+    namen = [f"Mitarbeiter {i:05d}" for i in range(mitarbeiter)]
+    abteilungen = [
+        namen[i:i + MITARBEITER_PRO_ABTEILUNG]
+        for i in range(0, len(namen), MITARBEITER_PRO_ABTEILUNG)
+    ]
+
+    gesetzlich = holiday_dates(range(start.year, ende.year + 1), bundesland)
+    ziel = int(round(feiertage * len(tage)))
+    frei = [tag for tag in tage if tag not in gesetzlich]
+    anzahl_extra = max(0, ziel - sum(1 for tag in tage if tag in gesetzlich))
+    betriebsfeiertage = sorted(rng.sample(frei, min(anzahl_extra, len(frei))))
+
+    plan_rows = []
+    for tag in tage:
+        for abteilung in abteilungen:
+            if len(abteilung) >= 2 and rng.random() < split:
+                for name in rng.sample(abteilung, 2):
+                    plan_rows.append((tag, name, 0.5))
+            else:
+                plan_rows.append((tag, rng.choice(abteilung), 1.0))
+
+    return plan_rows, betriebsfeiertage
+
+
+def write_roster_workbook(path, plan_rows, betriebsfeiertage, bundesland="NRW"):
+    """Schreibt den Plan im Vorlagenformat (inkl. Formelspalten D–K) als Write-only-Arbeitsmappe."""
+    wb = Workbook(write_only=True)
+
+    regeln_ws = wb.create_sheet("Regeln")
+    regeln_ws.append(["Parameter", "Wert", "Beschreibung"])
+    for param, wert in (("Satz_WT", 250), ("Satz_WE", 450), ("WE_Schwelle", 2.0),
+                        ("Abzug_nach_WE_Schwelle", 2.0), ("BL_Auswahl", bundesland)):
+        regeln_ws.append([param, wert, None])
+
+    feiertage_ws = wb.create_sheet("Feiertage")
+    feiertage_ws.append(["Datum", "Name", "BL"])
+    for datum in betriebsfeiertage:
+        feiertage_ws.append([datum, "Betriebsfeiertag", bundesland])
+
+    plan_ws = wb.create_sheet("Plan")
+    plan_ws.append(PLAN_HEADERS)
+    for row_num, (datum, name, anteil) in enumerate(plan_rows, start=2):
+        plan_ws.append([datum, name, anteil, *_plan_formulas(row_num).values()])
+
+    wb.create_sheet("Auswertung").append(["Mitarbeiter"])
+    wb.save(path)
+
+
+def _peak_rss_mb():
+    """Spitzen-RSS des aktuellen Prozesses in MB (None wenn nicht verfügbar)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux liefert KB, macOS Bytes
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _calculation_input(params):
+    """Plan und Feiertage für die Rechen-/Schreibstufen (im Speicher erzeugt, ohne Einlesen)."""
+    plan_rows, betriebsfeiertage = generate_roster(
+        params["mitarbeiter"], params["monate"], params["split"], params["feiertage"],
+        params["bundesland"], seed=params["seed"],
+    )
+    plan_data = [(datum, name) for datum, name, _ in plan_rows]
+    holidays = calculation_holidays(plan_data, params["bundesland"], betriebsfeiertage)
+    return plan_data, holidays
+
+
+def _run_stage(stufe, params, plan_path, arbeitsverzeichnis):
+    """
+    Führt eine Stufe aus (im Kindprozess) und gibt die Messwerte zurück.
+
+    Vorbereitung (z. B. Ergebnisse für die Schreibstufen) läuft vor der
+    Messung; rss_zuwachs_mb ist der Anstieg des Spitzen-RSS während der Stufe.
+    """
+    wiederholungen = params["wiederholungen"]
+    engine = get_engine(params["engine"])
+    bundesland = params["bundesland"]
+
+    if stufe == "vorlage":
+        zeilen = params["plan_zeilen"]
+        ziel = arbeitsverzeichnis / "vorlage.xlsx"
+        def aufgabe():
+            build_template(None, bundesland, ziel, max_plan_rows=zeilen,
+                           formula_layout=params["formeln"], fast=True)
+    elif stufe == "einlesen":
+        zeilen = params["plan_zeilen"]
+        def aufgabe():
+            read_plan_data(plan_path)
+    elif stufe == "berechnen":
+        plan_data, holidays = _calculation_input(params)
+        zeilen = len(plan_data)
+        def aufgabe():
+            engine(plan_data, holidays, bundesland)
+    elif stufe == "auswertung":
+        plan_data, holidays = _calculation_input(params)
+        results = engine(plan_data, holidays, bundesland)
+        zeilen = len(results)
+        ziel = arbeitsverzeichnis / "auswertung.xlsx"
+        def aufgabe():
+            write_auswertung_workbook(ziel, results)
+    elif stufe == "auswertung_inplace":
+        plan_data, holidays = _calculation_input(params)
+        results = engine(plan_data, holidays, bundesland)
+        zeilen = params["plan_zeilen"]
+        ziel = arbeitsverzeichnis / "plan_inplace.xlsx"
+        def aufgabe():
+            shutil.copyfile(plan_path, ziel)
+            wb = load_workbook(ziel)
+            write_auswertung(wb, results)
+            wb.save(ziel)
+    elif stufe == "auswertung_patch":
+        plan_data, holidays = _calculation_input(params)
+        results = engine(plan_data, holidays, bundesland)
+        zeilen = params["plan_zeilen"]
+        ziel = arbeitsverzeichnis / "plan_patch.xlsx"
+        def aufgabe():
+            shutil.copyfile(plan_path, ziel)
+            patch_auswertung(ziel, results).save()
+    elif stufe in ("monatsplaene", "monatsplaene_bulk"):
+        vorlage = arbeitsverzeichnis / "vorlage_monate.xlsx"
+        build_template(None, bundesland, vorlage, formula_layout=params["formeln"], fast=True)
+        auftraege = [
+            (2026 + i // 12, i % 12 + 1, arbeitsverzeichnis / f"monat_{2026 + i // 12}_{i % 12 + 1:02d}.xlsx")
+            for i in range(params["monate"])
+        ]
+        zeilen = len(auftraege)
+        if stufe == "monatsplaene":
+            def aufgabe():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for jahr, monat, ziel in auftraege:
+                        fill_plan_with_dates(vorlage, ziel, jahr, monat)
+        else:
+            def aufgabe():
+                fill_plans_bulk(vorlage, auftraege)
+    else:
+        raise ValueError(f"Unbekannte Stufe '{stufe}' (erlaubt: {', '.join(STUFEN)})")
+
+    rss_vorher = _peak_rss_mb()
+    best = None
+    for _ in range(wiederholungen):
+        start = time.perf_counter()
+        aufgabe()
+        dauer = time.perf_counter() - start
+        best = dauer if best is None else min(best, dauer)
+    rss_nachher = _peak_rss_mb()
+
+    return {
+        "zeit_s": round(best, 4),
+        "zeilen": zeilen,
+        "zeilen_pro_s": round(zeilen / best) if best > 0 else None,
+        "peak_rss_mb": round(rss_nachher, 1) if rss_nachher is not None else None,
+        "rss_zuwachs_mb": round(rss_nachher - rss_vorher, 1) if rss_nachher is not None else None,
+    }
+
+
+def _git_commit():
+    """Aktueller Commit (kurz) zur Zuordnung des Berichts, sonst None."""
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=Path(__file__).parent,
+        )
+    except OSError:
+        return None
+    return proc.stdout.strip() or None
+
+
+def compare_reports(alt, neu, toleranz=0.2):
+    """
+    Vergleicht zwei Berichte stufenweise.
+
+    Gibt eine Liste (stufe, zeit_alt, zeit_neu, faktor, regression) zurück;
+    regression ist True, wenn die neue Zeit um mehr als toleranz langsamer ist.
+    """
+    vergleich = []
+    for stufe, messung in neu["stufen"].items():
+        alt_messung = alt.get("stufen", {}).get(stufe)
+        if not alt_messung or not alt_messung.get("zeit_s"):
+            continue
+        faktor = messung["zeit_s"] / alt_messung["zeit_s"]
+        vergleich.append((stufe, alt_messung["zeit_s"], messung["zeit_s"], faktor, faktor > 1 + toleranz))
+    return vergleich
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark-Suite mit synthetischem Dienstplan.")
+    parser.add_argument("--mitarbeiter", type=int, default=1000, help="Anzahl Mitarbeiter (Standard: 1000)")
+    parser.add_argument("--monate", type=int, default=12, help="Planzeitraum in Monaten ab 01.01.2025 (Standard: 12)")
+    parser.add_argument("--split", type=float, default=0.3, help="Anteil geteilter Dienste 0–1 (Standard: 0.3)")
+    parser.add_argument("--feiertage", type=float, default=0.05,
+                        help="Zielquote Feiertage im Zeitraum 0–1 (Standard: 0.05)")
+    parser.add_argument("--bundesland", default="NRW", help="Bundesland (Standard: NRW)")
+    parser.add_argument("--seed", type=int, default=42, help="Zufalls-Seed (Standard: 42)")
+    parser.add_argument("--engine", choices=ENGINES, default="python", help="Berechnungs-Engine (Standard: python)")
+    parser.add_argument("--formeln", choices=FORMULA_LAYOUTS, default="sumproduct", help="Formel-Layout der Vorlage (Standard: sumproduct)")
+    parser.add_argument("--wiederholungen", type=int, default=1, help="Beste Zeit aus N Läufen je Stufe")
+    parser.add_argument("--stufen", nargs="+", choices=STUFEN, default=list(STUFEN), help="Nur diese Stufen messen")
+    parser.add_argument("--bericht", default="output/bench_bericht.json", help="Zieldatei des JSON-Berichts")
+    parser.add_argument("--vergleich", help="Älterer Bericht zum Vergleich")
+    parser.add_argument("--toleranz", type=float, default=0.2,
+                        help="Erlaubte Verlangsamung je Stufe beim Vergleich (Standard: 0.2 = 20 %%)")
+    # Kindprozess
+    parser.add_argument("--stufe", help=argparse.SUPPRESS)
+    parser.add_argument("--parameter", help=argparse.SUPPRESS)
+    parser.add_argument("--datei", help=argparse.SUPPRESS)
+    parser.add_argument("--arbeitsverzeichnis", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = _parse_args(argv)
+
+    if args.stufe:
+        # Kindprozess: eine Stufe messen und JSON ausgeben
+        messung = _run_stage(args.stufe, json.loads(args.parameter), Path(args.datei),
+                             Path(args.arbeitsverzeichnis))
+        print(json.dumps(messung))
+        return
+
+    bundesland = normalize_bundesland(args.bundesland)
+    params = {
+        "mitarbeiter": args.mitarbeiter,
+        "monate": args.monate,
+        "split": args.split,
+        "feiertage": args.feiertage,
+        "bundesland": bundesland,
+        "seed": args.seed,
+        "engine": args.engine,
+        "formeln": args.formeln,
+        "wiederholungen": args.wiederholungen,
+    }
+
+    with tempfile.TemporaryDirectory(prefix="dienstplan_bench_") as tmp:
+        arbeitsverzeichnis = Path(tmp)
+        plan_path = arbeitsverzeichnis / "plan.xlsx"
+
+        start = time.perf_counter()
+        plan_rows, betriebsfeiertage = generate_roster(
+            args.mitarbeiter, args.monate, args.split, args.feiertage, bundesland, seed=args.seed,
+        )
+        write_roster_workbook(plan_path, plan_rows, betriebsfeiertage, bundesland)
+        params["plan_zeilen"] = len(plan_rows)
+        print(f"🛠️ Plan erzeugt: {len(plan_rows)} Zeilen, {args.mitarbeiter} Mitarbeiter, "
+              f"{args.monate} Monate, {len(betriebsfeiertage)} Betriebsfeiertage "
+              f"({time.perf_counter() - start:.2f} s)")
+
+        stufen = {}
+        for stufe in STUFEN:
+            if stufe not in args.stufen:
+                continue
+            proc = subprocess.run(
+                [sys.executable, __file__, "--stufe", stufe, "--parameter", json.dumps(params),
+                 "--datei", str(plan_path), "--arbeitsverzeichnis", str(arbeitsverzeichnis)],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"❌ Stufe '{stufe}' fehlgeschlagen:\n{proc.stderr.strip()}")
+                sys.exit(1)
+            stufen[stufe] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    bericht = {
+        "version": BERICHT_VERSION,
+        "erstellt": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "plattform": platform.platform(),
+        "parameter": params,
+        "stufen": stufen,
+    }
+
+    print(f"\n{'='*78}")
+    print(f"{'Stufe':<20} {'Zeit (s)':>10} {'Zeilen':>9} {'Zeilen/s':>11} {'Peak-RSS':>10} {'Zuwachs':>10}")
+    print(f"{'='*78}")
+    for stufe, m in stufen.items():
+        rss = f"{m['peak_rss_mb']:.1f}" if m['peak_rss_mb'] is not None else "–"
+        zuwachs = f"{m['rss_zuwachs_mb']:.1f}" if m['rss_zuwachs_mb'] is not None else "–"
+        print(f"{stufe:<20} {m['zeit_s']:>10.3f} {m['zeilen']:>9} {m['zeilen_pro_s'] or 0:>11} {rss:>10} {zuwachs:>10}")
+    print(f"{'='*78}")
+
+    bericht_path = Path(args.bericht)
+    bericht_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(bericht_path, "w", encoding="utf-8") as f:
+        json.dump(bericht, f, ensure_ascii=False, indent=2)
+    print(f"✅ Bericht gespeichert: {bericht_path}")
+
+    if args.vergleich:
+        try:
+            with open(args.vergleich, encoding="utf-8") as f:
+                alt = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Vergleichsbericht nicht lesbar: {e}")
+            sys.exit(1)
+
+        if alt.get("parameter") != params:
+            print("⚠️ Warnung: Vergleichsbericht wurde mit anderen Parametern erstellt")
+
+        regressionen = 0
+        print(f"\n📋 Vergleich mit {args.vergleich} (Commit {alt.get('commit') or '?'}):")
+        for stufe, zeit_alt, zeit_neu, faktor, regression in compare_reports(alt, bericht, args.toleranz):
+            marke = "⚠️ " if regression else "  "
+            print(f"{marke}{stufe:<20} {zeit_alt:>9.3f} s -> {zeit_neu:>9.3f} s  ({faktor:.2f}x)")
+            regressionen += regression
+        if regressionen:
+            print(f"❌ {regressionen} Stufe(n) mehr als {args.toleranz:.0%} langsamer")
+            sys.exit(1)
+        print("✅ Keine Regression")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -2,122 +2,155 @@
 
 from pathlib import Path
 from datetime import date
+import warnings
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Font, PatternFill, Border, Side, numbers
 from openpyxl.worksheet.datavalidation import DataValidation
-from openpyxl.worksheet.table import Table, TableStyleInfo
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
 from openpyxl.utils import get_column_letter
 
+from feiertage import BUNDESLAENDER, get_holidays, normalize_bundesland
+
 TEMPLATE_PATH = Path("templates/Dienstplan_Vorlage_V2_NRW.xlsx")
 MAX_PLAN_ROWS = 400
-MAX_HOLIDAY_ROWS = 50
-
-NRW_HOLIDAYS_2025 = [
-    ("2025-01-01", "Neujahr", "NRW"),
-    ("2025-04-18", "Karfreitag", "NRW"),
-    ("2025-04-21", "Ostermontag", "NRW"),
-    ("2025-05-01", "Tag der Arbeit", "NRW"),
-    ("2025-05-29", "Christi Himmelfahrt", "NRW"),
-    ("2025-06-09", "Pfingstmontag", "NRW"),
-    ("2025-06-19", "Fronleichnam", "NRW"),
-    ("2025-10-03", "Tag der Deutschen Einheit", "NRW"),
-    ("2025-11-01", "Allerheiligen", "NRW"),
-    ("2025-12-24", "Heiligabend", "NRW"),
-    ("2025-12-25", "1. Weihnachtstag", "NRW"),
-    ("2025-12-26", "2. Weihnachtstag", "NRW"),
-    ("2025-12-31", "Silvester", "NRW"),
+MAX_AUSWERTUNG_ROWS = 50
+MAX_CHECK_ROWS = 50
+DEFAULT_BUNDESLAND = "NRW"
+
+# "sumproduct": original layout, works in every Excel version but every
+#   Auswertung/Checks cell scans the whole plan (O(employees x rows) on recalc).
+# "sumifs": COUNTIFS/SUMIFS on the helper columns, recalculates much faster
+#   for large plans (Excel 2007+, LibreOffice).
+FORMULA_LAYOUTS = ("sumproduct", "sumifs")
+
+PLAN_HEADERS = [
+    "Datum", "Mitarbeiter", "Anteil",
+    "Ist_FEIERTAG", "Ist_VORTAG", "Ist_Freitag", "Ist_WE_Tag", "Ist_WT_Tag",
+    "WT_Einheit", "WE_Freitag_Einheit", "WE_Andere_Einheit"
 ]
-
-NRW_HOLIDAYS_2026 = [
-    ("2026-01-01", "Neujahr", "NRW"),
-    ("2026-04-03", "Karfreitag", "NRW"),
-    ("2026-04-06", "Ostermontag", "NRW"),
-    ("2026-05-01", "Tag der Arbeit", "NRW"),
-    ("2026-05-14", "Christi Himmelfahrt", "NRW"),
-    ("2026-05-25", "Pfingstmontag", "NRW"),
-    ("2026-06-04", "Fronleichnam", "NRW"),
-    ("2026-10-03", "Tag der Deutschen Einheit", "NRW"),
-    ("2026-11-01", "Allerheiligen", "NRW"),
-    ("2026-12-24", "Heiligabend", "NRW"),
-    ("2026-12-25", "1. Weihnachtstag", "NRW"),
-    ("2026-12-26", "2. Weihnachtstag", "NRW"),
-    ("2026-12-31", "Silvester", "NRW"),
+AUSWERTUNG_HEADERS = [
+    "Mitarbeiter", "WT_Einheiten", "WE_Freitag", "WE_Andere", "WE_Gesamt",
+    "Schwelle_erreicht", "Abzug_gesamt", "Abzug_Freitag", "Abzug_Andere",
+    "WE_bezahlt", "Auszahlung_WT", "Auszahlung_WE", "Auszahlung_Gesamt"
+]
+AUSWERTUNG_WIDTHS = [22, 14, 14, 14, 14, 16, 14, 14, 14, 14, 14, 14, 16]
+CHECKS_HEADERS = ["Datum", "Summe_Anteile", "Status"]
+
+README_TITLE = "NRW-Dienstplan (Variante 2 – streng)"
+README_RULES = [
+    "WE-Tag = Fr/Sa/So/Feiertag/Vortag (BL-abhängig).",
+    "Variante 2 (streng): WE werden nur vergütet, wenn im Monat ≥ 2,0 WE-Einheiten erreicht werden;",
+    "dann 450 €/WE und Abzug 2,0 (Freitag zuerst). WT werden bei Erreichen der WE-Schwelle mit 250 € vergütet.",
+    "Splits anteilig. Monat und Bundesland in 'Regeln' wählen.",
+    "",
+    "Schritte:",
+    "1. In 'Regeln': Monat_Auswahl (erster Tag) + BL_Auswahl setzen.",
+    "2. 'Feiertage' kontrollieren bzw. erweitern.",
+    "3. Im Blatt 'Plan' pro Tag Datum, Mitarbeiter und Anteil (0–1) eintragen.",
+    "4. Auswertung erfolgt automatisch im Blatt 'Auswertung'.",
+    "5. 'Checks' zeigt Unstimmigkeiten (Summe Anteil ≠ 1, etc.).",
 ]
 
+HEADER_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+
+
+def default_holiday_years():
+    """Feiertagsjahre der Vorlage: Vorjahr bis drei Jahre voraus (ab dem aktuellen Jahr)."""
+    current = date.today().year
+    return range(current - 1, current + 4)
+
 
 def _style_header(ws, row=1):
     """Apply header styling."""
-    fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    font = Font(bold=True, color="FFFFFF", size=11)
     for cell in ws[row]:
         if cell.value:
-            cell.font = font
-            cell.fill = fill
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.font = HEADER_FONT
+            cell.fill = HEADER_FILL
+            cell.alignment = HEADER_ALIGNMENT
+
+
+def _table(name, ref, headers, style_name):
+    """Create a table with explicit column names (required for write-only sheets)."""
+    tab = Table(displayName=name, ref=ref)
+    tab.tableColumns = [TableColumn(id=idx, name=header) for idx, header in enumerate(headers, start=1)]
+    tab.tableStyleInfo = TableStyleInfo(name=style_name, showFirstColumn=False,
+                                        showLastColumn=False, showRowStripes=True, showColumnStripes=False)
+    return tab
 
 
 def _populate_readme(ws):
-    ws["A1"] = "NRW-Dienstplan (Variante 2 – streng)"
+    ws["A1"] = README_TITLE
     ws["A1"].font = Font(bold=True, size=14)
     ws["A3"] = "Kurzregeln"
     ws["A3"].font = Font(bold=True)
-    rules = [
-        "WE-Tag = Fr/Sa/So/Feiertag/Vortag (BL-abhängig).",
-        "Variante 2 (streng): WE werden nur vergütet, wenn im Monat ≥ 2,0 WE-Einheiten erreicht werden;",
-        "dann 450 €/WE und Abzug 2,0 (Freitag zuerst). WT werden bei Erreichen der WE-Schwelle mit 250 € vergütet.",
-        "Splits anteilig. Monat und Bundesland in 'Regeln' wählen.",
-        "",
-        "Schritte:",
-        "1. In 'Regeln': Monat_Auswahl (erster Tag) + BL_Auswahl setzen.",
-        "2. 'Feiertage' kontrollieren bzw. erweitern.",
-        "3. Im Blatt 'Plan' pro Tag Datum, Mitarbeiter und Anteil (0–1) eintragen.",
-        "4. Auswertung erfolgt automatisch im Blatt 'Auswertung'.",
-        "5. 'Checks' zeigt Unstimmigkeiten (Summe Anteil ≠ 1, etc.).",
-    ]
-    for idx, text in enumerate(rules, start=4):
+    for idx, text in enumerate(README_RULES, start=4):
         ws[f"A{idx}"] = text
     ws.column_dimensions["A"].width = 100
 
 
-def _populate_rules(ws):
-    headers = ["Parameter", "Wert", "Beschreibung"]
-    ws.append(headers)
-    rows = [
+def _rules_rows(bundesland):
+    return [
         ("Satz_WT", 250, "Euro für jeden Werktagsdienst (Mo–Do, sofern kein WE-Tag)"),
         ("Satz_WE", 450, "Euro für jeden WE-Tag (Fr–So, Feiertag, Vortag Feiertag)"),
         ("WE_Schwelle", 2.0, "Ab dieser WE-Anzahl wird vergütet (sonst 0 €)"),
         ("Abzug_nach_WE_Schwelle", 2.0, "Einheiten, die nach Erreichen der Schwelle abgezogen werden"),
-        ("BL_Auswahl", "NRW", "Bundesland (steuert Feiertage)"),
+        ("BL_Auswahl", bundesland, "Bundesland (steuert Feiertage)"),
         ("Monat_Auswahl", date(2025, 11, 1), "Erster Tag des Zielmonats"),
         ("Variante", 2, "Fix: 2 = streng (WE nur bei Schwelle ≥ 2,0)"),
     ]
-    for param, value, desc in rows:
+
+
+def _bundesland_validation():
+    """Dropdown für BL_Auswahl (alle Bundesländer)."""
+    bl_dv = DataValidation(type="list", formula1=f'"{",".join(BUNDESLAENDER)}"', allow_blank=False)
+    bl_dv.add("B6")
+    return bl_dv
+
+
+def _anteil_validation(max_rows):
+    dv = DataValidation(type="decimal", operator="between", formula1="0", formula2="1", allow_blank=True)
+    dv.add(f"C2:C{max_rows + 1}")
+    return dv
+
+
+def _all_holidays(years):
+    return [
+        holiday
+        for year in years
+        for bundesland in BUNDESLAENDER
+        for holiday in get_holidays(year, bundesland)
+    ]
+
+
+def _populate_rules(ws, bundesland=DEFAULT_BUNDESLAND):
+    headers = ["Parameter", "Wert", "Beschreibung"]
+    ws.append(headers)
+    for param, value, desc in _rules_rows(bundesland):
         ws.append([param, value, desc])
-    
+
+    ws.add_data_validation(_bundesland_validation())
+
     ws.column_dimensions["A"].width = 26
     ws.column_dimensions["B"].width = 18
     ws.column_dimensions["C"].width = 80
     _style_header(ws)
 
 
-def _populate_holidays(ws):
+def _populate_holidays(ws, years):
+    """Fills tblFeiertage with computed holidays of all Bundesländer (formulas filter by BL_Auswahl)."""
     headers = ["Datum", "Name", "BL"]
     ws.append(headers)
     
-    all_holidays = NRW_HOLIDAYS_2025 + NRW_HOLIDAYS_2026
-    for iso_date, name, bl in all_holidays:
-        # Convert ISO string to date object
-        year, month, day = iso_date.split('-')
-        date_obj = date(int(year), int(month), int(day))
-        ws.append([date_obj, name, bl])
+    all_holidays = _all_holidays(years)
+    for holiday_date, name, bl in all_holidays:
+        ws.append([holiday_date, name, bl])
     
     # Create table
-    tab = Table(displayName="tblFeiertage", ref=f"A1:C{len(all_holidays)+1}")
-    style = TableStyleInfo(name="TableStyleMedium9", showFirstColumn=False,
-                          showLastColumn=False, showRowStripes=True, showColumnStripes=False)
-    tab.tableStyleInfo = style
-    ws.add_table(tab)
+    ws.add_table(_table("tblFeiertage", f"A1:C{len(all_holidays)+1}", headers, "TableStyleMedium9"))
     
     ws.column_dimensions["A"].width = 14
     ws.column_dimensions["B"].width = 32
@@ -129,14 +162,19 @@ def _populate_holidays(ws):
         ws[f"A{row}"].number_format = 'DD.MM.YYYY'
 
 
-def _plan_formulas(row: int) -> dict:
+def _plan_formulas(row: int, layout: str = "sumproduct") -> dict:
     """Return helper-column formulas for Plan sheet (Variante 2)."""
     date_cell = f"A{row}"
     anteil_cell = f"C{row}"
     
-    # Holiday range filtered by BL (Non-365 fallback with SUMPRODUCT)
-    holiday_check = f'SUMPRODUCT((tblFeiertage[Datum]={date_cell})*(tblFeiertage[BL]=Regeln!$B$6))>0'
-    vortag_check = f'SUMPRODUCT((tblFeiertage[Datum]={date_cell}+1)*(tblFeiertage[BL]=Regeln!$B$6))>0'
+    if layout == "sumifs":
+        # COUNTIFS uses Excel's criteria matching instead of building arrays
+        holiday_check = f'IF({date_cell}="",FALSE,COUNTIFS(tblFeiertage[Datum],{date_cell},tblFeiertage[BL],Regeln!$B$6)>0)'
+        vortag_check = f'IF({date_cell}="",FALSE,COUNTIFS(tblFeiertage[Datum],{date_cell}+1,tblFeiertage[BL],Regeln!$B$6)>0)'
+    else:
+        # Holiday range filtered by BL (Non-365 fallback with SUMPRODUCT)
+        holiday_check = f'SUMPRODUCT((tblFeiertage[Datum]={date_cell})*(tblFeiertage[BL]=Regeln!$B$6))>0'
+        vortag_check = f'SUMPRODUCT((tblFeiertage[Datum]={date_cell}+1)*(tblFeiertage[BL]=Regeln!$B$6))>0'
     
     return {
         "D": f"=IFERROR({holiday_check},FALSE)",  # Ist_FEIERTAG
@@ -150,31 +188,20 @@ def _plan_formulas(row: int) -> dict:
     }
 
 
-def _populate_plan(ws):
-    headers = [
-        "Datum", "Mitarbeiter", "Anteil",
-        "Ist_FEIERTAG", "Ist_VORTAG", "Ist_Freitag", "Ist_WE_Tag", "Ist_WT_Tag",
-        "WT_Einheit", "WE_Freitag_Einheit", "WE_Andere_Einheit"
-    ]
-    ws.append(headers)
+def _populate_plan(ws, max_rows=MAX_PLAN_ROWS, layout="sumproduct"):
+    ws.append(PLAN_HEADERS)
     _style_header(ws)
 
-    for row in range(2, MAX_PLAN_ROWS + 2):
-        formulas = _plan_formulas(row)
+    for row in range(2, max_rows + 2):
+        formulas = _plan_formulas(row, layout)
         for col_letter, formula in formulas.items():
             ws[f"{col_letter}{row}"] = formula
 
     # Table
-    tab = Table(displayName="tblPlan", ref=f"A1:K{MAX_PLAN_ROWS+1}")
-    style = TableStyleInfo(name="TableStyleMedium2", showFirstColumn=False,
-                          showLastColumn=False, showRowStripes=True, showColumnStripes=False)
-    tab.tableStyleInfo = style
-    ws.add_table(tab)
+    _add_table(ws, _table("tblPlan", f"A1:K{max_rows+1}", PLAN_HEADERS, "TableStyleMedium2"))
 
     # Data validation for Anteil
-    dv = DataValidation(type="decimal", operator="between", formula1="0", formula2="1", allow_blank=True)
-    ws.add_data_validation(dv)
-    dv.add(f"C2:C{MAX_PLAN_ROWS + 1}")
+    ws.add_data_validation(_anteil_validation(max_rows))
 
     ws.column_dimensions["A"].width = 12
     ws.column_dimensions["B"].width = 22
@@ -183,89 +210,77 @@ def _populate_plan(ws):
         ws.column_dimensions[col].width = 13
     
     # Format column A as date
-    for row in range(2, MAX_PLAN_ROWS + 2):
+    for row in range(2, max_rows + 2):
         ws[f"A{row}"].number_format = 'DD.MM.YYYY'
 
 
-def _populate_auswertung(ws):
-    headers = [
-        "Mitarbeiter", "WT_Einheiten", "WE_Freitag", "WE_Andere", "WE_Gesamt",
-        "Schwelle_erreicht", "Abzug_gesamt", "Abzug_Freitag", "Abzug_Andere",
-        "WE_bezahlt", "Auszahlung_WT", "Auszahlung_WE", "Auszahlung_Gesamt"
-    ]
-    ws.append(headers)
-    _style_header(ws)
-
-    # Manual employee list (user fills column A)
-    # Row 2 onwards: formulas reference column A
-    
+def _auswertung_formulas(row: int, layout: str = "sumproduct") -> dict:
+    """Return formulas B..M of one Auswertung row (name in column A)."""
+    name_ref = f"$A{row}"
     monat_start = "Regeln!$B$7"
     monat_end = f"EOMONTH({monat_start},0)"
     
-    # Create formulas for 50 rows
-    for row in range(2, 52):
-        name_ref = f"$A{row}"
-        
-        # Skip if no name
-        guard = f'IF({name_ref}="",""'
-        
-        # WT_Einheiten - using SUMPRODUCT for compatibility
-        wt_formula = (
-            f'={guard},SUMPRODUCT((tblPlan[Mitarbeiter]={name_ref})*'
-            f'(tblPlan[Datum]>={monat_start})*(tblPlan[Datum]<={monat_end})*'
-            f'(tblPlan[WT_Einheit])))'
-        )
-        ws[f"B{row}"] = wt_formula
-        
-        # WE_Freitag
-        we_fri_formula = (
-            f'={guard},SUMPRODUCT((tblPlan[Mitarbeiter]={name_ref})*'
-            f'(tblPlan[Datum]>={monat_start})*(tblPlan[Datum]<={monat_end})*'
-            f'(tblPlan[WE_Freitag_Einheit])))'
-        )
-        ws[f"C{row}"] = we_fri_formula
-        
-        # WE_Andere
-        we_other_formula = (
+    # Skip if no name
+    guard = f'IF({name_ref}="",""'
+
+    def einheiten(column):
+        if layout == "sumifs":
+            return (
+                f'={guard},SUMIFS(tblPlan[{column}],tblPlan[Mitarbeiter],{name_ref},'
+                f'tblPlan[Datum],">="&{monat_start},tblPlan[Datum],"<="&{monat_end}))'
+            )
+        # SUMPRODUCT for compatibility
+        return (
             f'={guard},SUMPRODUCT((tblPlan[Mitarbeiter]={name_ref})*'
             f'(tblPlan[Datum]>={monat_start})*(tblPlan[Datum]<={monat_end})*'
-            f'(tblPlan[WE_Andere_Einheit])))'
+            f'(tblPlan[{column}])))'
         )
-        ws[f"D{row}"] = we_other_formula
-        
-        # WE_Gesamt
-        ws[f"E{row}"] = f'={guard},C{row}+D{row})'
-        
-        # Schwelle_erreicht
-        ws[f"F{row}"] = f'={guard},IF(E{row}>=Regeln!$B$4-0.0001,"JA","NEIN"))'
-        
-        # Abzug_gesamt
-        ws[f"G{row}"] = f'={guard},IF(E{row}>=Regeln!$B$4-0.0001,Regeln!$B$5,0))'
-        
-        # Abzug_Freitag
-        ws[f"H{row}"] = f'={guard},MIN(G{row},C{row}))'
-        
-        # Abzug_Andere
-        ws[f"I{row}"] = f'={guard},MAX(0,G{row}-H{row}))'
-        
+
+    return {
+        "B": einheiten("WT_Einheit"),  # WT_Einheiten
+        "C": einheiten("WE_Freitag_Einheit"),  # WE_Freitag
+        "D": einheiten("WE_Andere_Einheit"),  # WE_Andere
+        "E": f'={guard},C{row}+D{row})',  # WE_Gesamt
+        "F": f'={guard},IF(E{row}>=Regeln!$B$4-0.0001,"JA","NEIN"))',  # Schwelle_erreicht
+        "G": f'={guard},IF(E{row}>=Regeln!$B$4-0.0001,Regeln!$B$5,0))',  # Abzug_gesamt
+        "H": f'={guard},MIN(G{row},C{row}))',  # Abzug_Freitag
+        "I": f'={guard},MAX(0,G{row}-H{row}))',  # Abzug_Andere
         # WE_bezahlt (Variante 2: only if threshold reached)
-        ws[f"J{row}"] = f'={guard},IF(E{row}<Regeln!$B$4-0.0001,0,(C{row}-H{row})+(D{row}-I{row})))'
-        
-        # Auszahlung_WT
-        ws[f"K{row}"] = f'={guard},B{row}*Regeln!$B$2)'
-        
-        # Auszahlung_WE
-        ws[f"L{row}"] = f'={guard},J{row}*Regeln!$B$3)'
-        
-        # Auszahlung_Gesamt
-        ws[f"M{row}"] = f'={guard},K{row}+L{row})'
-
-    widths = [22, 14, 14, 14, 14, 16, 14, 14, 14, 14, 14, 14, 16]
-    for idx, width in enumerate(widths, start=1):
+        "J": f'={guard},IF(E{row}<Regeln!$B$4-0.0001,0,(C{row}-H{row})+(D{row}-I{row})))',
+        "K": f'={guard},B{row}*Regeln!$B$2)',  # Auszahlung_WT
+        "L": f'={guard},J{row}*Regeln!$B$3)',  # Auszahlung_WE
+        "M": f'={guard},K{row}+L{row})',  # Auszahlung_Gesamt
+    }
+
+
+def _populate_auswertung(ws, layout="sumproduct"):
+    ws.append(AUSWERTUNG_HEADERS)
+    _style_header(ws)
+
+    # Manual employee list (user fills column A)
+    # Row 2 onwards: formulas reference column A
+    for row in range(2, MAX_AUSWERTUNG_ROWS + 2):
+        for col_letter, formula in _auswertung_formulas(row, layout).items():
+            ws[f"{col_letter}{row}"] = formula
+
+    for idx, width in enumerate(AUSWERTUNG_WIDTHS, start=1):
         ws.column_dimensions[get_column_letter(idx)].width = width
 
 
-def _populate_checks(ws):
+def _checks_formulas(row: int, layout: str = "sumproduct") -> dict:
+    """Return Checks formulas (sum of Anteil for the date in column A)."""
+    date_ref = f"A{row}"
+    if layout == "sumifs":
+        summe = f'SUMIFS(tblPlan[Anteil],tblPlan[Datum],{date_ref})'
+    else:
+        summe = f'SUMPRODUCT((tblPlan[Datum]={date_ref})*(tblPlan[Anteil]))'
+    return {
+        "B": f'=IF({date_ref}="","",{summe})',
+        "C": f'=IF({date_ref}="","",IF(ABS(B{row}-1)<=0.0001,"OK","FEHLER"))',
+    }
+
+
+def _populate_checks(ws, layout="sumproduct"):
     ws["A1"] = "Datum"
     ws["B1"] = "Summe_Anteile"
     ws["C1"] = "Status"
@@ -273,82 +288,245 @@ def _populate_checks(ws):
     
     # Manual check list - user can add dates to check
     # Formula checks sum of Anteil for each date
-    for row in range(2, 52):
-        date_ref = f"A{row}"
-        ws[f"B{row}"] = f'=IF({date_ref}="","",SUMPRODUCT((tblPlan[Datum]={date_ref})*(tblPlan[Anteil])))'
-        ws[f"C{row}"] = f'=IF({date_ref}="","",IF(ABS(B{row}-1)<=0.0001,"OK","FEHLER"))'
+    for row in range(2, MAX_CHECK_ROWS + 2):
+        for col_letter, formula in _checks_formulas(row, layout).items():
+            ws[f"{col_letter}{row}"] = formula
     
     ws.column_dimensions["A"].width = 14
     ws.column_dimensions["B"].width = 16
     ws.column_dimensions["C"].width = 12
 
 
-def build_template():
-    """Builds the complete Excel template with all sheets and formulas."""
+def _header_cells(ws, headers):
+    """Styled header row for write-only sheets (no cell access after append)."""
+    cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = HEADER_ALIGNMENT
+        cells.append(cell)
+    return cells
+
+
+def _add_table(ws, table):
+    """add_table for write-only sheets; columns are set by _table, so the openpyxl warning does not apply."""
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="In write-only mode you must add table columns manually")
+        ws.add_table(table)
+
+
+def _set_widths(ws, widths):
+    for idx, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(idx)].width = width
+
+
+def _stream_readme(ws):
+    ws.column_dimensions["A"].width = 100
+    title = WriteOnlyCell(ws, value=README_TITLE)
+    title.font = Font(bold=True, size=14)
+    ws.append([title])
+    ws.append([])
+    heading = WriteOnlyCell(ws, value="Kurzregeln")
+    heading.font = Font(bold=True)
+    ws.append([heading])
+    for text in README_RULES:
+        ws.append([text or None])
+
+
+def _stream_rules(ws, bundesland):
+    _set_widths(ws, [26, 18, 80])
+    ws.data_validations.append(_bundesland_validation())
+    ws.append(_header_cells(ws, ["Parameter", "Wert", "Beschreibung"]))
+    for param, value, desc in _rules_rows(bundesland):
+        if isinstance(value, date):
+            value = WriteOnlyCell(ws, value=value)
+            value.number_format = "DD.MM.YYYY"
+        ws.append([param, value, desc])
+
+
+def _stream_holidays(ws, years):
+    headers = ["Datum", "Name", "BL"]
+    _set_widths(ws, [14, 32, 8])
+    ws.append(_header_cells(ws, headers))
+
+    count = 0
+    for holiday_date, name, bl in _all_holidays(years):
+        datum = WriteOnlyCell(ws, value=holiday_date)
+        datum.number_format = 'DD.MM.YYYY'
+        ws.append([datum, name, bl])
+        count += 1
+    _add_table(ws, _table("tblFeiertage", f"A1:C{count+1}", headers, "TableStyleMedium9"))
+
+
+def _stream_plan(ws, max_rows, layout):
+    _set_widths(ws, [12, 22, 10] + [13] * 8)
+    ws.data_validations.append(_anteil_validation(max_rows))
+    ws.append(_header_cells(ws, PLAN_HEADERS))
+
+    # One empty, date-formatted cell is reused for column A: write-only rows
+    # are serialized on append, so the cell is written before it is moved.
+    datum = WriteOnlyCell(ws)
+    datum.number_format = 'DD.MM.YYYY'
+    for row in range(2, max_rows + 2):
+        formulas = _plan_formulas(row, layout)
+        ws.append([datum, None, None, *formulas.values()])
+
+    _add_table(ws, _table("tblPlan", f"A1:K{max_rows+1}", PLAN_HEADERS, "TableStyleMedium2"))
+
+
+def _stream_auswertung(ws, layout):
+    _set_widths(ws, AUSWERTUNG_WIDTHS)
+    ws.append(_header_cells(ws, AUSWERTUNG_HEADERS))
+    for row in range(2, MAX_AUSWERTUNG_ROWS + 2):
+        ws.append([None, *_auswertung_formulas(row, layout).values()])
+
+
+def _stream_checks(ws, layout):
+    _set_widths(ws, [14, 16, 12])
+    ws.append(_header_cells(ws, CHECKS_HEADERS))
+    for row in range(2, MAX_CHECK_ROWS + 2):
+        ws.append([None, *_checks_formulas(row, layout).values()])
+
+
+def _build_sheets(wb, years, bundesland, max_plan_rows, layout):
+    readme_ws = wb.active
+    readme_ws.title = "README"
+    _populate_readme(readme_ws)
+
+    rules_ws = wb.create_sheet("Regeln")
+    _populate_rules(rules_ws, bundesland)
+
+    holiday_ws = wb.create_sheet("Feiertage")
+    _populate_holidays(holiday_ws, years)
+
+    plan_ws = wb.create_sheet("Plan")
+    _populate_plan(plan_ws, max_plan_rows, layout)
+
+    auswertung_ws = wb.create_sheet("Auswertung")
+    _populate_auswertung(auswertung_ws, layout)
+
+    checks_ws = wb.create_sheet("Checks")
+    _populate_checks(checks_ws, layout)
+
+
+def _stream_sheets(wb, years, bundesland, max_plan_rows, layout):
+    """Same sheets as _build_sheets, streamed into a write-only workbook."""
+    _stream_readme(wb.create_sheet("README"))
+    _stream_rules(wb.create_sheet("Regeln"), bundesland)
+    _stream_holidays(wb.create_sheet("Feiertage"), years)
+    _stream_plan(wb.create_sheet("Plan"), max_plan_rows, layout)
+    _stream_auswertung(wb.create_sheet("Auswertung"), layout)
+    _stream_checks(wb.create_sheet("Checks"), layout)
+
+
+def build_template(years=None, bundesland=DEFAULT_BUNDESLAND, output_path=TEMPLATE_PATH,
+                   max_plan_rows=MAX_PLAN_ROWS, formula_layout="sumproduct", fast=False):
+    """
+    Builds the complete Excel template with all sheets and formulas.
+
+    years: holiday years written to 'Feiertage' (default: default_holiday_years()).
+    bundesland: preselected BL_Auswahl.
+    max_plan_rows: number of prepared rows in tblPlan.
+    formula_layout: "sumproduct" (default) or "sumifs" (see FORMULA_LAYOUTS).
+    fast: stream all sheets into a write-only workbook; recommended for
+        large max_plan_rows and for building many templates.
+    """
+    if years is None:
+        years = default_holiday_years()
+    bundesland = normalize_bundesland(bundesland)
+    if formula_layout not in FORMULA_LAYOUTS:
+        raise ValueError(f"Unbekanntes Formel-Layout '{formula_layout}' (erlaubt: {', '.join(FORMULA_LAYOUTS)})")
+    if max_plan_rows < 1:
+        raise ValueError(f"max_plan_rows muss mindestens 1 sein (war {max_plan_rows})")
+    output_path = Path(output_path)
+
     try:
         # Create output directory
         try:
-            TEMPLATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
         except PermissionError:
-            print(f"❌ Fehler: Keine Berechtigung zum Erstellen des Verzeichnisses '{TEMPLATE_PATH.parent}'")
+            print(f"❌ Fehler: Keine Berechtigung zum Erstellen des Verzeichnisses '{output_path.parent}'")
             raise
         except OSError as e:
-            print(f"❌ Fehler beim Erstellen des Verzeichnisses '{TEMPLATE_PATH.parent}': {e}")
+            print(f"❌ Fehler beim Erstellen des Verzeichnisses '{output_path.parent}': {e}")
             raise
 
         # Create workbook
         try:
-            wb = Workbook()
+            wb = Workbook(write_only=fast)
         except Exception as e:
             print(f"❌ Fehler beim Erstellen des Workbooks: {e}")
             raise
 
         try:
-            readme_ws = wb.active
-            readme_ws.title = "README"
-            _populate_readme(readme_ws)
-
-            rules_ws = wb.create_sheet("Regeln")
-            _populate_rules(rules_ws)
-
-            holiday_ws = wb.create_sheet("Feiertage")
-            _populate_holidays(holiday_ws)
-
-            plan_ws = wb.create_sheet("Plan")
-            _populate_plan(plan_ws)
-
-            auswertung_ws = wb.create_sheet("Auswertung")
-            _populate_auswertung(auswertung_ws)
-
-            checks_ws = wb.create_sheet("Checks")
-            _populate_checks(checks_ws)
+            if fast:
+                _stream_sheets(wb, years, bundesland, max_plan_rows, formula_layout)
+            else:
+                _build_sheets(wb, years, bundesland, max_plan_rows, formula_layout)
         except Exception as e:
             print(f"❌ Fehler beim Erstellen der Arbeitsblätter: {e}")
             raise
 
         # Save template
         try:
-            wb.save(TEMPLATE_PATH)
+            wb.save(output_path)
         except PermissionError:
-            print(f"❌ Fehler: Keine Berechtigung zum Speichern der Datei '{TEMPLATE_PATH}'")
+            print(f"❌ Fehler: Keine Berechtigung zum Speichern der Datei '{output_path}'")
             raise
         except OSError as e:
-            print(f"❌ Fehler beim Speichern der Datei '{TEMPLATE_PATH}': {e}")
+            print(f"❌ Fehler beim Speichern der Datei '{output_path}': {e}")
             raise
 
-        return TEMPLATE_PATH
+        return output_path
 
     except Exception as e:
         print(f"❌ Unerwarteter Fehler beim Erstellen der Vorlage: {e}")
         raise
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    """Command line (also `dienstplan build`); returns the exit code."""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Erstellt die Excel-Vorlage (Variante 2 – streng).")
+    parser.add_argument("bundesland", nargs="?", default=DEFAULT_BUNDESLAND,
+                        help=f"Vorausgewähltes Bundesland (Standard: {DEFAULT_BUNDESLAND})")
+    parser.add_argument("jahre", nargs="*", type=int, metavar="JAHR",
+                        help="Feiertagsjahre von bis (Standard: Vorjahr bis +3)")
+    parser.add_argument("--zeilen", type=int, default=MAX_PLAN_ROWS,
+                        help=f"Vorbereitete Zeilen im Blatt 'Plan' (Standard: {MAX_PLAN_ROWS})")
+    parser.add_argument("--formeln", choices=FORMULA_LAYOUTS, default="sumproduct",
+                        help="Formel-Layout: sumproduct (kompatibel) oder sumifs (schnelle Neuberechnung)")
+    parser.add_argument("--schnell", action="store_true",
+                        help="Write-only-Modus (für große Vorlagen und viele Abteilungen)")
+    parser.add_argument("--ausgabe", default=str(TEMPLATE_PATH),
+                        help=f"Zieldatei (Standard: {TEMPLATE_PATH})")
+    args = parser.parse_args(argv)
+
+    cli_years = None
+    if len(args.jahre) == 2:
+        cli_years = range(args.jahre[0], args.jahre[1] + 1)
+    elif args.jahre:
+        parser.error("Jahre als 'von bis' angeben, z. B. 2025 2028")
+
+    start = time.perf_counter()
     try:
-        path = build_template()
-        print(f"✅ Vorlage (Variante 2 – streng) erstellt: {path}")
+        path = build_template(cli_years, args.bundesland, args.ausgabe,
+                              max_plan_rows=args.zeilen, formula_layout=args.formeln, fast=args.schnell)
+        print(f"✅ Vorlage (Variante 2 – streng) erstellt: {path} "
+              f"({args.zeilen} Planzeilen, {args.formeln}, {time.perf_counter() - start:.2f} s)")
+    except ValueError as e:
+        print(f"❌ Fehler: {e}")
+        return 1
     except Exception:
         # Error already printed in build_template
-        import sys
-        sys.exit(1)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
 
+    sys.exit(main(sys.argv[1:]))
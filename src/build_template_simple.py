@@ -7,35 +7,9 @@ from openpyxl import Workbook
 from openpyxl.styles import Alignment, Font, PatternFill, numbers
 from openpyxl.worksheet.datavalidation import DataValidation
 
-TEMPLATE_PATH = Path("templates/Dienstplan_Vorlage_V2_NRW_Simple.xlsx")
-
-NRW_HOLIDAYS_2025 = [
-    (date(2025, 1, 1), "Neujahr", "NRW"),
-    (date(2025, 4, 18), "Karfreitag", "NRW"),
-    (date(2025, 4, 21), "Ostermontag", "NRW"),
-    (date(2025, 5, 1), "Tag der Arbeit", "NRW"),
-    (date(2025, 5, 29), "Christi Himmelfahrt", "NRW"),
-    (date(2025, 6, 9), "Pfingstmontag", "NRW"),
-    (date(2025, 6, 19), "Fronleichnam", "NRW"),
-    (date(2025, 10, 3), "Tag der Deutschen Einheit", "NRW"),
-    (date(2025, 11, 1), "Allerheiligen", "NRW"),
-    (date(2025, 12, 25), "1. Weihnachtstag", "NRW"),
-    (date(2025, 12, 26), "2. Weihnachtstag", "NRW"),
-]
+from feiertage import get_holidays
 
-NRW_HOLIDAYS_2026 = [
-    (date(2026, 1, 1), "Neujahr", "NRW"),
-    (date(2026, 4, 3), "Karfreitag", "NRW"),
-    (date(2026, 4, 6), "Ostermontag", "NRW"),
-    (date(2026, 5, 1), "Tag der Arbeit", "NRW"),
-    (date(2026, 5, 14), "Christi Himmelfahrt", "NRW"),
-    (date(2026, 5, 25), "Pfingstmontag", "NRW"),
-    (date(2026, 6, 4), "Fronleichnam", "NRW"),
-    (date(2026, 10, 3), "Tag der Deutschen Einheit", "NRW"),
-    (date(2026, 11, 1), "Allerheiligen", "NRW"),
-    (date(2026, 12, 25), "1. Weihnachtstag", "NRW"),
-    (date(2026, 12, 26), "2. Weihnachtstag", "NRW"),
-]
+TEMPLATE_PATH = Path("templates/Dienstplan_Vorlage_V2_NRW_Simple.xlsx")
 
 
 def _style_header(ws, row=1):
@@ -49,8 +23,12 @@ def _style_header(ws, row=1):
             cell.alignment = Alignment(horizontal="center", vertical="center")
 
 
-def build_simple_template():
+def build_simple_template(years=None, bundesland="NRW"):
     """Creates a simple template without complex formulas."""
+    if years is None:
+        current = date.today().year
+        years = range(current - 1, current + 4)
+
     TEMPLATE_PATH.parent.mkdir(parents=True, exist_ok=True)
     wb = Workbook()
     
@@ -70,7 +48,7 @@ def build_simple_template():
     holiday_ws = wb.create_sheet("Feiertage")
     holiday_ws.append(["Datum", "Name", "BL"])
     
-    all_holidays = NRW_HOLIDAYS_2025 + NRW_HOLIDAYS_2026
+    all_holidays = [h for year in years for h in get_holidays(year, bundesland)]
     for holiday_date, name, bl in all_holidays:
         # Format date as string for display
         holiday_ws.append([holiday_date.strftime('%d.%m.%Y'), name, bl])
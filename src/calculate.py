@@ -1,61 +1,155 @@
 """
 Berechnet die Vergütung aus der Plan-Datei nach NRW-Regeln (Variante 2)
+
+openpyxl wird erst beim Lesen oder Schreiben von Excel-Dateien importiert,
+der Prozesspool erst im Batch-Modus; die Berechnung selbst und Snapshots mit
+CSV-Ausgabe brauchen beides nicht.
 """
 
 from pathlib import Path
 from datetime import datetime, timedelta, date
-from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill
+import argparse
+import contextlib
+import csv
+import glob
+import io
+import json
+import math
+import os
 import sys
+import time
 from collections import defaultdict
 
+from auswertung_writer import (
+    OUTPUT_FORMATS, AuswertungWriter, patch_auswertung, update_auswertung_rows, write_auswertung,
+    write_auswertung_file, write_checks, write_jahresuebersicht,
+)
+from datum import EXCEL_EPOCHE, to_date
+from day_calendar import KLASSE_WE_ANDERE, KLASSE_WE_FREITAG, KLASSE_WT, day_classes_for
+from feiertage import holiday_dates, normalize_bundesland
+from plan_text import TEXT_SUFFIXES, is_text_plan
+from profiling import Profiler, count, print_record, stage
+from records import ERGEBNIS_FELDER, PlanEntries, VerguetungResult, ohne_anteil
+from validation import PlanValidator, anteil_summen, check_anteile, gueltiger_anteil
+
 
 # Vergütungssätze
 SATZ_WT = 250  # Euro für Werktag
 SATZ_WE = 450  # Euro für Wochenende
 WE_SCHWELLE = 2.0  # Mindestanzahl WE-Dienste für Vergütung
 ABZUG = 2.0  # Abzug nach Erreichen der Schwelle
+DEFAULT_BUNDESLAND = "NRW"  # Wenn im Blatt 'Regeln' kein BL_Auswahl steht
+
+# Verfügbare Berechnungs-Engines (siehe get_engine)
+ENGINES = ("python", "numpy", "exact")
+
+# Lesewege für .xlsx (siehe read_plan_data)
+READERS = ("openpyxl", "xml")
+
+# Höchstzahl Dateien je Worker-Auftrag beim Batch mit Hintergrund-Speichern
+BATCH_CHUNK_MAX = 8
+
+# Dateien, die --batch <verzeichnis> verarbeitet
+BATCH_SUFFIXES = (".xlsx", ".dpsnap", *TEXT_SUFFIXES)
+
+
+def read_bundesland(wb):
+    """Liest BL_Auswahl aus dem Regeln-Blatt (Standard: NRW)."""
+    if "Regeln" not in wb.sheetnames:
+        return DEFAULT_BUNDESLAND
+
+    for row in wb["Regeln"].iter_rows(min_row=2, max_col=2, values_only=True):
+        if row and row[0] == "BL_Auswahl" and len(row) > 1 and row[1]:
+            try:
+                return normalize_bundesland(row[1])
+            except ValueError as e:
+                print(f"⚠️ Warnung: {e} - verwende {DEFAULT_BUNDESLAND}")
+                return DEFAULT_BUNDESLAND
+
+    return DEFAULT_BUNDESLAND
+
+
+def read_monat(wb):
+    """Liest Monat_Auswahl aus dem Regeln-Blatt als date (erster Tag) oder None."""
+    if "Regeln" not in wb.sheetnames:
+        return None
+
+    for row in wb["Regeln"].iter_rows(min_row=2, max_col=2, values_only=True):
+        if row and row[0] == "Monat_Auswahl" and len(row) > 1 and row[1]:
+            wert = row[1]
+            try:
+                return to_date(wert, wb.epoch).replace(day=1)
+            except (TypeError, ValueError):
+                print(f"⚠️ Warnung: Ungültiger Monat_Auswahl '{wert}' - keine Monatsprüfung")
+                return None
 
+    return None
 
-def load_holidays(wb):
-    """Lädt Feiertage aus dem Feiertage-Blatt."""
+
+def _matches_bundesland(value, bundesland):
+    """Prüft ob ein BL-Eintrag (z. B. 'NRW' oder 'NW') zum gewählten Bundesland gehört."""
+    try:
+        return normalize_bundesland(value) == bundesland
+    except ValueError:
+        return False
+
+
+def load_holidays(wb, bundesland=DEFAULT_BUNDESLAND):
+    """Lädt zusätzliche Feiertage des Bundeslands aus dem Feiertage-Blatt."""
     if "Feiertage" not in wb.sheetnames:
         print("⚠️ Warnung: Blatt 'Feiertage' nicht gefunden. Keine Feiertage geladen")
         return set()
 
     holidays = set()
+    warnungen = 0
 
     try:
         ws = wb["Feiertage"]
 
-        for row_num, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        for row_num, row in enumerate(ws.iter_rows(min_row=2, max_col=3, values_only=True), start=2):
             try:
-                if row[0] and len(row) > 2 and row[2] == "NRW":  # Datum und BL prüfen
+                if row[0] and len(row) > 2 and _matches_bundesland(row[2], bundesland):  # Datum und BL prüfen
                     date_raw = row[0]
-                    if isinstance(date_raw, str):
-                        try:
-                            parsed_date = datetime.strptime(date_raw, '%d.%m.%Y').date()
-                            holidays.add(parsed_date)
-                        except ValueError as e:
-                            print(f"⚠️ Warnung: Ungültiges Datumsformat in Zeile {row_num}: '{date_raw}' - {e}")
-                            continue
-                    elif isinstance(date_raw, datetime):
-                        holidays.add(date_raw.date())
-                    elif isinstance(date_raw, date):
-                        holidays.add(date_raw)
+                    try:
+                        holidays.add(to_date(date_raw, wb.epoch))
+                    except ValueError as e:
+                        print(f"⚠️ Warnung: Ungültiges Datumsformat in Zeile {row_num}: '{date_raw}' - {e}")
+                        warnungen += 1
+                        continue
+                    except TypeError:
+                        continue  # z. B. Wahrheitswert, wie bisher ignoriert
             except IndexError:
                 print(f"⚠️ Warnung: Unvollständige Zeile {row_num} im Feiertage-Blatt übersprungen")
+                warnungen += 1
                 continue
             except Exception as e:
                 print(f"⚠️ Warnung: Fehler beim Verarbeiten von Zeile {row_num}: {e}")
+                warnungen += 1
                 continue
     except Exception as e:
         print(f"❌ Fehler beim Laden der Feiertage: {e}")
         return set()
 
+    count("feiertage_blatt", len(holidays))
+    count("warnungen", warnungen)
     return holidays
 
 
+def calculation_holidays(plan_data, bundesland=DEFAULT_BUNDESLAND, sheet_holidays=()):
+    """
+    Feiertage für die Berechnung: berechnete gesetzliche Feiertage aller
+    Planjahre (plus Folgejahr für den Vortag am 31.12.) und zusätzlich
+    Einträge aus dem Feiertage-Blatt.
+
+    Heiligabend und Silvester zählen nur, wenn sie im Blatt (bzw. in der
+    Feiertage-Datei) stehen – unabhängig vom Jahr und davon, wann die
+    Vorlage erzeugt wurde (siehe feiertage.py).
+    """
+    years = {eintrag[0].year for eintrag in plan_data}
+    years |= {year + 1 for year in years}
+    return holiday_dates(years, bundesland) | set(sheet_holidays)
+
+
 def is_we_tag(datum, holidays):
     """Prüft ob ein Datum ein WE-Tag ist (Fr/Sa/So/Feiertag/Vortag)."""
     if isinstance(datum, datetime):
@@ -85,8 +179,13 @@ def is_freitag(datum):
     return datum.weekday() == 4
 
 
-def calculate_verguetung(plan_data, holidays):
-    """Berechnet Vergütung je Mitarbeiter. Anteil wird automatisch berechnet."""
+def calculate_verguetung(plan_data, holidays, bundesland="NRW", mitarbeiter_filter=None):
+    """
+    Berechnet Vergütung je Mitarbeiter. Anteil wird automatisch berechnet.
+
+    mitarbeiter_filter (optional) beschränkt die Ergebnisse auf diese
+    Mitarbeiter; die Anteile zählen weiterhin alle Einträge eines Tages.
+    """
     
     # Gruppiere nach Datum und zähle Mitarbeiter
     dienste_pro_tag = defaultdict(list)
@@ -94,87 +193,530 @@ def calculate_verguetung(plan_data, holidays):
         if mitarbeiter:
             dienste_pro_tag[datum].append(mitarbeiter)
     
-    # Sammle Daten je Mitarbeiter
-    mitarbeiter_data = defaultdict(lambda: {
-        'wt_einheiten': 0.0,
-        'we_freitag': 0.0,
-        'we_andere': 0.0
-    })
+    # Einheiten je Mitarbeiter als [wt, we_freitag, we_andere], Index = Tagesklasse
+    mitarbeiter_data = {}
+    
+    # Tagesklasse einmal je Datum aus dem vorberechneten Kalender
+    klassen = day_classes_for(dienste_pro_tag, holidays, bundesland)
     
     # Berechne Anteile automatisch
-    for datum, mitarbeiter_liste in dienste_pro_tag.items():
+    for (datum, mitarbeiter_liste), klasse in zip(dienste_pro_tag.items(), klassen):
         anzahl = len(mitarbeiter_liste)
         anteil = 1.0 / anzahl if anzahl > 0 else 0
         
         for mitarbeiter in mitarbeiter_liste:
-            if is_we_tag(datum, holidays):
-                if is_freitag(datum):
-                    mitarbeiter_data[mitarbeiter]['we_freitag'] += anteil
-                else:
-                    mitarbeiter_data[mitarbeiter]['we_andere'] += anteil
-            else:
-                mitarbeiter_data[mitarbeiter]['wt_einheiten'] += anteil
+            if mitarbeiter_filter is None or mitarbeiter in mitarbeiter_filter:
+                einheiten = mitarbeiter_data.get(mitarbeiter)
+                if einheiten is None:
+                    einheiten = mitarbeiter_data[mitarbeiter] = [0.0, 0.0, 0.0]
+                einheiten[klasse] += anteil
     
     # Berechne Vergütung
     results = []
     
-    for mitarbeiter, data in sorted(mitarbeiter_data.items()):
-        wt = data['wt_einheiten']
-        we_fri = data['we_freitag']
-        we_other = data['we_andere']
-        we_gesamt = we_fri + we_other
-        
-        # Schwelle erreicht?
-        schwelle_erreicht = we_gesamt >= (WE_SCHWELLE - 0.0001)
-        
-        if schwelle_erreicht:
-            # Abzug von 1.0 WE-Einheit (Freitag zuerst)
-            abzug_freitag = min(ABZUG, we_fri)
-            abzug_andere = max(0, ABZUG - abzug_freitag)
+    for mitarbeiter, einheiten in sorted(mitarbeiter_data.items()):
+        results.append(build_result(
+            mitarbeiter, einheiten[KLASSE_WT], einheiten[KLASSE_WE_FREITAG], einheiten[KLASSE_WE_ANDERE]
+        ))
+    
+    return results
 
-            # Bezahlte WE-Einheiten
-            we_bezahlt = (we_fri - abzug_freitag) + (we_other - abzug_andere)
 
-            # Auszahlungen - nur wenn Schwelle erreicht
-            auszahlung_wt = wt * SATZ_WT
-            auszahlung_we = we_bezahlt * SATZ_WE
-        else:
-            # Schwelle nicht erreicht - kein Bonus (weder WT noch WE)
-            abzug_freitag = 0
-            abzug_andere = 0
-            we_bezahlt = 0
-            auszahlung_wt = 0
-            auszahlung_we = 0
-
-        auszahlung_gesamt = auszahlung_wt + auszahlung_we
-        
-        results.append({
-            'mitarbeiter': mitarbeiter,
-            'wt_einheiten': wt,
-            'we_freitag': we_fri,
-            'we_andere': we_other,
-            'we_gesamt': we_gesamt,
-            'schwelle_erreicht': 'JA' if schwelle_erreicht else 'NEIN',
-            'abzug_freitag': abzug_freitag,
-            'abzug_andere': abzug_andere,
-            'we_bezahlt': we_bezahlt,
-            'auszahlung_wt': auszahlung_wt,
-            'auszahlung_we': auszahlung_we,
-            'auszahlung_gesamt': auszahlung_gesamt
-        })
+def build_result(mitarbeiter, wt, we_fri, we_other):
+    """Wendet Schwelle, Abzug und Sätze auf die Einheiten eines Mitarbeiters an (VerguetungResult)."""
+    we_gesamt = we_fri + we_other
+    
+    # Schwelle erreicht?
+    schwelle_erreicht = we_gesamt >= (WE_SCHWELLE - 0.0001)
+    
+    if schwelle_erreicht:
+        # Abzug von 1.0 WE-Einheit (Freitag zuerst)
+        abzug_freitag = min(ABZUG, we_fri)
+        abzug_andere = max(0, ABZUG - abzug_freitag)
+
+        # Bezahlte WE-Einheiten
+        we_bezahlt = (we_fri - abzug_freitag) + (we_other - abzug_andere)
+
+        # Auszahlungen - nur wenn Schwelle erreicht
+        auszahlung_wt = wt * SATZ_WT
+        auszahlung_we = we_bezahlt * SATZ_WE
+    else:
+        # Schwelle nicht erreicht - kein Bonus (weder WT noch WE)
+        abzug_freitag = 0
+        abzug_andere = 0
+        we_bezahlt = 0
+        auszahlung_wt = 0
+        auszahlung_we = 0
+
+    auszahlung_gesamt = auszahlung_wt + auszahlung_we
     
+    return VerguetungResult(
+        mitarbeiter=mitarbeiter,
+        wt_einheiten=wt,
+        we_freitag=we_fri,
+        we_andere=we_other,
+        we_gesamt=we_gesamt,
+        schwelle_erreicht='JA' if schwelle_erreicht else 'NEIN',
+        abzug_freitag=abzug_freitag,
+        abzug_andere=abzug_andere,
+        we_bezahlt=we_bezahlt,
+        auszahlung_wt=auszahlung_wt,
+        auszahlung_we=auszahlung_we,
+        auszahlung_gesamt=auszahlung_gesamt,
+    )
+
+
+def plan_monate(plan_data):
+    """Menge der Monate (Jahr, Monat), die der Plan berührt."""
+    return {(eintrag[0].year, eintrag[0].month) for eintrag in plan_data}
+
+
+def has_explicit_anteile(plan_data):
+    """Prüft ob Plan-Einträge (datum, mitarbeiter, anteil) mindestens einen eingetragenen Anteil haben."""
+    return any(len(eintrag) > 2 and eintrag[2] is not None for eintrag in plan_data)
+
+
+def accumulate_monate(plan_data, holidays, bundesland="NRW", summen=None, mitarbeiter_filter=None):
+    """
+    Summiert die Einheiten je (Mitarbeiter, (Jahr, Monat)) in einem Durchlauf.
+
+    Die Anteile werden wie in calculate_verguetung je Datum innerhalb von
+    plan_data bestimmt; Einträge (datum, mitarbeiter, anteil) mit
+    eingetragenem Anteil verwenden diesen. Mit summen (Ergebnis eines früheren Aufrufs) lassen
+    sich mehrere Pläne, z. B. Abteilungsdateien, zusammenführen: die Anteile
+    gelten je Plan, Schwelle und Abzug später je Person und Monat über alle.
+    Gibt {(mitarbeiter, (jahr, monat)): [wt, we_freitag, we_andere]} zurück.
+    """
+    if summen is None:
+        summen = {}
+
+    dienste_pro_tag = defaultdict(list)
+    if plan_data and len(plan_data[0]) > 2:
+        for datum, mitarbeiter, anteil in plan_data:
+            if mitarbeiter:
+                dienste_pro_tag[datum].append((mitarbeiter, anteil))
+    else:
+        for datum, mitarbeiter in plan_data:
+            if mitarbeiter:
+                dienste_pro_tag[datum].append((mitarbeiter, None))
+
+    klassen = day_classes_for(dienste_pro_tag, holidays, bundesland)
+
+    for (datum, dienste), klasse in zip(dienste_pro_tag.items(), klassen):
+        standard = 1.0 / len(dienste)
+        monat = (datum.year, datum.month)
+
+        for mitarbeiter, anteil in dienste:
+            if mitarbeiter_filter is not None and mitarbeiter not in mitarbeiter_filter:
+                continue
+            einheiten = summen.get((mitarbeiter, monat))
+            if einheiten is None:
+                einheiten = summen[(mitarbeiter, monat)] = [0.0, 0.0, 0.0]
+            einheiten[klasse] += standard if anteil is None else anteil
+
+    return summen
+
+
+def build_monats_results(summen):
+    """Wendet Schwelle und Abzug je Mitarbeiter und Monat an (sortiert nach Mitarbeiter, Monat)."""
+    results = []
+    for (mitarbeiter, (jahr, monat)), einheiten in sorted(summen.items()):
+        result = build_result(
+            mitarbeiter, einheiten[KLASSE_WT], einheiten[KLASSE_WE_FREITAG], einheiten[KLASSE_WE_ANDERE]
+        )
+        result.jahr = jahr
+        result.monat = monat
+        results.append(result)
     return results
 
 
-def process_file(filepath):
-    """Verarbeitet die Excel-Datei und schreibt Auswertung."""
+def calculate_verguetung_monate(plan_data, holidays, bundesland="NRW", mitarbeiter_filter=None):
+    """
+    Berechnet Vergütung je Mitarbeiter und Kalendermonat.
+
+    Schwelle und Abzug gelten laut Spezifikation je Person und Monat; für
+    Pläne über mehrere Monate liefert diese Engine daher ein Ergebnis je
+    (Mitarbeiter, Monat) mit den zusätzlichen Feldern 'jahr' und 'monat'.
+    Für einen einzelnen Monat sind die Werte identisch mit
+    calculate_verguetung.
+    """
+    return build_monats_results(
+        accumulate_monate(plan_data, holidays, bundesland, mitarbeiter_filter=mitarbeiter_filter)
+    )
+
+
+# Felder, die combine_monate über die Monate eines Mitarbeiters summiert
+MONATS_SUMMEN_FELDER = (
+    'wt_einheiten', 'we_freitag', 'we_andere', 'we_gesamt', 'abzug_freitag', 'abzug_andere',
+    'we_bezahlt', 'auszahlung_wt', 'auszahlung_we', 'auszahlung_gesamt',
+)
+
+
+def combine_monate(monats_results):
+    """
+    Fasst Monatsergebnisse zu einem Ergebnis je Mitarbeiter zusammen.
+
+    Einheiten, Abzüge und Auszahlungen werden summiert; Schwelle_erreicht
+    ist 'JA', wenn sie in mindestens einem Monat erreicht wurde.
+    """
+    combined = {}
+    for result in monats_results:
+        gesamt = combined.get(result['mitarbeiter'])
+        if gesamt is None:
+            combined[result['mitarbeiter']] = VerguetungResult(
+                **{feld: result[feld] for feld in ERGEBNIS_FELDER}
+            )
+            continue
+        for feld in MONATS_SUMMEN_FELDER:
+            gesamt[feld] += result[feld]
+        if result['schwelle_erreicht'] == 'JA':
+            gesamt['schwelle_erreicht'] = 'JA'
+
+    return [combined[mitarbeiter] for mitarbeiter in sorted(combined)]
+
+
+def calculate_plan(plan_data, holidays, bundesland="NRW", engine="python"):
+    """
+    Berechnet die Auswertung eines Plans.
+
+    plan_data enthält (datum, mitarbeiter) oder (datum, mitarbeiter, anteil).
+    Liegt der Plan in einem Monat ohne eingetragene Anteile, rechnet die
+    gewählte Engine. Umfasst er mehrere Monate oder sind Anteile
+    eingetragen, rechnet die Monats-Engine (Schwelle und Abzug je Monat,
+    siehe get_monats_engine) und die Auswertung enthält die Summen je
+    Mitarbeiter.
+    Gibt (results, monats_results) zurück; monats_results ist None bei
+    Plänen über einen Monat.
+    """
+    mehrere_monate = len(plan_monate(plan_data)) > 1
+    if mehrere_monate or has_explicit_anteile(plan_data):
+        monats_results = get_monats_engine(engine)(plan_data, holidays, bundesland)
+        return combine_monate(monats_results), monats_results if mehrere_monate else None
+
+    return get_engine(engine)(ohne_anteil(plan_data), holidays, bundesland), None
+
+
+def get_engine(engine="python"):
+    """
+    Liefert die Berechnungsfunktion für die gewählte Engine.
+
+    'python' ist die Referenzimplementierung, 'numpy' die array-basierte
+    Variante aus calculate_numpy (benötigt NumPy, identische Ergebnisse),
+    'exact' die Festkomma-Variante aus calculate_exact (exakte Schwelle,
+    Auszahlungen auf den Cent gerundet).
+    """
+    if engine == "python":
+        return calculate_verguetung
+    if engine == "numpy":
+        from calculate_numpy import calculate_verguetung_numpy
+        return calculate_verguetung_numpy
+    if engine == "exact":
+        from calculate_exact import calculate_verguetung_exact
+        return calculate_verguetung_exact
+    raise ValueError(f"Unbekannte Engine '{engine}' (erlaubt: {', '.join(ENGINES)})")
+
+
+def get_monats_engine(engine="python"):
+    """
+    Liefert die Berechnung je Mitarbeiter und Monat für die gewählte Engine.
+
+    'numpy' rechnet mit calculate_verguetung_monate_numpy (identische
+    Ergebnisse), 'exact' auch hier in Festkomma.
+    """
+    if engine == "numpy":
+        from calculate_numpy import calculate_verguetung_monate_numpy
+        return calculate_verguetung_monate_numpy
+    if engine == "exact":
+        from calculate_exact import calculate_verguetung_monate_exact
+        return calculate_verguetung_monate_exact
+    if engine not in ENGINES:
+        raise ValueError(f"Unbekannte Engine '{engine}' (erlaubt: {', '.join(ENGINES)})")
+    return calculate_verguetung_monate
+
+
+def _read_plan_rows(plan_ws, with_anteil=False, validator=None, epoche=EXCEL_EPOCHE[False]):
+    """
+    Liest Datum und Mitarbeiter aus dem Plan-Blatt als PlanEntries
+    (Einträge (date, str), siehe records.py).
+
+    Mit with_anteil=True wird zusätzlich Spalte C gelesen und
+    (date, str, float|None) geliefert; Anteile außerhalb von (0, 1] zählen
+    wie leere Zellen (validation.gueltiger_anteil). Ein validator (PlanValidator) prüft
+    jede Zeile im selben Durchlauf. Datumswerte wandelt datum.to_date um
+    (auch Text und Seriennummern zur Basis epoche, z. B. wb.epoch).
+    """
+    plan_data = PlanEntries(with_anteil=with_anteil)
+    max_col = 3 if with_anteil or validator is not None else 2
+    zeilen = 0
+    uebersprungen = 0
+
+    for row_num, row in enumerate(plan_ws.iter_rows(min_row=2, max_col=max_col, values_only=True), start=2):
+        zeilen += 1
+        try:
+            if row[0]:  # Wenn Datum vorhanden
+                datum_raw = row[0]
+                mitarbeiter = row[1] if len(row) > 1 else None
+
+                # Parse Datum (date, Text oder Seriennummer)
+                try:
+                    datum = to_date(datum_raw, epoche)
+                except ValueError:
+                    print(f"⚠️ Warnung: Ungültiges Datumsformat in Zeile {row_num}: '{datum_raw}' - übersprungen")
+                    if validator is not None:
+                        validator.ungueltiges_datum(row_num, datum_raw, mitarbeiter)
+                    uebersprungen += 1
+                    continue
+                except TypeError:
+                    print(f"⚠️ Warnung: Unbekannter Datumstyp in Zeile {row_num}: {type(datum_raw)} - übersprungen")
+                    if validator is not None:
+                        validator.ungueltiges_datum(row_num, datum_raw, mitarbeiter)
+                    uebersprungen += 1
+                    continue
+
+                if validator is not None:
+                    validator.add(row_num, datum, mitarbeiter, row[2] if len(row) > 2 else None)
+
+                if mitarbeiter and with_anteil:
+                    plan_data.append(datum, mitarbeiter, gueltiger_anteil(row[2]) if len(row) > 2 else None)
+                elif mitarbeiter:
+                    plan_data.append(datum, mitarbeiter)
+            elif validator is not None and len(row) > 1 and row[1]:
+                validator.datum_fehlt(row_num, row[1])
+        except Exception as e:
+            print(f"⚠️ Warnung: Fehler beim Verarbeiten von Plan-Zeile {row_num}: {e}")
+            uebersprungen += 1
+            continue
+
+    # Zeilen ohne Datum oder Mitarbeiter (z. B. vorbefüllte Tage) zählen nicht als Warnung
+    count("plan_zeilen", zeilen)
+    count("plan_eintraege", len(plan_data))
+    count("plan_uebersprungen", uebersprungen)
+    count("plan_leer", zeilen - len(plan_data) - uebersprungen)
+    count("warnungen", uebersprungen)
+    return plan_data
+
+
+def read_plan_data(filepath, with_anteil=False, validator=None, reader="openpyxl", workers=None):
+    """
+    Liest Feiertage und Plan in einem einzigen schreibgeschützten Durchlauf.
+
+    Die Arbeitsmappe wird im read-only-Modus geöffnet, sodass openpyxl die
+    Zeilen nur streamt und keine Zellobjekte für Formelspalten, Tabellen oder
+    Formatierungen aufbaut. Die Feiertage werden für das Bundesland aus
+    Regeln!BL_Auswahl berechnet und um Einträge des Feiertage-Blatts ergänzt.
+    Mit with_anteil=True enthält plan_data (datum, mitarbeiter, anteil|None).
+    Ein validator (PlanValidator) prüft den Plan beim Lesen; der Monat für
+    die Monatsprüfung kommt aus Regeln!Monat_Auswahl.
+    reader="xml" liest die Blatt-XML direkt (xlsx_reader.py, große
+    Plan-Blätter mit workers Prozessen parallel) statt über openpyxl.
+    Gibt (holidays, plan_data, bundesland) zurück oder None bei Fehlern.
+    """
+    if reader not in READERS:
+        raise ValueError(f"Unbekannter Reader '{reader}' (erlaubt: {', '.join(READERS)})")
 
-    # Load workbook
     try:
-        wb = load_workbook(filepath)
+        with stage("laden"):
+            if reader == "xml":
+                from xlsx_reader import XmlArbeitsmappe
+                wb = XmlArbeitsmappe(filepath, workers)
+            else:
+                from openpyxl import load_workbook
+                wb = load_workbook(filepath, read_only=True, data_only=True)
     except FileNotFoundError:
         print(f"❌ Fehler: Datei '{filepath}' nicht gefunden")
+        return None
+    except PermissionError:
+        print(f"❌ Fehler: Keine Berechtigung zum Lesen der Datei '{filepath}'")
+        return None
+    except Exception as e:
+        print(f"❌ Fehler beim Laden der Datei '{filepath}': {e}")
+        return None
+
+    try:
+        with stage("feiertage"):
+            bundesland = read_bundesland(wb)
+            sheet_holidays = load_holidays(wb, bundesland)
+            if validator is not None:
+                validator.set_monat(read_monat(wb))
+
+        if "Plan" not in wb.sheetnames:
+            print("❌ Blatt 'Plan' nicht gefunden!")
+            return None
+
+        with stage("plan"):
+            plan_data = _read_plan_rows(wb["Plan"], with_anteil, validator, wb.epoch)
+    finally:
+        wb.close()
+
+    with stage("feiertage_berechnen"):
+        holidays = calculation_holidays(plan_data, bundesland, sheet_holidays)
+    return holidays, plan_data, bundesland
+
+
+def read_text_plan_data(filepath, bundesland=DEFAULT_BUNDESLAND, feiertage_path=None, with_anteil=False,
+                        validator=None):
+    """
+    Wie read_plan_data für Pläne als CSV oder JSON-Lines (siehe plan_text.py).
+
+    Ohne Regeln-Blatt kommt das Bundesland aus dem Aufruf; zusätzliche
+    Feiertage (Datum;Name;BL) liest feiertage_path, ebenfalls CSV oder
+    JSON-Lines. Gibt (holidays, plan_data, bundesland) zurück oder None bei Fehlern.
+    """
+    from plan_text import iter_holidays, read_plan_text
+
+    try:
+        bundesland = normalize_bundesland(bundesland)
+    except ValueError as e:
+        print(f"❌ Fehler: {e}")
+        return None
+
+    pfad = feiertage_path
+    try:
+        sheet_holidays = set()
+        if feiertage_path is not None:
+            with stage("feiertage"):
+                for datum, _, bl in iter_holidays(feiertage_path):
+                    if _matches_bundesland(bl, bundesland):
+                        sheet_holidays.add(datum)
+            count("feiertage_blatt", len(sheet_holidays))
+        pfad = filepath
+        with stage("plan"):
+            plan_data = read_plan_text(filepath, with_anteil, validator)
+    except FileNotFoundError:
+        print(f"❌ Fehler: Datei '{pfad}' nicht gefunden")
+        return None
+    except PermissionError:
+        print(f"❌ Fehler: Keine Berechtigung zum Lesen der Datei '{pfad}'")
+        return None
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        print(f"❌ Fehler beim Laden der Datei '{pfad}': {e}")
+        return None
+
+    with stage("feiertage_berechnen"):
+        holidays = calculation_holidays(plan_data, bundesland, sheet_holidays)
+    return holidays, plan_data, bundesland
+
+
+def print_summary(results):
+    """Zeigt die Ergebnisse als Tabelle auf der Konsole."""
+    print(f"\n{'='*70}")
+    print(f"{'Mitarbeiter':<20} {'WT':<8} {'WE':<8} {'Schwelle':<10} {'Gesamt':>10}")
+    print(f"{'='*70}")
+    for r in results:
+        print(f"{r['mitarbeiter']:<20} {r['wt_einheiten']:>6.1f}  {r['we_gesamt']:>6.1f}  {r['schwelle_erreicht']:<10} {r['auszahlung_gesamt']:>9.2f} €")
+    print(f"{'='*70}")
+
+
+def process_snapshot(filepath, output_path=None, engine="python"):
+    """
+    Berechnet die Vergütung direkt aus einem Binär-Snapshot (.dpsnap, siehe snapshot.py).
+
+    Es wird kein XML geparst. Ohne output_path wird die Auswertung in den
+    Snapshot zurückgeschrieben; output_path kann ein Snapshot, eine .xlsx-
+    oder eine .csv-/.jsonl-Datei sein.
+    """
+    from snapshot import Snapshot, write_snapshot
+
+    try:
+        with stage("laden"), Snapshot(filepath) as snap:
+            bundesland = snap.bundesland
+            plan_rows = snap.plan_rows()
+            feiertage = snap.holidays()
+    except FileNotFoundError:
+        print(f"❌ Fehler: Datei '{filepath}' nicht gefunden")
+        return
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Fehler beim Laden des Snapshots '{filepath}': {e}")
         return
+
+    explizit = has_explicit_anteile(plan_rows)
+    count("plan_eintraege", len(plan_rows))
+    with stage("feiertage_berechnen"):
+        sheet_holidays = {datum for datum, _, bl in feiertage if _matches_bundesland(bl, bundesland)}
+        holidays = calculation_holidays(plan_rows, bundesland, sheet_holidays)
+
+    print(f"📅 {len(holidays)} Feiertage geladen ({bundesland})")
+    print(f"📋 {len(plan_rows)} Einträge im Plan{' (mit eingetragenen Anteilen)' if explizit else ''}")
+
+    with stage("checks"):
+        checks = check_anteile(anteil_summen(plan_rows))
+    _print_checks(checks)
+
+    try:
+        with stage("berechnung"):
+            results, monats_results = calculate_plan(plan_rows, holidays, bundesland, engine)
+    except Exception as e:
+        print(f"❌ Fehler bei der Vergütungsberechnung: {e}")
+        return
+    count("mitarbeiter", len(results))
+    _print_monate(monats_results)
+
+    target_path = Path(output_path) if output_path is not None else Path(filepath)
+    try:
+        with stage("speichern"):
+            if target_path.suffix.lower() in (".xlsx", ".csv", ".jsonl"):
+                write_auswertung_file(target_path, results, monats_results, checks if explizit else None)
+            else:
+                # Erst temporär schreiben: der Snapshot kann die Eingabedatei sein
+                tmp_path = target_path.with_name(target_path.name + ".tmp")
+                write_snapshot(tmp_path, plan_rows, feiertage, results, bundesland)
+                os.replace(tmp_path, target_path)
+    except PermissionError:
+        print(f"❌ Fehler: Keine Berechtigung zum Speichern der Datei '{target_path}'")
+        return
+    except OSError as e:
+        print(f"❌ Fehler beim Speichern der Datei '{target_path}': {e}")
+        return
+
+    print(f"\n✅ Auswertung geschrieben: {len(results)} Mitarbeiter")
+    print(f"   Datei: {target_path}")
+    print_summary(results)
+
+    return {
+        'datei': str(target_path),
+        'eintraege': len(plan_rows),
+        'mitarbeiter': len(results),
+        'results': results,
+        'monats_results': monats_results,
+    }
+
+
+def _print_monate(monats_results):
+    if monats_results is not None:
+        monate = {(result['jahr'], result['monat']) for result in monats_results}
+        print(f"📅 Plan umfasst {len(monate)} Monate - Schwelle und Abzug je Mitarbeiter und Monat")
+
+
+# Anzahl der Prüfungsfehler, die process_file einzeln ausgibt (alle stehen im Blatt 'Checks')
+FEHLER_AUSGABE_MAX = 5
+
+
+def _print_checks(checks, fehler=()):
+    tage = [datum for datum, _, status in checks if status == 'FEHLER']
+    if tage:
+        beispiele = ", ".join(datum.strftime('%d.%m.%Y') for datum in tage[:3])
+        print(f"⚠️ Warnung: {len(tage)} Tage mit Summe der Anteile ≠ 1 (z. B. {beispiele})")
+    if fehler:
+        print(f"⚠️ Warnung: {len(fehler)} Fehler in der Plan-Prüfung")
+        for zeile, datum, mitarbeiter, text in fehler[:FEHLER_AUSGABE_MAX]:
+            print(f"   Zeile {zeile}: {text}" + (f" - {mitarbeiter}" if mitarbeiter else ""))
+        if len(fehler) > FEHLER_AUSGABE_MAX:
+            print(f"   ... weitere {len(fehler) - FEHLER_AUSGABE_MAX} im Blatt 'Checks'")
+
+
+def _save_workbook(filepath, writer, results, monats_results, checks, fehler, checks_schreiben, geaendert=None):
+    """
+    Lädt die Arbeitsmappe mit openpyxl, schreibt Auswertung, Jahresübersicht
+    und Checks und übergibt sie writer zum Speichern.
+
+    Mit geaendert werden nur diese Mitarbeiter-Zeilen ersetzt. Gibt das
+    Future des Speicherns zurück, None bei Fehlern.
+    """
+    from openpyxl import load_workbook
+
+    try:
+        with stage("laden_schreiben"):
+            wb = load_workbook(filepath)
     except PermissionError:
         print(f"❌ Fehler: Keine Berechtigung zum Lesen der Datei '{filepath}'")
         return
@@ -182,127 +724,549 @@ def process_file(filepath):
         print(f"❌ Fehler beim Laden der Datei '{filepath}': {e}")
         return
 
+    # Schreibe Auswertung
+    if "Auswertung" not in wb.sheetnames:
+        print("❌ Blatt 'Auswertung' nicht gefunden!")
+        return
+
     try:
-        # Lade Feiertage
-        holidays = load_holidays(wb)
-        print(f"📅 {len(holidays)} Feiertage geladen")
+        with stage("auswertung"):
+            if geaendert is not None:
+                update_auswertung_rows(wb, results, geaendert)
+            else:
+                write_auswertung(wb, results)
+            if monats_results is not None:
+                write_jahresuebersicht(wb, monats_results)
+            if checks_schreiben or "Checks" in wb.sheetnames:
+                write_checks(wb, checks, fehler)
+    except Exception as e:
+        print(f"❌ Fehler beim Schreiben der Auswertung: {e}")
+        return
 
-        # Lade Plan-Daten
-        if "Plan" not in wb.sheetnames:
-            print("❌ Blatt 'Plan' nicht gefunden!")
-            return
+    # Save file
+    with stage("speichern"):
+        return writer.save_workbook(wb, filepath)
 
-        plan_ws = wb["Plan"]
-        plan_data = []
 
-        for row_num, row in enumerate(plan_ws.iter_rows(min_row=2, values_only=True), start=2):
-            try:
-                if row[0]:  # Wenn Datum vorhanden
-                    datum_raw = row[0]
-                    mitarbeiter = row[1] if len(row) > 1 else None
-
-                    # Parse Datum (kann String oder date sein)
-                    if isinstance(datum_raw, str):
-                        try:
-                            datum = datetime.strptime(datum_raw, '%d.%m.%Y').date()
-                        except ValueError as e:
-                            print(f"⚠️ Warnung: Ungültiges Datumsformat in Zeile {row_num}: '{datum_raw}' - übersprungen")
-                            continue
-                    elif isinstance(datum_raw, datetime):
-                        datum = datum_raw.date()
-                    elif isinstance(datum_raw, date):
-                        datum = datum_raw
-                    else:
-                        print(f"⚠️ Warnung: Unbekannter Datumstyp in Zeile {row_num}: {type(datum_raw)} - übersprungen")
-                        continue
+def process_file(filepath, output_path=None, engine="python", incremental=False, writer=None,
+                 bundesland=DEFAULT_BUNDESLAND, feiertage_path=None, reader="openpyxl", reader_workers=None):
+    """
+    Verarbeitet die Excel-Datei und schreibt Auswertung.
 
-                    if mitarbeiter:
-                        plan_data.append((datum, mitarbeiter))
-            except Exception as e:
-                print(f"⚠️ Warnung: Fehler beim Verarbeiten von Plan-Zeile {row_num}: {e}")
-                continue
+    Plan und Feiertage werden zuerst schreibgeschützt gestreamt. Ohne
+    output_path werden danach nur die Blätter Auswertung und Checks im
+    ZIP-Archiv ersetzt (patch_auswertung); muss ein Blatt neu angelegt
+    werden (Jahresübersicht), wird die Datei einmal mit openpyxl geladen
+    und gespeichert;
+    mit output_path wird die Auswertung in eine separate Datei geschrieben
+    und die Eingabedatei bleibt unverändert. engine wählt die
+    Berechnungs-Engine (siehe get_engine), reader und reader_workers den
+    Leseweg für .xlsx (siehe read_plan_data).
+
+    Mit incremental=True werden nur Mitarbeiter mit geänderten Plan-Einträgen
+    neu berechnet und nur ihre Zeilen der Auswertung ersetzt (auch beim
+    direkten Schreiben im ZIP-Archiv); der Ergebnis-Cache liegt in einer
+    Sidecar-Datei neben der Plan-Datei (siehe incremental.py).
 
-        print(f"📋 {len(plan_data)} Einträge im Plan")
+    Binär-Snapshots (.dpsnap) werden ohne XML-Parsing über process_snapshot
+    verarbeitet. Pläne als CSV oder JSON-Lines (plan_text.py) brauchen kein
+    Excel: bundesland und feiertage_path ersetzen dort das Regeln- und das
+    Feiertage-Blatt, und ohne output_path landet die Auswertung im selben
+    Format in <name>_Auswertung.csv bzw. .jsonl neben dem Plan.
+
+    output_path mit Endung .csv (.jsonl) schreibt die Auswertung als CSV
+    (JSON-Lines). writer
+    (AuswertungWriter) übernimmt das Speichern; mit einem Hintergrund-Writer
+    kehrt process_file vor dem Speichern zurück und die Zusammenfassung
+    enthält das Future des Speichervorgangs ('speichern'). Im inkrementellen
+    Modus wird immer auf das Speichern gewartet, damit der Cache nur nach
+    erfolgreichem Schreiben aktualisiert wird.
+
+    Pläne über mehrere Monate werden je Mitarbeiter und Monat bewertet
+    (calculate_plan); zusätzlich entsteht das Blatt Jahresübersicht.
+    Eingetragene Anteile (Spalte C) ersetzen 1 / Anzahl des Tages. Beim
+    Einlesen prüft ein PlanValidator den Plan (validation.py); Ampel und
+    Fehlerliste landen im Blatt Checks (wenn vorhanden, Anteile eingetragen
+    sind oder Fehler gefunden wurden).
+
+    Gibt bei Erfolg eine Zusammenfassung (Datei, Einträge, Ergebnisse) zurück,
+    sonst None.
+    """
+    if Path(filepath).suffix.lower() == ".dpsnap":
+        return process_snapshot(filepath, output_path, engine)
+
+    try:
+        # Lade Feiertage und Plan-Daten (read-only)
+        validator = PlanValidator()
+        if is_text_plan(filepath):
+            loaded = read_text_plan_data(filepath, bundesland, feiertage_path, with_anteil=True, validator=validator)
+            if output_path is None:
+                output_path = Path(filepath).with_name(f"{Path(filepath).stem}_Auswertung{Path(filepath).suffix}")
+        else:
+            loaded = read_plan_data(filepath, with_anteil=True, validator=validator,
+                                    reader=reader, workers=reader_workers)
+        if loaded is None:
+            return
+        holidays, plan_data, bundesland = loaded
+        explizit = has_explicit_anteile(plan_data)
+
+        print(f"📅 {len(holidays)} Feiertage geladen ({bundesland})")
+        print(f"📋 {len(plan_data)} Einträge im Plan{' (mit eingetragenen Anteilen)' if explizit else ''}")
 
         if not plan_data:
             print("⚠️ Warnung: Keine gültigen Plan-Einträge gefunden")
 
+        with stage("checks"):
+            checks = validator.checks()
+        fehler = validator.fehler
+        count("pruefung_fehler", len(fehler))
+        _print_checks(checks, fehler)
+        checks_schreiben = explizit or bool(fehler)
+
+        if incremental and len(plan_monate(plan_data)) > 1:
+            print("⚠️ Warnung: Plan umfasst mehrere Monate - inkrementeller Modus nicht möglich, rechne vollständig")
+            incremental = False
+        elif incremental and explizit:
+            print("⚠️ Warnung: Anteile eingetragen - inkrementeller Modus nicht möglich, rechne vollständig")
+            incremental = False
+
         # Berechne Vergütung
+        geaendert = None
+        layout_unveraendert = False
+        monats_results = None
         try:
-            results = calculate_verguetung(plan_data, holidays)
+            if incremental:
+                import incremental as inc
+
+                with stage("cache_laden"):
+                    kontext = inc.context_hash(holidays, (SATZ_WT, SATZ_WE, WE_SCHWELLE, ABZUG, engine))
+                    cache = inc.load_cache(filepath)
+                with stage("berechnung"):
+                    results, geaendert, prints, layout_unveraendert = inc.calculate_incremental(
+                        ohne_anteil(plan_data),
+                        holidays, bundesland, get_engine(engine), cache, kontext,
+                    )
+                treffer = len(results) - len(geaendert)
+                count("cache_treffer", treffer)
+                quote = treffer / len(results) * 100 if results else 100.0
+                print(f"♻️ Cache: {treffer}/{len(results)} Mitarbeiter unverändert ({quote:.0f} % Treffer)")
+            else:
+                with stage("berechnung"):
+                    results, monats_results = calculate_plan(plan_data, holidays, bundesland, engine)
         except Exception as e:
             print(f"❌ Fehler bei der Vergütungsberechnung: {e}")
             return
+        count("mitarbeiter", len(results))
+        _print_monate(monats_results)
 
-        # Schreibe Auswertung
-        if "Auswertung" not in wb.sheetnames:
-            print("❌ Blatt 'Auswertung' nicht gefunden!")
-            return
+        target_path = output_path if output_path is not None else filepath
+        # Nur geänderte Zeilen ersetzen, wenn Mitarbeiter und Reihenfolge gleich sind
+        teilweise = incremental and output_path is None and layout_unveraendert
+        if writer is None:
+            writer = AuswertungWriter()
+        speichern = None
 
-        try:
-            auswertung_ws = wb["Auswertung"]
-
-            # Lösche alte Daten (ab Zeile 2)
-            auswertung_ws.delete_rows(2, auswertung_ws.max_row)
-
-            # Schreibe neue Daten
-            for idx, result in enumerate(results, start=2):
-                auswertung_ws[f"A{idx}"] = result['mitarbeiter']
-                auswertung_ws[f"B{idx}"] = round(result['wt_einheiten'], 2)
-                auswertung_ws[f"C{idx}"] = round(result['we_freitag'], 2)
-                auswertung_ws[f"D{idx}"] = round(result['we_andere'], 2)
-                auswertung_ws[f"E{idx}"] = round(result['we_gesamt'], 2)
-                auswertung_ws[f"F{idx}"] = result['schwelle_erreicht']
-                auswertung_ws[f"G{idx}"] = round(result['abzug_freitag'], 2)
-                auswertung_ws[f"H{idx}"] = round(result['abzug_andere'], 2)
-                auswertung_ws[f"I{idx}"] = round(result['we_bezahlt'], 2)
-                auswertung_ws[f"J{idx}"] = round(result['auszahlung_wt'], 2)
-                auswertung_ws[f"K{idx}"] = round(result['auszahlung_we'], 2)
-                auswertung_ws[f"L{idx}"] = round(result['auszahlung_gesamt'], 2)
-
-                # Formatierung für Schwelle
-                if result['schwelle_erreicht'] == 'JA':
-                    auswertung_ws[f"F{idx}"].fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                else:
-                    auswertung_ws[f"F{idx}"].fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-        except Exception as e:
-            print(f"❌ Fehler beim Schreiben der Auswertung: {e}")
-            return
+        if output_path is not None:
+            # Auswertung in separate Datei schreiben
+            with stage("speichern"):
+                speichern = writer.write_file(
+                    output_path, results, monats_results, checks if checks_schreiben else None, fehler,
+                )
+        elif teilweise and not geaendert:
+            print("♻️ Keine Änderungen - Auswertung ist aktuell, Datei bleibt unverändert")
+        else:
+            # Auswertung und Checks direkt im ZIP-Archiv ersetzen (xlsx_patch.py);
+            # nur für ein neues Blatt (Jahresübersicht, fehlendes Checks) die
+            # ganze Arbeitsmappe mit openpyxl laden und speichern
+            from xlsx_patch import NichtPatchbar
 
-        # Save file
-        try:
-            wb.save(filepath)
-        except PermissionError:
-            print(f"❌ Fehler: Keine Berechtigung zum Speichern der Datei '{filepath}'")
-            return
-        except OSError as e:
-            print(f"❌ Fehler beim Speichern der Datei '{filepath}': {e}")
-            return
+            patch = None
+            if monats_results is None:
+                try:
+                    with stage("auswertung"):
+                        patch = patch_auswertung(filepath, results, checks, fehler, checks_schreiben,
+                                                 geaendert if teilweise else None)
+                except NichtPatchbar as e:
+                    print(f"🛠️ Direktes Schreiben nicht möglich ({e}) - speichere die ganze Arbeitsmappe")
+                except KeyError:
+                    print("❌ Blatt 'Auswertung' nicht gefunden!")
+                    return
+                except PermissionError:
+                    print(f"❌ Fehler: Keine Berechtigung zum Lesen der Datei '{filepath}'")
+                    return
+                except Exception as e:
+                    print(f"❌ Fehler beim Schreiben der Auswertung: {e}")
+                    return
+
+            if patch is not None:
+                with stage("speichern"):
+                    speichern = writer.save_patch(patch, filepath)
+            else:
+                speichern = _save_workbook(filepath, writer, results, monats_results, checks, fehler,
+                                           checks_schreiben, geaendert if teilweise else None)
+                if speichern is None:
+                    return
+
+        if speichern is not None and (not writer.background or incremental):
+            try:
+                with stage("speichern"):
+                    speichern.result()
+            except PermissionError:
+                print(f"❌ Fehler: Keine Berechtigung zum Speichern der Datei '{target_path}'")
+                return
+            except OSError as e:
+                print(f"❌ Fehler beim Speichern der Datei '{target_path}': {e}")
+                return
+            speichern = None
+
+        if incremental:
+            with stage("cache_speichern"):
+                inc.save_cache(filepath, kontext, prints, results)
 
-        print(f"\n✅ Auswertung geschrieben: {len(results)} Mitarbeiter")
-        print(f"   Datei: {filepath}")
+        if speichern is not None:
+            print(f"\n💾 Auswertung wird im Hintergrund gespeichert: {len(results)} Mitarbeiter")
+        elif teilweise and not geaendert:
+            print(f"\n✅ Auswertung aktuell: {len(results)} Mitarbeiter")
+        elif teilweise:
+            print(f"\n✅ Auswertung aktualisiert: {len(geaendert)} von {len(results)} Mitarbeitern neu geschrieben")
+        else:
+            print(f"\n✅ Auswertung geschrieben: {len(results)} Mitarbeiter")
+        print(f"   Datei: {target_path}")
+
+        print_summary(results)
 
-        # Zeige Zusammenfassung
-        print(f"\n{'='*70}")
-        print(f"{'Mitarbeiter':<20} {'WT':<8} {'WE':<8} {'Schwelle':<10} {'Gesamt':>10}")
-        print(f"{'='*70}")
-        for r in results:
-            print(f"{r['mitarbeiter']:<20} {r['wt_einheiten']:>6.1f}  {r['we_gesamt']:>6.1f}  {r['schwelle_erreicht']:<10} {r['auszahlung_gesamt']:>9.2f} €")
-        print(f"{'='*70}")
+        return {
+            'datei': str(target_path),
+            'eintraege': len(plan_data),
+            'mitarbeiter': len(results),
+            'results': results,
+            'monats_results': monats_results,
+            'speichern': speichern,
+        }
 
     except Exception as e:
         print(f"❌ Unerwarteter Fehler beim Verarbeiten der Datei: {e}")
         return
 
 
-if __name__ == "__main__":
-    if len(sys.argv) >= 2:
-        filepath = Path(sys.argv[1])
+def profile_file(filepath, output_path=None, engine="python", incremental=False,
+                 cprofile_path=None, speicher=False, writer=None, **optionen):
+    """
+    Führt process_file unter einem Profiler aus (siehe profiling.py).
+
+    cprofile_path speichert zusätzlich das vollständige cProfile-Profil,
+    speicher aktiviert tracemalloc. Weitere optionen (bundesland,
+    feiertage_path, reader, reader_workers) gehen an process_file. Gibt (summary, record) zurück.
+    """
+    with Profiler(str(filepath), cprofile=cprofile_path is not None, speicher=speicher) as profiler:
+        summary = process_file(filepath, output_path, engine, incremental, writer, **optionen)
+    if cprofile_path is not None:
+        profiler.dump_cprofile(cprofile_path)
+    return summary, profiler.record
+
+
+def collect_batch_files(spec, suffixes=BATCH_SUFFIXES):
+    """
+    Ermittelt die Eingabedateien für den Batch-Modus (Verzeichnis oder Glob-Muster).
+
+    In einem Verzeichnis zählen Dateien mit einer Endung aus suffixes.
+    Auswertungen, die process_file neben Text-Plänen ablegt
+    (<name>_Auswertung.csv/.jsonl), sind keine Pläne und werden übersprungen.
+    """
+    path = Path(spec)
+    if path.is_dir():
+        files = [
+            f for f in path.iterdir()
+            if f.suffix.lower() in suffixes and not (is_text_plan(f) and f.stem.endswith("_Auswertung"))
+        ]
     else:
-        filepath = Path("output/Dienstplan_2025_11_NRW.xlsx")
-    
+        files = (Path(p) for p in glob.glob(spec, recursive=True))
+
+    # Excel-Sperrdateien (~$...) überspringen
+    return sorted(f for f in files if f.is_file() and not f.name.startswith("~$"))
+
+
+def _batch_output_path(filepath, output_dir, output_format="xlsx"):
+    """Zielpfad der Auswertung im Batch-Modus (None = Eingabedatei überschreiben)."""
+    if output_dir is None:
+        return None
+    return Path(output_dir) / f"{Path(filepath).stem}_Auswertung.{output_format}"
+
+
+def _process_batch_item(filepath, output_dir, engine="python", incremental=False, profile=False,
+                        output_format="xlsx", writer=None, reader="openpyxl",
+                        bundesland=DEFAULT_BUNDESLAND, feiertage_path=None):
+    """
+    Verarbeitet eine Datei im Worker-Prozess.
+
+    Die Konsolenausgabe von process_file wird abgefangen, damit sich die
+    Ausgaben paralleler Worker nicht vermischen; Fehlerzeilen (❌) und die
+    Anzahl der Warnungen (⚠️) landen im Ergebnis. Mit profile=True enthält
+    das Ergebnis zusätzlich den Messdatensatz der Datei ('profil'). Der
+    Reader liest mit einem Prozess, parallel wird hier schon über die Dateien.
+    bundesland und feiertage_path gelten wie in process_file für Text-Pläne.
+
+    Gibt (item, speichern) zurück; speichern ist das Future eines noch
+    laufenden Hintergrund-Speicherns oder None.
+    """
+    buffer = io.StringIO()
+    start = time.perf_counter()
+    record = None
+
+    with contextlib.redirect_stdout(buffer):
+        try:
+            output_path = _batch_output_path(filepath, output_dir, output_format)
+            if profile:
+                summary, record = profile_file(filepath, output_path, engine, incremental, writer=writer,
+                                               bundesland=bundesland, feiertage_path=feiertage_path,
+                                               reader=reader, reader_workers=1)
+            else:
+                summary = process_file(filepath, output_path, engine, incremental, writer,
+                                       bundesland=bundesland, feiertage_path=feiertage_path,
+                                       reader=reader, reader_workers=1)
+        except Exception as e:
+            print(f"❌ Unerwarteter Fehler beim Verarbeiten der Datei: {e}")
+            summary = None
+
+    lines = buffer.getvalue().splitlines()
+    fehler = [line.strip() for line in lines if line.startswith("❌")]
+    if summary is None and not fehler:
+        fehler = ["❌ Verarbeitung abgebrochen (siehe Ausgabe)"]
+
+    item = {
+        'datei': str(filepath),
+        'ok': summary is not None,
+        'eintraege': summary['eintraege'] if summary else 0,
+        'mitarbeiter': summary['mitarbeiter'] if summary else 0,
+        'warnungen': sum(1 for line in lines if line.startswith("⚠️")),
+        'fehler': fehler,
+        'dauer_s': round(time.perf_counter() - start, 3),
+    }
+    if record is not None:
+        item['profil'] = record
+    return item, summary['speichern'] if summary else None
+
+
+def _process_batch_chunk(files, output_dir, engine="python", incremental=False, profile=False,
+                         output_format="xlsx", async_save=False, reader="openpyxl",
+                         bundesland=DEFAULT_BUNDESLAND, feiertage_path=None):
+    """
+    Verarbeitet mehrere Dateien nacheinander in einem Worker-Prozess.
+
+    Mit async_save=True speichert ein Hintergrund-Thread die Auswertung einer
+    Datei, während bereits die nächste eingelesen und berechnet wird.
+    Speicherfehler werden nach Abschluss aller Dateien der jeweiligen Datei
+    zugeordnet.
+    """
+    offen = []
+    with AuswertungWriter(background=async_save) as writer:
+        for filepath in files:
+            offen.append(_process_batch_item(
+                filepath, output_dir, engine, incremental, profile, output_format, writer, reader,
+                bundesland, feiertage_path,
+            ))
+
+    items = []
+    for item, speichern in offen:
+        if speichern is not None:
+            try:
+                speichern.result()
+            except Exception as e:
+                item['ok'] = False
+                item['fehler'].append(f"❌ Fehler beim Speichern der Auswertung: {e}")
+        items.append(item)
+    return items
+
+
+def _sum_stage_times(dateien):
+    """Summiert die Stufenzeiten aller Dateien mit Messdatensatz (Batch mit profile=True)."""
+    stufen = defaultdict(float)
+    for item in dateien:
+        for name, eintrag in item.get('profil', {}).get('stufen', {}).items():
+            stufen[name] += eintrag['dauer_s']
+    return {name: round(dauer, 4) for name, dauer in stufen.items()}
+
+
+def run_batch(spec, workers=None, output_dir=None, engine="python", incremental=False, profile=False,
+              output_format="xlsx", async_save=False, reader="openpyxl",
+              bundesland=DEFAULT_BUNDESLAND, feiertage_path=None):
+    """
+    Verarbeitet viele Plan-Dateien parallel in einem ProcessPoolExecutor.
+
+    spec ist ein Verzeichnis oder Glob-Muster, workers die Anzahl der
+    Prozesse (Standard: Anzahl CPU-Kerne). output_format wählt xlsx oder
+    csv für Auswertungen in output_dir. Mit async_save=True bekommt jeder
+    Worker mehrere Dateien und speichert im Hintergrund (siehe
+    _process_batch_chunk); reader wählt den Leseweg (siehe read_plan_data).
+    Pläne als .csv/.jsonl werden mit bundesland und feiertage_path
+    berechnet; die Feiertage-Datei selbst zählt nicht als Plan.
+    Gibt eine Gesamtzusammenfassung mit Ergebnissen
+    je Datei und Durchsatz (Dateien/s, Zeilen/s) zurück; mit profile=True
+    zusätzlich die summierten Stufenzeiten ('stufen_s').
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    files = collect_batch_files(spec)
+    if feiertage_path is not None:
+        files = [f for f in files if f.resolve() != Path(feiertage_path).resolve()]
+    if not files:
+        print(f"❌ Keine Plan-Dateien gefunden für: {spec}")
+        return None
+
+    if output_dir is not None:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    print(f"🚀 Batch: {len(files)} Dateien mit {workers} Prozessen")
+
+    # Ohne Hintergrund-Speichern eine Datei je Auftrag (feinste Lastverteilung),
+    # sonst mehrere, damit sich Speichern und Berechnen überlappen können
+    chunk_size = min(BATCH_CHUNK_MAX, math.ceil(len(files) / workers)) if async_save else 1
+    chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+
+    start = time.perf_counter()
+    dateien = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_process_batch_chunk, chunk, output_dir, engine, incremental, profile,
+                            output_format, async_save, reader, bundesland, feiertage_path): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            try:
+                items = future.result()
+            except Exception as e:
+                # Worker-Prozess abgestürzt (z. B. BrokenProcessPool)
+                items = [
+                    {
+                        'datei': str(f), 'ok': False, 'eintraege': 0,
+                        'mitarbeiter': 0, 'warnungen': 0, 'dauer_s': 0.0,
+                        'fehler': [f"❌ Worker-Fehler: {e}"],
+                    }
+                    for f in futures[future]
+                ]
+            for item in items:
+                status = "✅" if item['ok'] else "❌"
+                print(f"   {status} {item['datei']} ({item['eintraege']} Einträge, {item['dauer_s']:.2f} s)")
+                dateien.append(item)
+
+    dauer = time.perf_counter() - start
+    dateien.sort(key=lambda item: item['datei'])
+    zeilen = sum(item['eintraege'] for item in dateien)
+    fehlerhaft = [item for item in dateien if not item['ok']]
+
+    summary = {
+        'dateien_gesamt': len(dateien),
+        'dateien_ok': len(dateien) - len(fehlerhaft),
+        'dateien_fehler': len(fehlerhaft),
+        'zeilen_gesamt': zeilen,
+        'dauer_s': round(dauer, 3),
+        'dateien_pro_s': round(len(dateien) / dauer, 2) if dauer > 0 else None,
+        'zeilen_pro_s': round(zeilen / dauer, 1) if dauer > 0 else None,
+        'workers': workers,
+        'dateien': dateien,
+    }
+    if profile:
+        summary['stufen_s'] = _sum_stage_times(dateien)
+
+    print(f"\n{'='*70}")
+    print(f"Batch abgeschlossen: {summary['dateien_ok']}/{summary['dateien_gesamt']} Dateien erfolgreich")
+    print(f"   Dauer: {summary['dauer_s']:.2f} s | {summary['dateien_pro_s']} Dateien/s | {summary['zeilen_pro_s']} Zeilen/s")
+    for item in fehlerhaft:
+        print(f"   ❌ {item['datei']}:")
+        for line in item['fehler']:
+            print(f"      {line}")
+    if profile:
+        stufen = ", ".join(f"{name} {dauer:.2f} s" for name, dauer in summary['stufen_s'].items())
+        print(f"   ⏱️ Stufen (Summe aller Dateien): {stufen}")
+    print(f"{'='*70}")
+
+    return summary
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Berechnet die Vergütung aus Dienstplan-Dateien (NRW, Variante 2).")
+    parser.add_argument("datei", nargs="?", default="output/Dienstplan_2025_11_NRW.xlsx",
+                        help="Plan-Datei .xlsx, Snapshot .dpsnap oder Plan als .csv/.jsonl "
+                             "(Standard: output/Dienstplan_2025_11_NRW.xlsx)")
+    parser.add_argument("--output", help="Auswertung in separate Datei schreiben, .xlsx, .csv oder .jsonl "
+                                         "(im Batch-Modus: Zielverzeichnis)")
+    parser.add_argument("--batch", metavar="VERZEICHNIS|GLOB",
+                        help="Alle passenden Dateien parallel verarbeiten")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Anzahl Worker-Prozesse im Batch-Modus bzw. für --reader xml (Standard: CPU-Kerne)")
+    parser.add_argument("--summary", help="Batch-Zusammenfassung zusätzlich als JSON speichern")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="xlsx",
+                        help="Format der Auswertungen im Batch-Zielverzeichnis (Standard: xlsx)")
+    parser.add_argument("--async-save", action="store_true",
+                        help="Batch: Speichern im Hintergrund-Thread, überlappend mit der nächsten Datei")
+    parser.add_argument("--bundesland", default=DEFAULT_BUNDESLAND,
+                        help="Bundesland für Pläne als .csv/.jsonl, auch im Batch (Excel: Regeln!BL_Auswahl, Standard: NRW)")
+    parser.add_argument("--feiertage", metavar="DATEI",
+                        help="Zusätzliche Feiertage für Pläne als .csv/.jsonl (Datum;Name;BL)")
+    parser.add_argument("--reader", choices=READERS, default="openpyxl",
+                        help="Leseweg für .xlsx (xml: Blatt-XML direkt, große Pläne parallel)")
+    parser.add_argument("--engine", choices=ENGINES, default="python",
+                        help="Berechnungs-Engine (numpy benötigt das Paket numpy, exact rechnet in Festkomma)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Nur geänderte Mitarbeiter neu berechnen (Cache neben der Plan-Datei)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Laufzeit je Stufe und Zeilenzähler ausgeben (im Batch je Datei in der Zusammenfassung)")
+    parser.add_argument("--profile-json", metavar="DATEI",
+                        help="Messdatensatz als JSON speichern (aktiviert --profile)")
+    parser.add_argument("--cprofile", metavar="DATEI",
+                        help="Vollständiges cProfile-Profil speichern (nur Einzeldatei, aktiviert --profile)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Speicher-Peak je Stufe mit tracemalloc messen (langsamer, aktiviert --profile)")
+    args = parser.parse_args(argv)
+    args.profile = args.profile or bool(args.profile_json or args.cprofile or args.tracemalloc)
+    return args
+
+
+def main(argv=None):
+    """Kommandozeile (auch `dienstplan calc`); gibt den Exit-Code zurück."""
+    args = _parse_args(argv)
+
+    if args.batch:
+        if args.cprofile or args.tracemalloc:
+            print("⚠️ Warnung: --cprofile/--tracemalloc gelten nur für Einzeldateien - im Batch nur Stufenzeiten")
+        summary = run_batch(args.batch, args.workers, args.output, args.engine, args.incremental, args.profile,
+                            args.format, args.async_save, args.reader, args.bundesland, args.feiertage)
+        if summary is None:
+            return 1
+        if args.summary:
+            with open(args.summary, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False)
+            print(f"📄 Zusammenfassung gespeichert: {args.summary}")
+        return 0 if summary['dateien_fehler'] == 0 else 1
+
+    filepath = Path(args.datei)
+    output_path = Path(args.output) if args.output else None
+
     if not filepath.exists():
         print(f"❌ Datei nicht gefunden: {filepath}")
-        sys.exit(1)
+        return 1
     
-    process_file(filepath)
+    # process_file meldet Fehler auf der Konsole und liefert dann None
+    if not args.profile:
+        summary = process_file(filepath, output_path, args.engine, args.incremental,
+                               bundesland=args.bundesland, feiertage_path=args.feiertage,
+                               reader=args.reader, reader_workers=args.workers)
+    else:
+        summary, record = profile_file(filepath, output_path, args.engine, args.incremental,
+                                       args.cprofile, args.tracemalloc,
+                                       bundesland=args.bundesland, feiertage_path=args.feiertage,
+                                       reader=args.reader, reader_workers=args.workers)
+        print_record(record)
+        if args.cprofile:
+            print(f"📄 cProfile gespeichert: {args.cprofile}")
+        if args.profile_json:
+            with open(args.profile_json, "w", encoding="utf-8") as f:
+                json.dump(record, f, indent=2, ensure_ascii=False)
+            print(f"📄 Profil gespeichert: {args.profile_json}")
+    return 0 if summary is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
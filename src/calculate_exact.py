@@ -0,0 +1,268 @@
+"""
+Exakte Vergütungsberechnung in Festkomma (Engine 'exact')
+
+Anteile werden als ganze Zahlen in 1/840 Einheiten gezählt (840 ist das
+kgV von 1 bis 8; Aufteilungen auf bis zu 8 Mitarbeiter je Tag sowie auf
+10, 12, 14, 15, 20, … gehen ohne Rest auf). Summen über ein ganzes Jahr
+bleiben damit exakt, Schwelle und Abzug werden ohne Epsilon verglichen.
+Damit das auch bei Aufteilungen außerhalb des Rasters (z. B. 9 Mitarbeiter
+an einem Tag) exakt bleibt, wird dann in der gemeinsamen Einheit
+kgV(840, alle n) gerechnet; eingetragene Anteile außerhalb des Rasters
+gehen exakt als Fraction ein.
+
+Im Normalfall gehen alle Aufteilungen eines Plans im Raster auf
+(kgV(840, alle n) == 840). Dann addiert calculate_verguetung_exact direkt
+840 // n je Eintrag (ohne Zählervektor und ohne Fraction) und liest die
+Tagesklasse im selben Durchlauf aus dem Kalender. Sonst sind die Tage meist
+groß (viele Einträge je Datum); da ganzzahlige Summen nicht von der
+Reihenfolge abhängen, werden die Dienste je (Tagesklasse, n) mit
+collections.Counter gezählt und einmal je Gruppe gewichtet. Beides ist
+mindestens so schnell wie die float-Engine (geprüft in bench_engine.py).
+
+Auszahlungen werden in Cent berechnet und kaufmännisch gerundet (WT und WE
+getrennt, Gesamt = Summe der gerundeten Beträge). Die Ergebnisse haben
+dieselben Felder wie calculate.build_result; Einheiten und Beträge werden
+erst bei der Ausgabe in float umgewandelt.
+"""
+
+from collections import Counter, defaultdict
+from fractions import Fraction
+import math
+import operator
+
+from calculate import ABZUG, SATZ_WE, SATZ_WT, WE_SCHWELLE
+from day_calendar import KLASSE_WE_ANDERE, KLASSE_WE_FREITAG, KLASSE_WT, day_classes_for, get_day_calendar
+from records import VerguetungResult
+
+
+EINHEIT = 840  # Einheiten je voller Dienst
+SCHWELLE_EINHEITEN = round(WE_SCHWELLE * EINHEIT)
+ABZUG_EINHEITEN = round(ABZUG * EINHEIT)
+_CENT_WT = SATZ_WT * 200  # Satz in halben Cent (kaufmännisches Runden)
+_CENT_WE = SATZ_WE * 200
+RASTER_TOLERANZ = 1e-6  # Abstand (in Einheiten), ab dem ein eingetragener Anteil nicht im Raster liegt
+
+
+class _Zaehlraster:
+    """
+    Zählerpositionen und Gewichte für die Tagesbesetzungen eines Plans.
+
+    Ein Zählervektor hat je Tagesklasse einen Block mit einem Zähler je
+    vorkommender Anzahl n; einheiten() gewichtet ihn mit 1/n und gibt
+    [wt, we_freitag, we_andere] als ganze Zahlen in 1/basis zurück.
+    """
+
+    def __init__(self, anzahlen):
+        anzahlen = sorted(anzahlen)
+        self.breite = len(anzahlen)
+        self.position = {n: i for i, n in enumerate(anzahlen)}
+        self.basis = math.lcm(EINHEIT, *anzahlen)
+        self.gewichte = [self.basis // n for n in anzahlen]
+
+    def vektor(self):
+        return [0] * (3 * self.breite)
+
+    def einheiten(self, zaehler):
+        breite = self.breite
+        return [
+            sum(map(operator.mul, zaehler[k * breite:(k + 1) * breite], self.gewichte))
+            for k in (KLASSE_WT, KLASSE_WE_FREITAG, KLASSE_WE_ANDERE)
+        ]
+
+    def zurueckrechnen(self, wert):
+        """Wert in 1/basis als Einheiten von 1/EINHEIT (int, wenn es aufgeht, sonst Fraction)."""
+        if self.basis == EINHEIT:
+            return wert
+        einheiten, rest = divmod(wert * EINHEIT, self.basis)
+        return Fraction(wert * EINHEIT, self.basis) if rest else einheiten
+
+
+def eingetragene_einheiten(anteil):
+    """
+    Eingetragener Anteil (Spalte C) in Einheiten.
+
+    Werte auf dem Raster (0,5; 0,25; 1/3 aus Excel als 0,333333333333333)
+    werden zur ganzen Zahl, alle anderen exakt als Dezimalzahl übernommen
+    (0,3 -> 3/10, nicht der binäre float-Wert).
+    """
+    einheiten = anteil * EINHEIT
+    gerundet = round(einheiten)
+    if abs(einheiten - gerundet) < RASTER_TOLERANZ:
+        return gerundet
+    return Fraction(repr(float(anteil))) * EINHEIT
+
+
+def build_result_exact(mitarbeiter, wt, we_fri, we_other, einheit=EINHEIT):
+    """
+    Wie calculate.build_result, aber mit Einheiten (int/Fraction) und Cent-Beträgen.
+
+    einheit ist die Zähleinheit je voller Dienst (ein Vielfaches von
+    EINHEIT); Schwelle und Abzug werden darauf skaliert.
+    """
+    if not type(wt) is type(we_fri) is type(we_other) is int:
+        # Fraction (eingetragene Anteile außerhalb des Rasters): auf einen
+        # gemeinsamen Nenner bringen, danach rechnet alles in ganzen Zahlen
+        nenner = math.lcm(*(Fraction(wert).denominator for wert in (wt, we_fri, we_other)))
+        wt, we_fri, we_other = (int(wert * nenner) for wert in (wt, we_fri, we_other))
+        einheit *= nenner
+
+    skala = einheit // EINHEIT
+    we_gesamt = we_fri + we_other
+
+    if we_gesamt >= SCHWELLE_EINHEITEN * skala:
+        abzug = ABZUG_EINHEITEN * skala
+        abzug_freitag = min(abzug, we_fri)
+        we_bezahlt = we_gesamt - abzug
+        # Cent kaufmännisch gerundet: floor((einheiten × satz × 100 + einheit / 2) / einheit)
+        cent_wt = (wt * _CENT_WT + einheit) // (2 * einheit)
+        cent_we = (we_bezahlt * _CENT_WE + einheit) // (2 * einheit)
+        return VerguetungResult(
+            mitarbeiter, wt / einheit, we_fri / einheit, we_other / einheit, we_gesamt / einheit, 'JA',
+            abzug_freitag / einheit, (abzug - abzug_freitag) / einheit, we_bezahlt / einheit,
+            cent_wt / 100, cent_we / 100, (cent_wt + cent_we) / 100,
+        )
+
+    # Schwelle nicht erreicht - kein Bonus (weder WT noch WE)
+    return VerguetungResult(
+        mitarbeiter, wt / einheit, we_fri / einheit, we_other / einheit, we_gesamt / einheit, 'NEIN',
+        0, 0, 0, 0, 0, 0,
+    )
+
+
+def calculate_verguetung_exact(plan_data, holidays, bundesland="NRW", mitarbeiter_filter=None):
+    """Berechnet Vergütung je Mitarbeiter in Festkomma (gleiche Schnittstelle wie calculate_verguetung)."""
+    dienste_pro_tag = defaultdict(list)
+    for datum, mitarbeiter in plan_data:
+        if mitarbeiter:
+            dienste_pro_tag[datum].append(mitarbeiter)
+
+    # Gemeinsame Einheit aller Aufteilungen (EINHEIT, wenn alle im Raster aufgehen)
+    basis = math.lcm(EINHEIT, *set(map(len, dienste_pro_tag.values())))
+    mitarbeiter_data = {}
+    gruppen = defaultdict(list)
+    klassen = b""
+    start = 0
+
+    for datum, mitarbeiter_liste in dienste_pro_tag.items():
+        # Tagesklasse direkt aus dem Kalender des Jahres (wie day_classes_for,
+        # aber im selben Durchlauf wie das Aufsummieren)
+        index = datum.toordinal() - start
+        if not 0 <= index < len(klassen):
+            kalender = get_day_calendar(datum.year, holidays, bundesland)
+            klassen, start = kalender.classes, kalender.start_ordinal
+            index = datum.toordinal() - start
+        klasse = klassen[index]
+
+        if basis == EINHEIT:
+            # Normalfall: 840 // n je Eintrag direkt addieren
+            anteil = EINHEIT // len(mitarbeiter_liste)
+            for mitarbeiter in mitarbeiter_liste:
+                if mitarbeiter_filter is None or mitarbeiter in mitarbeiter_filter:
+                    einheiten = mitarbeiter_data.get(mitarbeiter)
+                    if einheiten is None:
+                        einheiten = mitarbeiter_data[mitarbeiter] = [0, 0, 0]
+                    einheiten[klasse] += anteil
+        else:
+            gruppen[(klasse, len(mitarbeiter_liste))].extend(mitarbeiter_liste)
+
+    # Außerhalb des Rasters: Namen je (Tagesklasse, n) einmal zählen und mit
+    # basis // n gewichten; ganzzahlige Summen hängen nicht von der
+    # Reihenfolge ab
+    for (klasse, anzahl), namen in gruppen.items():
+        anteil = basis // anzahl
+        for mitarbeiter, dienste in Counter(namen).items():
+            if mitarbeiter_filter is None or mitarbeiter in mitarbeiter_filter:
+                einheiten = mitarbeiter_data.get(mitarbeiter)
+                if einheiten is None:
+                    einheiten = mitarbeiter_data[mitarbeiter] = [0, 0, 0]
+                einheiten[klasse] += dienste * anteil
+
+    return [
+        build_result_exact(
+            mitarbeiter, einheiten[KLASSE_WT], einheiten[KLASSE_WE_FREITAG], einheiten[KLASSE_WE_ANDERE], basis
+        )
+        for mitarbeiter, einheiten in sorted(mitarbeiter_data.items())
+    ]
+
+
+def accumulate_monate_exact(plan_data, holidays, bundesland="NRW", summen=None, mitarbeiter_filter=None):
+    """
+    Wie calculate.accumulate_monate, aber in Einheiten (int/Fraction).
+
+    Gibt {(mitarbeiter, (jahr, monat)): [wt, we_freitag, we_andere]} in
+    1/EINHEIT zurück; Teilsummen mehrerer Pläne lassen sich wie dort über
+    summen zusammenführen.
+    """
+    if summen is None:
+        summen = {}
+
+    dienste_pro_tag = defaultdict(list)
+    if plan_data and len(plan_data[0]) > 2:
+        for datum, mitarbeiter, anteil in plan_data:
+            if mitarbeiter:
+                dienste_pro_tag[datum].append((mitarbeiter, anteil))
+    else:
+        for datum, mitarbeiter in plan_data:
+            if mitarbeiter:
+                dienste_pro_tag[datum].append((mitarbeiter, None))
+
+    zaehler_data = {}  # (mitarbeiter, monat) -> Zähler für Anteile 1/n
+    eingetragen = {}  # (mitarbeiter, monat) -> [wt, we_freitag, we_andere] direkt addiert
+    raster = _Zaehlraster({len(dienste) for dienste in dienste_pro_tag.values()})
+    klassen = day_classes_for(dienste_pro_tag, holidays, bundesland)
+    # Gehen alle Aufteilungen auf, wird 840 // n direkt addiert (ohne Zähler)
+    ganzzahlig = raster.basis == EINHEIT
+
+    for (datum, dienste), klasse in zip(dienste_pro_tag.items(), klassen):
+        position = klasse * raster.breite + raster.position[len(dienste)]
+        standard = EINHEIT // len(dienste)
+        monat = (datum.year, datum.month)
+
+        for mitarbeiter, anteil in dienste:
+            if mitarbeiter_filter is not None and mitarbeiter not in mitarbeiter_filter:
+                continue
+            if anteil is None and not ganzzahlig:
+                zaehler = zaehler_data.get((mitarbeiter, monat))
+                if zaehler is None:
+                    zaehler = zaehler_data[(mitarbeiter, monat)] = raster.vektor()
+                zaehler[position] += 1
+            else:
+                einheiten = eingetragen.get((mitarbeiter, monat))
+                if einheiten is None:
+                    einheiten = eingetragen[(mitarbeiter, monat)] = [0, 0, 0]
+                einheiten[klasse] += standard if anteil is None else eingetragene_einheiten(anteil)
+
+    for schluessel, zaehler in zaehler_data.items():
+        _addieren(summen, schluessel, [raster.zurueckrechnen(wert) for wert in raster.einheiten(zaehler)])
+    for schluessel, einheiten in eingetragen.items():
+        _addieren(summen, schluessel, einheiten)
+    return summen
+
+
+def _addieren(summen, schluessel, einheiten):
+    ziel = summen.get(schluessel)
+    if ziel is None:
+        summen[schluessel] = einheiten
+    else:
+        for klasse, wert in enumerate(einheiten):
+            ziel[klasse] += wert
+
+
+def build_monats_results_exact(summen):
+    """Wie calculate.build_monats_results für Summen aus accumulate_monate_exact."""
+    results = []
+    for (mitarbeiter, (jahr, monat)), einheiten in sorted(summen.items()):
+        result = build_result_exact(
+            mitarbeiter, einheiten[KLASSE_WT], einheiten[KLASSE_WE_FREITAG], einheiten[KLASSE_WE_ANDERE]
+        )
+        result.jahr = jahr
+        result.monat = monat
+        results.append(result)
+    return results
+
+
+def calculate_verguetung_monate_exact(plan_data, holidays, bundesland="NRW", mitarbeiter_filter=None):
+    """Vergütung je Mitarbeiter und Kalendermonat in Festkomma (wie calculate_verguetung_monate)."""
+    return build_monats_results_exact(
+        accumulate_monate_exact(plan_data, holidays, bundesland, mitarbeiter_filter=mitarbeiter_filter)
+    )
@@ -0,0 +1,194 @@
+"""
+Array-basierte Vergütungsberechnung (NumPy) nach NRW-Regeln (Variante 2)
+
+Liefert exakt dieselben Ergebnisse wie calculate.calculate_verguetung, ersetzt
+aber die Schleife je Plan-Eintrag durch Vektoroperationen:
+
+- Datum als Ordinalzahl und Mitarbeiter als Integer-Code (bei PlanEntries
+  direkt die Spalten, sonst einmal mit np.fromiter kodiert)
+- Gruppieren nach Datum und Anzahl je Datum mit np.bincount über die
+  Ordinalzahlen (ohne Sortieren)
+- Tagesklasse (WT / WE-Freitag / WE-Andere) je Datum per Index aus dem
+  vorberechneten DayCalendar des Jahres
+- Aufsummieren der Anteile mit np.bincount
+
+NumPy ist optional; ohne NumPy bleibt die Python-Engine der Standard.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - abhängig von der Umgebung
+    np = None
+
+from datetime import date
+from operator import itemgetter
+
+from calculate import build_monats_results, build_result
+from day_calendar import KLASSE_WE_ANDERE, KLASSE_WE_FREITAG, KLASSE_WT, get_day_calendar
+from records import PlanEntries
+
+
+_ORDINAL_1970 = date(1970, 1, 1).toordinal()
+
+
+def _spalten(plan_data, mit_anteil=False):
+    """
+    (ordinale, mitarbeiter_idx, namen, anteile) als Arrays; Einträge ohne Mitarbeiter entfallen.
+
+    mitarbeiter_idx verweist in namen (Reihenfolge des ersten Auftretens).
+    anteile (float64, NaN ohne eingetragenen Anteil) nur mit mit_anteil und
+    Einträgen (datum, mitarbeiter, anteil), sonst None.
+    """
+    anteile = None
+    if isinstance(plan_data, PlanEntries):
+        ordinale = np.frombuffer(plan_data.ordinale, dtype=f"i{plan_data.ordinale.itemsize}").astype(np.int64)
+        mitarbeiter_idx = np.frombuffer(plan_data.namen_codes, dtype=f"i{plan_data.namen_codes.itemsize}")
+        namen = plan_data.namen
+        if mit_anteil and plan_data.with_anteil:
+            tabelle = np.array([np.nan if a is None else a for a in plan_data.anteile], dtype=np.float64)
+            anteile = tabelle[np.frombuffer(plan_data.anteil_codes, dtype=f"i{plan_data.anteil_codes.itemsize}")]
+    else:
+        mitarbeiter = list(map(itemgetter(1), plan_data))
+        namen = list(dict.fromkeys(mitarbeiter))
+        codes = {name: code for code, name in enumerate(namen)}
+        ordinale = np.fromiter(
+            map(date.toordinal, map(itemgetter(0), plan_data)), dtype=np.int64, count=len(mitarbeiter)
+        )
+        mitarbeiter_idx = np.fromiter(map(codes.__getitem__, mitarbeiter), dtype=np.int64, count=len(mitarbeiter))
+        if mit_anteil and mitarbeiter and len(plan_data[0]) > 2:
+            anteile = np.fromiter(
+                (np.nan if a is None else a for a in map(itemgetter(2), plan_data)),
+                dtype=np.float64, count=len(mitarbeiter),
+            )
+
+    gueltig = np.fromiter(map(bool, namen), dtype=bool, count=len(namen))
+    if not gueltig.all():
+        maske = gueltig[mitarbeiter_idx]
+        ordinale, mitarbeiter_idx = ordinale[maske], mitarbeiter_idx[maske]
+        if anteile is not None:
+            anteile = anteile[maske]
+    return ordinale, mitarbeiter_idx.astype(np.int64, copy=False), namen, anteile
+
+
+def _tage(ordinale):
+    """
+    Gruppiert nach Datum ohne Sortieren (Ordinalzahlen liegen dicht beieinander).
+
+    Gibt (tage, tag_idx, anzahl) zurück: die belegten Tage aufsteigend, je
+    Eintrag den Index seines Tages und die Anzahl Einträge je Tag.
+    """
+    start = ordinale.min()
+    versatz = ordinale - start
+    anzahl = np.bincount(versatz)
+    belegt = anzahl > 0
+    tag_nr = np.cumsum(belegt) - 1
+    return np.flatnonzero(belegt) + start, tag_nr[versatz], anzahl[belegt]
+
+
+def _reihenfolge(tag_idx, anzahl_tage):
+    """
+    Sortierung der Einträge nach Tagen in Reihenfolge ihres ersten Auftretens.
+
+    Die Python-Engine summiert Datum für Datum in dieser Reihenfolge.
+    bincount addiert in Array-Reihenfolge; stabil danach sortiert sind die
+    Gleitkommasummen damit bitgleich. None, wenn die Einträge bereits so
+    liegen (z. B. nach Datum sortierte Pläne).
+    """
+    if (tag_idx[1:] >= tag_idx[:-1]).all():
+        return None
+    erstes = np.full(anzahl_tage, len(tag_idx))
+    np.minimum.at(erstes, tag_idx, np.arange(len(tag_idx)))
+    rang = np.empty(anzahl_tage, dtype=np.min_scalar_type(anzahl_tage))
+    rang[np.argsort(erstes)] = np.arange(anzahl_tage)
+    return np.argsort(rang[tag_idx], kind="stable")  # Radix-Sort für kleine Integer
+
+
+def _monate(tage):
+    """Monate seit 1970-01 je Ordinalzahl."""
+    return (tage - _ORDINAL_1970).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def _tagesklassen(tage, holidays, bundesland):
+    """Tagesklasse je Ordinalzahl per Index aus dem DayCalendar des jeweiligen Jahres."""
+    jahre = _monate(tage) // 12 + 1970
+    klassen = np.empty(len(tage), dtype=np.int64)
+    for jahr in np.unique(jahre):
+        maske = jahre == jahr
+        kalender = get_day_calendar(int(jahr), holidays, bundesland)
+        klassen[maske] = np.frombuffer(kalender.classes, dtype=np.uint8)[tage[maske] - kalender.start_ordinal]
+    return klassen
+
+
+def calculate_verguetung_numpy(plan_data, holidays, bundesland="NRW", mitarbeiter_filter=None):
+    """Berechnet Vergütung je Mitarbeiter (NumPy-Engine, gleiche Ausgabe wie calculate_verguetung)."""
+    if np is None:
+        raise ImportError("NumPy ist nicht installiert ('pip install numpy') – bitte Engine 'python' verwenden")
+
+    ordinale, mitarbeiter_idx, namen, _ = _spalten(plan_data)
+    if not len(ordinale):
+        return []
+
+    tage, tag_idx, anzahl = _tage(ordinale)
+    anteil = 1.0 / anzahl[tag_idx]
+    schluessel = mitarbeiter_idx * 3 + _tagesklassen(tage, holidays, bundesland)[tag_idx]
+
+    reihenfolge = _reihenfolge(tag_idx, len(tage))
+    if reihenfolge is not None:
+        schluessel, anteil = schluessel[reihenfolge], anteil[reihenfolge]
+
+    summen = np.bincount(schluessel, weights=anteil, minlength=len(namen) * 3).reshape(len(namen), 3)
+    vorhanden = np.bincount(mitarbeiter_idx, minlength=len(namen)) > 0
+
+    results = []
+    for mitarbeiter, code in sorted((namen[code], code) for code in np.flatnonzero(vorhanden).tolist()):
+        if mitarbeiter_filter is not None and mitarbeiter not in mitarbeiter_filter:
+            continue
+        results.append(build_result(
+            mitarbeiter,
+            float(summen[code, KLASSE_WT]),
+            float(summen[code, KLASSE_WE_FREITAG]),
+            float(summen[code, KLASSE_WE_ANDERE]),
+        ))
+
+    return results
+
+
+def calculate_verguetung_monate_numpy(plan_data, holidays, bundesland="NRW", mitarbeiter_filter=None):
+    """
+    Vergütung je Mitarbeiter und Kalendermonat (NumPy-Engine, gleiche Ausgabe
+    wie calculate_verguetung_monate, inkl. eingetragener Anteile).
+    """
+    if np is None:
+        raise ImportError("NumPy ist nicht installiert ('pip install numpy') – bitte Engine 'python' verwenden")
+
+    ordinale, mitarbeiter_idx, namen, anteile = _spalten(plan_data, mit_anteil=True)
+    if not len(ordinale):
+        return []
+
+    tage, tag_idx, anzahl = _tage(ordinale)
+    anteil = 1.0 / anzahl[tag_idx]
+    if anteile is not None:
+        anteil = np.where(np.isnan(anteile), anteil, anteile)
+    monate, monat_idx = np.unique(_monate(tage), return_inverse=True)
+
+    # Eine Gruppe je (Mitarbeiter, Monat), darin die drei Tagesklassen
+    gruppe = mitarbeiter_idx * len(monate) + monat_idx[tag_idx]
+    schluessel = gruppe * 3 + _tagesklassen(tage, holidays, bundesland)[tag_idx]
+
+    reihenfolge = _reihenfolge(tag_idx, len(tage))
+    if reihenfolge is not None:
+        schluessel, anteil = schluessel[reihenfolge], anteil[reihenfolge]
+
+    gruppen = len(namen) * len(monate)
+    summen = np.bincount(schluessel, weights=anteil, minlength=gruppen * 3).reshape(gruppen, 3)
+    vorhanden = np.flatnonzero(np.bincount(gruppe, minlength=gruppen))
+
+    summen_je_monat = {}
+    for code in vorhanden.tolist():
+        mitarbeiter = namen[code // len(monate)]
+        if mitarbeiter_filter is not None and mitarbeiter not in mitarbeiter_filter:
+            continue
+        monat = int(monate[code % len(monate)])
+        summen_je_monat[(mitarbeiter, (1970 + monat // 12, monat % 12 + 1))] = summen[code].tolist()
+
+    return build_monats_results(summen_je_monat)
@@ -0,0 +1,92 @@
+"""
+Datumswerte aus Plan, Feiertagen und Exporten einheitlich umwandeln
+
+Zellen und Exporte liefern Daten in verschiedenen Formen: date/datetime
+(Zellen mit Datumsformat), Text TT.MM.JJJJ (z. B. von fill_and_test.py),
+ISO-Text JJJJ-MM-TT (JSON, Webapp) oder Excel-Seriennummern (Zahlen in
+Zellen ohne Datumsformat, 1900- oder 1904-System der Arbeitsmappe).
+to_date wandelt alle in ein date um.
+
+Ein Plan enthält jedes Datum viele Male, die Ergebnisse werden deshalb je
+Rohwert gemerkt (höchstens CACHE_MAX Einträge). TT.MM.JJJJ wird ohne
+strptime zerlegt; andere Schreibweisen (z. B. 3.11.2025) gehen wie bisher
+über strptime.
+"""
+
+from datetime import date, datetime, timedelta
+
+
+DATUM_FORMAT = '%d.%m.%Y'
+
+# Basis der Seriennummern (workbookPr date1904), gleiche Werte wie openpyxl
+EXCEL_EPOCHE = {False: date(1899, 12, 30), True: date(1904, 1, 1)}
+SERIAL_MAX = 2958465  # 31.12.9999
+
+CACHE_MAX = 65536
+
+_ORDINAL_1900 = EXCEL_EPOCHE[False].toordinal()
+_cache = {}
+
+
+def from_excel(seriennummer, epoche=EXCEL_EPOCHE[False]):
+    """
+    Excel-Seriennummer -> datetime (mit Uhrzeit aus dem Nachkommateil).
+
+    Im 1900-System zählt Excel den 29.02.1900 mit; Nummern davor werden
+    wie in openpyxl um einen Tag verschoben.
+    """
+    if epoche.toordinal() == _ORDINAL_1900 and 0 < seriennummer < 60:
+        seriennummer += 1
+    tage = int(seriennummer)
+    sekunden = round((seriennummer - tage) * 86400, 6)
+    return datetime(epoche.year, epoche.month, epoche.day) + timedelta(days=tage, seconds=sekunden)
+
+
+def _text_to_date(text):
+    text = text.strip()
+    if len(text) == 10 and text.isascii():
+        if text[2] == "." and text[5] == "." and text[:2].isdigit() and text[3:5].isdigit() and text[6:].isdigit():
+            return date(int(text[6:]), int(text[3:5]), int(text[:2]))
+        if text[4] == "-" and text[7] == "-":
+            return date.fromisoformat(text)
+    if "-" in text:
+        return datetime.fromisoformat(text).date()
+    return datetime.strptime(text, DATUM_FORMAT).date()
+
+
+def to_date(wert, epoche=EXCEL_EPOCHE[False]):
+    """
+    Wandelt einen Datumswert in ein date um.
+
+    Erlaubt sind date/datetime, Text TT.MM.JJJJ oder JJJJ-MM-TT (auch mit
+    Uhrzeit) und Excel-Seriennummern zur Basis epoche (date oder datetime,
+    z. B. wb.epoch). ValueError bei ungültigem Text oder Nummern außerhalb
+    1..SERIAL_MAX, TypeError bei anderen Typen.
+    """
+    if isinstance(wert, datetime):
+        return wert.date()
+    if isinstance(wert, date):
+        return wert
+
+    if isinstance(wert, str):
+        schluessel = wert
+    elif isinstance(wert, (int, float)) and not isinstance(wert, bool):
+        schluessel = (wert, epoche.toordinal())
+    else:
+        raise TypeError(f"Unbekannter Datumstyp {type(wert).__name__}")
+
+    ergebnis = _cache.get(schluessel)
+    if ergebnis is not None:
+        return ergebnis
+
+    if isinstance(wert, str):
+        ergebnis = _text_to_date(wert)
+    elif 1 <= wert <= SERIAL_MAX:
+        ergebnis = from_excel(wert, epoche).date()
+    else:
+        raise ValueError(f"Seriennummer {wert} liegt außerhalb von 1..{SERIAL_MAX}")
+
+    if len(_cache) >= CACHE_MAX:
+        _cache.clear()
+    _cache[schluessel] = ergebnis
+    return ergebnis
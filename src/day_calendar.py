@@ -0,0 +1,215 @@
+"""
+Vorberechneter Tageskalender je Jahr und Bundesland
+
+Ein DayCalendar klassifiziert jeden Tag eines Jahres genau einmal
+(Freitag, Sa/So, Feiertag, Vortag eines Feiertags) und legt das Ergebnis in
+einem flachen Byte-Array ab, das über den Tag im Jahr indiziert wird.
+Die Berechnungs-Engines fragen so je Datum nur noch einen Array-Index ab,
+statt Wochentag, Feiertag und Vortag jedes Mal neu zu bestimmen.
+
+Kalender werden im Prozess gemerkt; Kalender mit genau den gesetzlichen
+Feiertagen liegen zusätzlich als kleine Binärdatei (365/366 Bytes, eine je
+Jahr und Bundesland) im Cache-Verzeichnis, damit Batch-Worker und spätere
+Läufe sie wiederverwenden. Das Verzeichnis lässt sich über die
+Umgebungsvariable DIENSTPLAN_CACHE_DIR setzen.
+"""
+
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import hashlib
+import os
+
+from feiertage import holiday_dates
+
+
+# Bit-Flags je Tag
+FREITAG = 1
+WOCHENENDE = 2  # Samstag/Sonntag
+FEIERTAG = 4
+VORTAG = 8  # Tag vor einem Feiertag
+WE_FLAGS = FREITAG | WOCHENENDE | FEIERTAG | VORTAG
+
+# Tagesklassen (gleiche Codes wie in calculate_numpy)
+KLASSE_WT = 0
+KLASSE_WE_FREITAG = 1
+KLASSE_WE_ANDERE = 2
+
+CACHE_DIR = Path(os.environ.get("DIENSTPLAN_CACHE_DIR", Path.home() / ".cache" / "dienstplan")) / "kalender"
+
+MAX_CALENDARS = 256  # Kalender im Speicher des Prozesses
+
+_calendars = {}
+
+
+class DayCalendar:
+    """Klassifikation aller Tage eines Jahres als Byte-Array (Index = Tag im Jahr - 1)."""
+
+    __slots__ = ("year", "bundesland", "start_ordinal", "flags", "classes")
+
+    def __init__(self, year, bundesland, flags):
+        self.year = year
+        self.bundesland = bundesland
+        self.start_ordinal = date(year, 1, 1).toordinal()
+        self.flags = bytes(flags)
+        self.classes = bytes(_klasse_aus_flags(f) for f in self.flags)
+
+    @classmethod
+    def build(cls, year, holidays, bundesland="NRW"):
+        """Berechnet den Kalender aus einer Menge von Feiertagen (date-Objekte)."""
+        start = date(year, 1, 1)
+        days = (date(year + 1, 1, 1) - start).days
+        flags = bytearray(days)
+
+        for offset in range(days):
+            datum = start + timedelta(days=offset)
+            weekday = datum.weekday()
+            flag = 0
+            if weekday == 4:
+                flag |= FREITAG
+            elif weekday >= 5:
+                flag |= WOCHENENDE
+            if datum in holidays:
+                flag |= FEIERTAG
+            if datum + timedelta(days=1) in holidays:
+                flag |= VORTAG
+            flags[offset] = flag
+
+        return cls(year, bundesland, flags)
+
+    def _index(self, datum):
+        if isinstance(datum, datetime):
+            datum = datum.date()
+        index = datum.toordinal() - self.start_ordinal
+        if not 0 <= index < len(self.flags):
+            raise ValueError(f"Datum {datum} liegt nicht im Kalenderjahr {self.year}")
+        return index
+
+    def flags_for(self, datum):
+        """Bit-Flags (FREITAG, WOCHENENDE, FEIERTAG, VORTAG) eines Datums."""
+        return self.flags[self._index(datum)]
+
+    def classify(self, datum):
+        """Tagesklasse eines Datums (KLASSE_WT, KLASSE_WE_FREITAG, KLASSE_WE_ANDERE)."""
+        return self.classes[self._index(datum)]
+
+    def is_we_tag(self, datum):
+        return self.classes[self._index(datum)] != KLASSE_WT
+
+    def is_feiertag(self, datum):
+        return bool(self.flags[self._index(datum)] & FEIERTAG)
+
+    def is_vortag(self, datum):
+        return bool(self.flags[self._index(datum)] & VORTAG)
+
+
+def _klasse_aus_flags(flag):
+    if not flag & WE_FLAGS:
+        return KLASSE_WT
+    if flag & FREITAG:
+        return KLASSE_WE_FREITAG
+    return KLASSE_WE_ANDERE
+
+
+def _relevant(year, holidays):
+    """Für das Jahr relevante Feiertage (inkl. 1.1. des Folgejahres) als sortierte Ordinalzahlen."""
+    first = date(year, 1, 1)
+    last = date(year + 1, 1, 1)
+    return sorted(
+        (h.date() if isinstance(h, datetime) else h).toordinal()
+        for h in holidays
+        if first <= (h.date() if isinstance(h, datetime) else h) <= last
+    )
+
+
+def _holiday_digest(relevant):
+    """Kurzer Hash der relevanten Feiertage (Schlüssel im Speicher des Prozesses)."""
+    return hashlib.sha1(",".join(map(str, relevant)).encode("ascii")).hexdigest()[:16]
+
+
+def _gesetzlich(year, bundesland):
+    """Relevante gesetzliche Feiertage laut feiertage.py, None bei unbekanntem Bundesland."""
+    try:
+        return _relevant(year, holiday_dates((year, year + 1), bundesland))
+    except ValueError:
+        return None
+
+
+def _cache_file(year, bundesland):
+    return CACHE_DIR / f"{year}_{bundesland}.bin"
+
+
+def _load_cached(year, bundesland, relevant):
+    path = _cache_file(year, bundesland)
+    try:
+        flags = path.read_bytes()
+    except OSError:
+        return None
+    if len(flags) != (date(year + 1, 1, 1) - date(year, 1, 1)).days:
+        return None
+    # Passt die Datei nicht mehr zu feiertage.py (geänderte Regeln), neu berechnen
+    start = date(year, 1, 1).toordinal()
+    feiertage = [start + offset for offset, flag in enumerate(flags) if flag & FEIERTAG]
+    if feiertage != [ordinal for ordinal in relevant if ordinal < start + len(flags)]:
+        return None
+    return DayCalendar(year, bundesland, flags)
+
+
+def _store_cached(calendar):
+    path = _cache_file(calendar.year, calendar.bundesland)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(calendar.flags)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Der Datei-Cache ist optional (z. B. schreibgeschütztes Home-Verzeichnis)
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def get_day_calendar(year, holidays, bundesland="NRW"):
+    """
+    Liefert den Kalender für (Jahr, Bundesland) und die übergebenen Feiertage.
+
+    Reihenfolge: Speicher des Prozesses, Datei-Cache, Neuberechnung. Im
+    Speicher enthält der Schlüssel einen Hash der Feiertage, sodass
+    geänderte Feiertagslisten nie einen veralteten Kalender liefern. Auf
+    die Platte kommt nur der Kalender mit den gesetzlichen Feiertagen (eine
+    Datei je Jahr und Bundesland); Kalender mit zusätzlichen Feiertagen aus
+    dem Feiertage-Blatt bleiben im Speicher (höchstens MAX_CALENDARS).
+    """
+    relevant = _relevant(year, holidays)
+    key = (year, bundesland, _holiday_digest(relevant))
+
+    calendar = _calendars.get(key)
+    if calendar is None:
+        gesetzlich = relevant == _gesetzlich(year, bundesland)
+        if gesetzlich:
+            calendar = _load_cached(year, bundesland, relevant)
+        if calendar is None:
+            calendar = DayCalendar.build(year, holidays, bundesland)
+            if gesetzlich:
+                _store_cached(calendar)
+        if len(_calendars) >= MAX_CALENDARS:
+            _calendars.clear()
+        _calendars[key] = calendar
+
+    return calendar
+
+
+def day_classes_for(dates, holidays, bundesland="NRW"):
+    """Tagesklassen für eine Folge von Datumswerten (ein Kalender je Jahr)."""
+    calendars = {}
+    classes = []
+
+    for datum in dates:
+        if isinstance(datum, datetime):
+            datum = datum.date()
+        calendar = calendars.get(datum.year)
+        if calendar is None:
+            calendar = calendars[datum.year] = get_day_calendar(datum.year, holidays, bundesland)
+        classes.append(calendar.classes[datum.toordinal() - calendar.start_ordinal])
+
+    return classes
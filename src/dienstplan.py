@@ -0,0 +1,61 @@
+"""
+Gemeinsame Kommandozeile für alle Werkzeuge
+
+    python src/dienstplan.py calc output/Dienstplan_2025_11_NRW.xlsx
+    python src/dienstplan.py fill 2025 11
+    python src/dienstplan.py build BY 2027 2030
+    python src/dienstplan.py read output/Dienstplan_2025_11_NRW.xlsx
+
+Die Befehle rufen main(argv) der jeweiligen Skripte auf; die Skripte lassen
+sich weiterhin direkt starten. Ein Modul wird erst importiert, wenn sein
+Befehl gewählt ist – die Übersicht (--help) kommt ohne openpyxl aus und
+startet entsprechend schnell (siehe bench_startup.py).
+"""
+
+import importlib
+import sys
+
+
+# Befehl -> (Modul, Beschreibung)
+BEFEHLE = {
+    "calc": ("calculate", "Vergütung berechnen (Datei, Snapshot oder --batch)"),
+    "fill": ("fill_plan_dates", "Monatspläne mit Datumszeilen erstellen (JAHR MONAT oder --from/--to)"),
+    "build": ("build_template", "Vorlage neu erstellen"),
+    "read": ("read_excel", "Inhalt einer Excel-Datei ausgeben"),
+    "jahr": ("jahresuebersicht", "Jahresübersicht über viele Plan-Dateien"),
+    "snapshot": ("snapshot", "Plan in Binär-Snapshot umwandeln und zurück"),
+    "serve": ("service", "Lokaler Berechnungsdienst (HTTP/JSON)"),
+    "webapp": ("webapp_abgleich", "Webapp-Export mit der Python-Berechnung abgleichen"),
+}
+
+
+def print_usage(file=sys.stdout):
+    print("Verwendung: python src/dienstplan.py <befehl> [optionen]", file=file)
+    print("", file=file)
+    print("Befehle:", file=file)
+    for name, (_, beschreibung) in BEFEHLE.items():
+        print(f"  {name:<10} {beschreibung}", file=file)
+    print("", file=file)
+    print("Hilfe zu einem Befehl: python src/dienstplan.py <befehl> --help", file=file)
+
+
+def main(argv=None):
+    """Wählt den Befehl aus argv[0] und gibt den Exit-Code des Befehls zurück."""
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not argv or argv[0] in ("-h", "--help", "help"):
+        print_usage()
+        return 0 if argv else 1
+
+    befehl = BEFEHLE.get(argv[0])
+    if befehl is None:
+        print(f"❌ Unbekannter Befehl: '{argv[0]}'", file=sys.stderr)
+        print_usage(sys.stderr)
+        return 2
+
+    modul = importlib.import_module(befehl[0])
+    return modul.main(argv[1:]) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,154 @@
+"""
+Berechnete gesetzliche Feiertage für alle 16 Bundesländer
+
+Bewegliche Feiertage werden aus dem Osterdatum abgeleitet (gregorianischer
+Kalender), feste und landesspezifische Feiertage aus einer Regeltabelle.
+Ergebnisse werden je (Jahr, Bundesland) zwischengespeichert, sodass Vorlagen
+und Berechnungen für beliebige Jahre ohne gepflegte Listen auskommen.
+
+Bundesland-Kürzel wie im Blatt 'Regeln' (BL_Auswahl); Nordrhein-Westfalen
+heißt im Projekt "NRW" (das amtliche Kürzel "NW" wird ebenfalls akzeptiert).
+
+Heiligabend und Silvester sind keine gesetzlichen Feiertage und werden nicht
+berechnet – weder für die Vorlage noch für die Berechnung. Wer sie als
+WE-Tage führt, trägt sie im Blatt 'Feiertage' (bzw. in der Feiertage-Datei
+oder 'feiertage' des Dienstes) ein; das gilt dann für jedes Jahr und jeden
+Eingabeweg gleich.
+"""
+
+from datetime import date, timedelta
+from functools import lru_cache
+
+
+BUNDESLAENDER = {
+    "BW": "Baden-Württemberg",
+    "BY": "Bayern",
+    "BE": "Berlin",
+    "BB": "Brandenburg",
+    "HB": "Bremen",
+    "HH": "Hamburg",
+    "HE": "Hessen",
+    "MV": "Mecklenburg-Vorpommern",
+    "NI": "Niedersachsen",
+    "NRW": "Nordrhein-Westfalen",
+    "RP": "Rheinland-Pfalz",
+    "SL": "Saarland",
+    "SN": "Sachsen",
+    "ST": "Sachsen-Anhalt",
+    "SH": "Schleswig-Holstein",
+    "TH": "Thüringen",
+}
+
+_ALIASES = {"NW": "NRW"}
+
+ALLE = frozenset(BUNDESLAENDER)
+
+# Feste Feiertage: (Monat, Tag, Name, Bundesländer, erstes Jahr)
+_FESTE_FEIERTAGE = [
+    (1, 1, "Neujahr", ALLE, None),
+    (1, 6, "Heilige Drei Könige", frozenset({"BW", "BY", "ST"}), None),
+    (3, 8, "Internationaler Frauentag", frozenset({"BE"}), 2019),
+    (5, 1, "Tag der Arbeit", ALLE, None),
+    (8, 15, "Mariä Himmelfahrt", frozenset({"SL"}), None),
+    (9, 20, "Weltkindertag", frozenset({"TH"}), 2019),
+    (10, 3, "Tag der Deutschen Einheit", ALLE, 1990),
+    (10, 31, "Reformationstag", frozenset({"BB", "MV", "SN", "ST", "TH"}), None),
+    (11, 1, "Allerheiligen", frozenset({"BW", "BY", "NRW", "RP", "SL"}), None),
+    (12, 25, "1. Weihnachtstag", ALLE, None),
+    (12, 26, "2. Weihnachtstag", ALLE, None),
+]
+
+# Bewegliche Feiertage: (Tage relativ zu Ostersonntag, Name, Bundesländer)
+_BEWEGLICHE_FEIERTAGE = [
+    (-2, "Karfreitag", ALLE),
+    (0, "Ostersonntag", frozenset({"BB"})),
+    (1, "Ostermontag", ALLE),
+    (39, "Christi Himmelfahrt", ALLE),
+    (49, "Pfingstsonntag", frozenset({"BB"})),
+    (50, "Pfingstmontag", ALLE),
+    (60, "Fronleichnam", frozenset({"BW", "BY", "HE", "NRW", "RP", "SL"})),
+]
+
+# Einmalige bzw. später eingeführte Regelungen
+_REFORMATIONSTAG_NORD = frozenset({"HB", "HH", "NI", "SH"})  # seit 2018
+_EINMALIGE_FEIERTAGE = {
+    (2017, 10, 31): ("Reformationstag (500 Jahre)", ALLE),
+    (2020, 5, 8): ("Tag der Befreiung", frozenset({"BE"})),
+    (2025, 5, 8): ("Tag der Befreiung", frozenset({"BE"})),
+}
+
+def normalize_bundesland(bundesland):
+    """Vereinheitlicht ein Bundesland-Kürzel (z. B. 'nw' -> 'NRW')."""
+    code = str(bundesland).strip().upper()
+    code = _ALIASES.get(code, code)
+    if code not in BUNDESLAENDER:
+        raise ValueError(
+            f"Unbekanntes Bundesland '{bundesland}' (erlaubt: {', '.join(sorted(BUNDESLAENDER))})"
+        )
+    return code
+
+
+def easter_sunday(year):
+    """Ostersonntag nach der Gaußschen Osterformel (anonymer gregorianischer Algorithmus)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _buss_und_bettag(year):
+    """Mittwoch vor dem 23. November."""
+    return date(year, 11, 22) - timedelta(days=(date(year, 11, 22).weekday() - 2) % 7)
+
+
+@lru_cache(maxsize=None)
+def _compute_holidays(year, bundesland):
+    holidays = {}
+
+    for month, day, name, laender, ab_jahr in _FESTE_FEIERTAGE:
+        if bundesland in laender and (ab_jahr is None or year >= ab_jahr):
+            holidays[date(year, month, day)] = name
+
+    if bundesland == "MV" and year >= 2023:
+        holidays[date(year, 3, 8)] = "Internationaler Frauentag"
+
+    if bundesland in _REFORMATIONSTAG_NORD and year >= 2018:
+        holidays[date(year, 10, 31)] = "Reformationstag"
+
+    ostern = easter_sunday(year)
+    for offset, name, laender in _BEWEGLICHE_FEIERTAGE:
+        if bundesland in laender:
+            holidays[ostern + timedelta(days=offset)] = name
+
+    if bundesland == "SN":
+        holidays[_buss_und_bettag(year)] = "Buß- und Bettag"
+
+    for (jahr, month, day), (name, laender) in _EINMALIGE_FEIERTAGE.items():
+        if jahr == year and bundesland in laender:
+            holidays[date(year, month, day)] = name
+
+    return tuple((datum, holidays[datum], bundesland) for datum in sorted(holidays))
+
+
+def get_holidays(year, bundesland="NRW"):
+    """
+    Feiertage eines Jahres für ein Bundesland als sortiertes Tupel (Datum, Name, BL).
+
+    Das Ergebnis wird je (Jahr, Bundesland) zwischengespeichert.
+    """
+    return _compute_holidays(int(year), normalize_bundesland(bundesland))
+
+
+def holiday_dates(years, bundesland="NRW"):
+    """Menge aller Feiertagsdaten für mehrere Jahre (z. B. für calculate_verguetung)."""
+    dates = set()
+    for year in years:
+        dates.update(datum for datum, _, _ in get_holidays(year, bundesland))
+    return dates
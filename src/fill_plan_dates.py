@@ -1,20 +1,40 @@
 """
 Füllt das Plan-Blatt automatisch mit allen Datumszeilen eines Monats vor.
 Nutzer muss nur noch Namen + Anteile eintragen.
+
+Für viele Monate (und Abteilungen) auf einmal liest fill_plans_bulk die
+Vorlage nur einmal (xlsx_patch.XlsxPatch) und setzt je Datei nur die
+Datumszellen im Plan und Regeln!B7; alle anderen Teile der Vorlage werden
+unverändert kopiert, die Dateien parallel in Threads geschrieben.
+
+Verwendung:
+    python src/fill_plan_dates.py 2025 11
+    python src/fill_plan_dates.py --from 2026-01 --to 2027-12 --abteilung Chirurgie --abteilung Innere
 """
 
 from pathlib import Path
 from datetime import date, timedelta
-from openpyxl import load_workbook
-from openpyxl.styles import numbers
+import argparse
+import calendar
+import os
+import re
 import sys
 
 
+TEMPLATE = Path("templates/Dienstplan_Vorlage_V2_NRW.xlsx")
+DATUM_FORMAT = 'DD.MM.YYYY'  # Deutsches Datumsformat in Spalte A
+MONAT_ZELLE = "B7"  # Regeln: Monat_Auswahl
+
+_DATEINAME_ZEICHEN = re.compile(r'[\\/:*?"<>|\s]+')  # in Dateinamen nicht erlaubt
+
+
 def fill_plan_with_dates(template_path, output_path, year, month):
     """
     Lädt die Vorlage und füllt Spalte A (Datum) im Plan-Blatt
     mit allen Tagen des angegebenen Monats.
     """
+    from openpyxl import load_workbook
+
     # Validate input parameters
     if not (1 <= month <= 12):
         print(f"❌ Fehler: Ungültiger Monat '{month}'. Monat muss zwischen 1 und 12 liegen")
@@ -42,7 +62,7 @@ def fill_plan_with_dates(template_path, output_path, year, month):
         if "Regeln" in wb.sheetnames:
             regeln_ws = wb["Regeln"]
             # Zeile 7, Spalte B = Monat_Auswahl
-            regeln_ws["B7"] = date(year, month, 1)
+            regeln_ws[MONAT_ZELLE] = date(year, month, 1)
 
         # Plan-Blatt füllen
         if "Plan" not in wb.sheetnames:
@@ -75,7 +95,7 @@ def fill_plan_with_dates(template_path, output_path, year, month):
         while current_date <= end_date:
             cell = plan_ws[f"A{row}"]
             cell.value = current_date
-            cell.number_format = 'DD.MM.YYYY'  # Deutsches Datumsformat
+            cell.number_format = DATUM_FORMAT
             # Spalten B (Mitarbeiter) und C (Anteil) bleiben leer zum Ausfüllen
             current_date += timedelta(days=1)
             row += 1
@@ -99,23 +119,174 @@ def fill_plan_with_dates(template_path, output_path, year, month):
         return
 
 
-if __name__ == "__main__":
-    template = Path("templates/Dienstplan_Vorlage_V2_NRW.xlsx")
-    
-    if len(sys.argv) >= 3:
-        year = int(sys.argv[1])
-        month = int(sys.argv[2])
-    else:
-        # Standard: November 2025
-        year = 2025
-        month = 11
-    
-    output = Path(f"output/Dienstplan_{year}_{month:02d}_NRW.xlsx")
-    output.parent.mkdir(exist_ok=True)
-    
+def output_name(year, month, abteilung=None):
+    """Dateiname eines Monatsplans, z. B. Dienstplan_2026_01_Chirurgie_NRW.xlsx."""
+    if abteilung:
+        return f"Dienstplan_{year}_{month:02d}_{_DATEINAME_ZEICHEN.sub('_', abteilung)}_NRW.xlsx"
+    return f"Dienstplan_{year}_{month:02d}_NRW.xlsx"
+
+
+def month_range(von, bis):
+    """Alle (jahr, monat) von von bis einschließlich bis."""
+    monate = []
+    jahr, monat = von
+    while (jahr, monat) <= bis:
+        monate.append((jahr, monat))
+        jahr, monat = (jahr + 1, 1) if monat == 12 else (jahr, monat + 1)
+    return monate
+
+
+def _monats_zellen(year, month, datum_stil):
+    """Datumszellen A2.. eines Monats für XlsxPatch.set_cells."""
+    from xlsx_patch import Zelle
+
+    tage = calendar.monthrange(year, month)[1]
+    return {
+        f"A{row}": Zelle(date(year, month, tag), datum_stil)
+        for row, tag in enumerate(range(1, tage + 1), start=2)
+    }
+
+
+def fill_plans_bulk(template_path, auftraege, workers=None):
+    """
+    Erzeugt viele Monatspläne aus einer Vorlage, die nur einmal gelesen wird.
+
+    auftraege ist eine Liste von (jahr, monat, output_path). Je Datei werden
+    wie bei fill_plan_with_dates die Tage des Monats in Spalte A des Plans
+    und Monat_Auswahl (Regeln!B7) gesetzt. Vorbereitet wird nacheinander
+    (reine Textersetzung), Komprimieren und Schreiben laufen parallel in
+    workers Threads (Standard: Anzahl CPU-Kerne). Gibt die Liste der
+    geschriebenen Dateien zurück oder None, wenn nichts erzeugt werden kann.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from xlsx_patch import NichtPatchbar, XlsxPatch
+
+    for year, month, _ in auftraege:
+        if not (1 <= month <= 12):
+            print(f"❌ Fehler: Ungültiger Monat '{month}'. Monat muss zwischen 1 und 12 liegen")
+            return None
+        if year < 1900 or year > 2100:
+            print(f"❌ Fehler: Ungültiges Jahr '{year}'. Jahr muss zwischen 1900 und 2100 liegen")
+            return None
+
+    try:
+        vorlage = XlsxPatch(template_path)
+        if "Plan" not in vorlage.sheetnames:
+            print("❌ Blatt 'Plan' nicht gefunden!")
+            return None
+        datum_stil = vorlage.style(zahlenformat=DATUM_FORMAT)
+    except FileNotFoundError:
+        print(f"❌ Fehler: Vorlagendatei '{template_path}' nicht gefunden")
+        return None
+    except PermissionError:
+        print(f"❌ Fehler: Keine Berechtigung zum Lesen der Datei '{template_path}'")
+        return None
+    except NichtPatchbar as e:
+        print(f"❌ Vorlage '{template_path}' lässt sich nicht direkt befüllen ({e}) - "
+              f"bitte einzeln mit JAHR MONAT erstellen")
+        return None
+    except Exception as e:
+        print(f"❌ Fehler beim Laden der Vorlagendatei '{template_path}': {e}")
+        return None
+
+    workers = workers or os.cpu_count() or 1
+    geschrieben = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        laufend = []
+        for year, month, output_path in auftraege:
+            try:
+                datei = vorlage.copy()
+                if "Regeln" in datei.sheetnames:
+                    datei.set_cells("Regeln", {MONAT_ZELLE: date(year, month, 1)})
+                datei.set_cells("Plan", _monats_zellen(year, month, datum_stil))
+            except Exception as e:
+                print(f"❌ Fehler beim Füllen des Plan-Blatts für {month:02d}/{year}: {e}")
+                continue
+            laufend.append((output_path, pool.submit(datei.save, output_path)))
+
+        for output_path, future in laufend:
+            try:
+                future.result()
+            except PermissionError:
+                print(f"❌ Fehler: Keine Berechtigung zum Speichern der Datei '{output_path}'")
+                continue
+            except OSError as e:
+                print(f"❌ Fehler beim Speichern der Datei '{output_path}': {e}")
+                continue
+            geschrieben.append(output_path)
+
+    return geschrieben
+
+
+def _monat(text):
+    """'2026-01' -> (2026, 1)."""
+    jahr, _, monat = text.partition("-")
+    try:
+        jahr, monat = int(jahr), int(monat)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ungültiger Monat '{text}' (z. B. 2026-01)")
+    if not (1 <= monat <= 12 and 1900 <= jahr <= 2100):
+        raise argparse.ArgumentTypeError(f"Ungültiger Monat '{text}' (z. B. 2026-01)")
+    return jahr, monat
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Monatspläne mit Datumszeilen aus der Vorlage erstellen")
+    parser.add_argument("jahr", nargs="?", type=int, default=2025, help="Jahr (Standard: 2025)")
+    parser.add_argument("monat", nargs="?", type=int, default=11, help="Monat (Standard: 11)")
+    parser.add_argument("--from", dest="von", type=_monat, metavar="JJJJ-MM",
+                        help="Erster Monat; erzeugt alle Monate bis --to aus einer einmal gelesenen Vorlage")
+    parser.add_argument("--to", dest="bis", type=_monat, metavar="JJJJ-MM", help="Letzter Monat (Standard: --from)")
+    parser.add_argument("--abteilung", action="append", metavar="NAME",
+                        help="Je Monat eine Datei für diese Abteilung (mehrfach möglich)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Threads zum Schreiben bei --from/--abteilung (Standard: CPU-Kerne)")
+    parser.add_argument("--vorlage", type=Path, default=TEMPLATE, help=f"Vorlage (Standard: {TEMPLATE})")
+    parser.add_argument("--ausgabe", type=Path, default=Path("output"), help="Zielverzeichnis (Standard: output)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Kommandozeile (auch `dienstplan fill`); gibt den Exit-Code zurück."""
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    template = args.vorlage
+
     if not template.exists():
         print(f"❌ Vorlage nicht gefunden: {template}")
         print("   Führe erst 'python src/build_template.py' aus!")
-        sys.exit(1)
-    
-    fill_plan_with_dates(template, output, year, month)
+        return 1
+
+    args.ausgabe.mkdir(parents=True, exist_ok=True)
+
+    if args.von is None and args.bis is None and not args.abteilung:
+        output = args.ausgabe / output_name(args.jahr, args.monat)
+        fill_plan_with_dates(template, output, args.jahr, args.monat)
+        return 0
+
+    if args.von is None and args.bis is not None:
+        print("❌ --to nur zusammen mit --from")
+        return 1
+    von = args.von or (args.jahr, args.monat)
+    bis = args.bis or von
+    if bis < von:
+        print(f"❌ --to {bis[0]}-{bis[1]:02d} liegt vor --from {von[0]}-{von[1]:02d}")
+        return 1
+
+    abteilungen = args.abteilung or [None]
+    auftraege = [
+        (jahr, monat, args.ausgabe / output_name(jahr, monat, abteilung))
+        for jahr, monat in month_range(von, bis)
+        for abteilung in abteilungen
+    ]
+    print(f"🚀 Erzeuge {len(auftraege)} Monatspläne aus {template}")
+    geschrieben = fill_plans_bulk(template, auftraege, args.workers)
+    if geschrieben is None:
+        return 1
+
+    print(f"✅ {len(geschrieben)}/{len(auftraege)} Monatspläne erstellt in {args.ausgabe}")
+    print(f"   Trage jetzt nur noch in Spalte B (Mitarbeiter) und C (Anteil) die Namen ein!")
+    return 0 if len(geschrieben) == len(auftraege) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,134 @@
+"""
+Inkrementelle Neuberechnung mit Ergebnis-Cache je Mitarbeiter
+
+Neben der Plan-Datei liegt eine JSON-Sidecar-Datei
+(<datei>.auswertung-cache.json) mit einem Fingerabdruck je (Monat,
+Mitarbeiter) und dem zuletzt berechneten Ergebnis je Mitarbeiter. Beim
+nächsten Lauf werden nur Mitarbeiter neu berechnet, deren Fingerabdruck
+sich geändert hat; alle anderen Ergebnisse kommen aus dem Cache.
+
+Der Fingerabdruck enthält je Dienst das Datum und die Anzahl der
+Mitarbeiter an diesem Tag (daraus ergibt sich der Anteil). Ändert sich ein
+Split, ändern sich damit auch die Fingerabdrücke aller Beteiligten.
+Feiertage und Vergütungsparameter fließen in einen gemeinsamen
+Kontext-Hash; ändert sich dieser, wird alles neu berechnet.
+"""
+
+from collections import Counter, defaultdict
+from pathlib import Path
+import hashlib
+import json
+import os
+
+
+CACHE_VERSION = 1
+SIDECAR_SUFFIX = ".auswertung-cache.json"
+
+
+def sidecar_path(filepath):
+    """Pfad der Cache-Datei neben der Plan-Datei."""
+    filepath = Path(filepath)
+    return filepath.with_name(filepath.name + SIDECAR_SUFFIX)
+
+
+def _hash(value):
+    return hashlib.sha1(repr(value).encode("utf-8")).hexdigest()[:20]
+
+
+def context_hash(holidays, parameters):
+    """Hash über Feiertage und Vergütungsparameter (Sätze, Schwelle, Abzug, Engine)."""
+    return _hash((sorted(h.toordinal() for h in holidays), tuple(parameters)))
+
+
+def fingerprints(plan_data):
+    """
+    Fingerabdrücke je Mitarbeiter und Monat: {mitarbeiter: {"YYYY-MM": hash}}.
+
+    Grundlage ist je Dienst (Datum, Anzahl Mitarbeiter an diesem Datum).
+    """
+    anzahl_pro_tag = Counter(datum for datum, mitarbeiter in plan_data if mitarbeiter)
+
+    dienste = defaultdict(lambda: defaultdict(list))
+    for datum, mitarbeiter in plan_data:
+        if mitarbeiter:
+            dienste[mitarbeiter][f"{datum.year}-{datum.month:02d}"].append(
+                (datum.toordinal(), anzahl_pro_tag[datum])
+            )
+
+    return {
+        mitarbeiter: {monat: _hash(sorted(eintraege)) for monat, eintraege in monate.items()}
+        for mitarbeiter, monate in dienste.items()
+    }
+
+
+def load_cache(filepath):
+    """Lädt die Sidecar-Datei; bei fehlender oder ungültiger Datei ein leerer Cache."""
+    try:
+        with open(sidecar_path(filepath), encoding="utf-8") as f:
+            cache = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Warnung: Cache-Datei unlesbar, rechne vollständig neu: {e}")
+        return None
+
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        return None
+    return cache
+
+
+def save_cache(filepath, kontext, prints, results):
+    """Schreibt Fingerabdrücke, Ergebnisse und Zeilenreihenfolge in die Sidecar-Datei."""
+    cache = {
+        "version": CACHE_VERSION,
+        "kontext": kontext,
+        "reihenfolge": [r['mitarbeiter'] for r in results],
+        "mitarbeiter": {
+            r['mitarbeiter']: {"fingerprints": prints.get(r['mitarbeiter'], {}), "result": dict(r)}
+            for r in results
+        },
+    }
+
+    path = sidecar_path(filepath)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Warnung: Cache-Datei konnte nicht gespeichert werden: {e}")
+
+
+def calculate_incremental(plan_data, holidays, bundesland, engine_func, cache, kontext):
+    """
+    Berechnet nur Mitarbeiter mit geänderten Eingaben neu.
+
+    Gibt (results, geaenderte_mitarbeiter, prints, layout_unveraendert) zurück.
+    layout_unveraendert ist True, wenn Mitarbeiter und Zeilenreihenfolge der
+    Auswertung gleich geblieben sind, sodass nur einzelne Zeilen ersetzt
+    werden müssen.
+    """
+    prints = fingerprints(plan_data)
+
+    cached = {}
+    if cache is not None and cache.get("kontext") == kontext:
+        cached = cache.get("mitarbeiter", {})
+
+    treffer = {}
+    geaendert = set()
+    for mitarbeiter, monate in prints.items():
+        eintrag = cached.get(mitarbeiter)
+        if eintrag is not None and eintrag.get("fingerprints") == monate:
+            treffer[mitarbeiter] = eintrag["result"]
+        else:
+            geaendert.add(mitarbeiter)
+
+    neu = engine_func(plan_data, holidays, bundesland, mitarbeiter_filter=geaendert) if geaendert else []
+
+    results = sorted(list(treffer.values()) + neu, key=lambda r: r['mitarbeiter'])
+    layout_unveraendert = (
+        cache is not None
+        and cache.get("reihenfolge") == [r['mitarbeiter'] for r in results]
+    )
+
+    return results, geaendert, prints, layout_unveraendert
@@ -0,0 +1,197 @@
+"""
+Jahresübersicht über viele Plan-Dateien (z. B. 12 Monate × alle Abteilungen)
+
+Jede Datei wird in einem Worker-Prozess gelesen und in einem Durchlauf zu
+Einheiten je (Mitarbeiter, Monat) verdichtet (calculate.accumulate_monate).
+Die Anteile (eingetragen oder 1 / Anzahl des Tages) gelten je Datei,
+Schwelle und Abzug je Person und Kalendermonat über alle Dateien – wer in
+mehreren Abteilungen Dienste hat, wird je Monat einmal bewertet. Mit
+--engine exact wird in Festkomma gerechnet (siehe calculate_exact.py).
+
+Verwendung:
+    python src/jahresuebersicht.py "archiv/2025/*.xlsx" --output output/Jahresuebersicht_2025.xlsx
+    python src/jahresuebersicht.py archiv/2025/ --output output/Jahresuebersicht_2025.csv --workers 8
+    python src/jahresuebersicht.py archiv/2025/ --engine exact
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+from auswertung_writer import write_jahresuebersicht_file
+from calculate import (
+    accumulate_monate, build_monats_results, calculation_holidays, collect_batch_files,
+    _matches_bundesland, read_plan_data,
+)
+
+
+DEFAULT_OUTPUT = Path("output") / "Jahresuebersicht.xlsx"
+ENGINES = ("python", "exact")
+
+
+def _load(filepath):
+    """Liest (holidays, plan_data, bundesland) aus einer .xlsx- oder .dpsnap-Datei, None bei Fehlern."""
+    if Path(filepath).suffix.lower() != ".dpsnap":
+        return read_plan_data(filepath, with_anteil=True)
+
+    from snapshot import Snapshot
+
+    try:
+        with Snapshot(filepath) as snap:
+            bundesland = snap.bundesland
+            plan_data = snap.plan_rows()
+            feiertage = snap.holidays()
+    except FileNotFoundError:
+        print(f"❌ Fehler: Datei '{filepath}' nicht gefunden")
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Fehler beim Laden des Snapshots '{filepath}': {e}")
+        return None
+
+    sheet_holidays = {datum for datum, _, bl in feiertage if _matches_bundesland(bl, bundesland)}
+    return calculation_holidays(plan_data, bundesland, sheet_holidays), plan_data, bundesland
+
+
+def _accumulate(engine):
+    if engine == "exact":
+        from calculate_exact import accumulate_monate_exact
+        return accumulate_monate_exact
+    return accumulate_monate
+
+
+def _summen_datei(filepath, engine="python"):
+    """
+    Worker: Einheiten je (Mitarbeiter, Monat) einer Datei.
+
+    Gibt (summen, eintraege, fehler) zurück; summen ist None bei Fehlern.
+    Die Konsolenausgabe wird abgefangen, nur Fehlerzeilen (❌) werden gemeldet.
+    """
+    buffer = io.StringIO()
+    summen = None
+    eintraege = 0
+
+    with contextlib.redirect_stdout(buffer):
+        try:
+            loaded = _load(filepath)
+            if loaded is not None:
+                holidays, plan_data, bundesland = loaded
+                eintraege = len(plan_data)
+                summen = _accumulate(engine)(plan_data, holidays, bundesland)
+        except Exception as e:
+            print(f"❌ Unerwarteter Fehler beim Verarbeiten der Datei: {e}")
+
+    fehler = [line.strip() for line in buffer.getvalue().splitlines() if line.startswith("❌")]
+    return summen, eintraege, fehler
+
+
+def build_jahresuebersicht(spec, output_path=DEFAULT_OUTPUT, workers=None, engine="python"):
+    """
+    Liest alle Dateien (Verzeichnis oder Glob-Muster) und schreibt die Jahresübersicht.
+
+    Die Teilsummen werden in Dateireihenfolge zusammengeführt, das Ergebnis
+    ist damit unabhängig von der Anzahl der Worker. engine ist 'python'
+    (Gleitkomma) oder 'exact' (Festkomma, calculate_exact). Gibt eine
+    Zusammenfassung zurück oder None, wenn keine Datei gefunden wurde oder
+    das Speichern fehlschlägt.
+    """
+    files = collect_batch_files(spec, (".xlsx", ".dpsnap"))
+    if not files:
+        print(f"❌ Keine Excel-Dateien gefunden für: {spec}")
+        return None
+
+    workers = workers or os.cpu_count() or 1
+    print(f"🚀 Jahresübersicht: {len(files)} Dateien mit {workers} Prozessen")
+
+    start = time.perf_counter()
+    summen = {}
+    eintraege_gesamt = 0
+    fehlerhaft = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        teilsummen = executor.map(_summen_datei, files, repeat(engine))
+        for filepath, (datei_summen, eintraege, fehler) in zip(files, teilsummen):
+            if datei_summen is None:
+                fehlerhaft.append((filepath, fehler or ["❌ Verarbeitung abgebrochen"]))
+                continue
+            eintraege_gesamt += eintraege
+            for schluessel, einheiten in datei_summen.items():
+                ziel = summen.get(schluessel)
+                if ziel is None:
+                    summen[schluessel] = einheiten
+                else:
+                    for klasse, wert in enumerate(einheiten):
+                        ziel[klasse] += wert
+
+    if engine == "exact":
+        from calculate_exact import build_monats_results_exact
+        monats_results = build_monats_results_exact(summen)
+    else:
+        monats_results = build_monats_results(summen)
+
+    try:
+        write_jahresuebersicht_file(output_path, monats_results)
+    except PermissionError:
+        print(f"❌ Fehler: Keine Berechtigung zum Speichern der Datei '{output_path}'")
+        return None
+    except OSError as e:
+        print(f"❌ Fehler beim Speichern der Datei '{output_path}': {e}")
+        return None
+
+    dauer = time.perf_counter() - start
+    mitarbeiter = {result['mitarbeiter'] for result in monats_results}
+    monate = {(result['jahr'], result['monat']) for result in monats_results}
+    gesamt = sum(result['auszahlung_gesamt'] for result in monats_results)
+
+    print(f"\n{'='*70}")
+    print(f"✅ Jahresübersicht geschrieben: {len(mitarbeiter)} Mitarbeiter, {len(monate)} Monate")
+    print(f"   Datei: {output_path}")
+    print(f"   {len(files) - len(fehlerhaft)}/{len(files)} Dateien, {eintraege_gesamt} Einträge in {dauer:.2f} s")
+    print(f"   Auszahlung gesamt: {gesamt:.2f} €")
+    for filepath, fehler in fehlerhaft:
+        print(f"   ❌ {filepath}:")
+        for line in fehler:
+            print(f"      {line}")
+    print(f"{'='*70}")
+
+    return {
+        'datei': str(output_path),
+        'dateien_gesamt': len(files),
+        'dateien_fehler': len(fehlerhaft),
+        'eintraege': eintraege_gesamt,
+        'mitarbeiter': len(mitarbeiter),
+        'monate': len(monate),
+        'dauer_s': round(dauer, 3),
+        'monats_results': monats_results,
+    }
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Jahresübersicht (je Mitarbeiter und Monat) über viele Plan-Dateien erstellen",
+    )
+    parser.add_argument("dateien", help="Verzeichnis oder Glob-Muster der Plan-Dateien (.xlsx/.dpsnap)")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT),
+                        help=f"Zieldatei .xlsx oder .csv (Standard: {DEFAULT_OUTPUT})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Anzahl paralleler Prozesse (Standard: Anzahl CPU-Kerne)")
+    parser.add_argument("--engine", choices=ENGINES, default="python",
+                        help="python (Gleitkomma) oder exact (Festkomma, Cent-genau)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Kommandozeile (auch `dienstplan jahr`); gibt den Exit-Code zurück."""
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    summary = build_jahresuebersicht(args.dateien, Path(args.output), args.workers, args.engine)
+    return 0 if summary is not None and summary['dateien_fehler'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
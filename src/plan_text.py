@@ -0,0 +1,198 @@
+"""
+Pläne und Feiertage als CSV oder JSON-Lines lesen (ohne Excel)
+
+Das Planungssystem exportiert CSV; diese Dateien lassen sich damit direkt
+berechnen, ohne sie vorher in die Vorlage einzufügen. Gelesen wird
+zeilenweise (csv.reader bzw. eine JSON-Zeile nach der anderen), es wird nie
+die ganze Datei im Speicher gehalten. read_plan_text legt die Einträge
+direkt in PlanEntries (records.py) ab, rund 13 Bytes je Eintrag.
+
+Formate (Spalten bzw. Schlüssel wie in den Blättern Plan und Feiertage):
+
+    Plan CSV         Datum;Mitarbeiter;Anteil      (Anteil optional, Dezimalkomma)
+    Plan JSONL       {"datum": "03.11.2025", "mitarbeiter": "Anna", "anteil": 0.5}
+    Feiertage CSV    Datum;Name;BL                 (siehe SPECIFICATION.md)
+    Feiertage JSONL  {"datum": "24.12.2025", "name": "Heiligabend", "bl": "NRW"}
+
+CSV-Dateien haben Semikolon als Trennzeichen und sind UTF-8 (mit oder ohne
+BOM, wie von write_auswertung_csv geschrieben). Beginnt die erste Zeile mit
+"Datum", ist sie die Kopfzeile und die Spalten werden über ihre Namen
+gefunden (für Mitarbeiter auch "Name"); sonst gilt die Reihenfolge oben.
+Datumswerte stehen als TT.MM.JJJJ oder JJJJ-MM-TT, in JSON auch als
+Excel-Seriennummer (siehe datum.py).
+Zeilennummern in Warnungen und in der Fehlerliste sind Dateizeilen.
+"""
+
+from pathlib import Path
+import csv
+import json
+
+from auswertung_writer import CSV_DELIMITER
+from datum import to_date
+from profiling import count
+from records import PlanEntries
+from validation import gueltiger_anteil
+
+
+TEXT_SUFFIXES = (".csv", ".jsonl")
+
+# Spaltennamen (klein geschrieben) je Feld; der erste Name ist der JSON-Schlüssel
+PLAN_SPALTEN = (("datum",), ("mitarbeiter", "name"), ("anteil",))
+FEIERTAGE_SPALTEN = (("datum",), ("name",), ("bl", "bundesland"))
+
+
+def is_text_plan(filepath):
+    """Prüft anhand der Endung, ob filepath ein Plan als CSV oder JSON-Lines ist."""
+    return Path(filepath).suffix.lower() in TEXT_SUFFIXES
+
+
+def parse_datum(wert):
+    """Datum aus TT.MM.JJJJ, JJJJ-MM-TT oder Seriennummer (ValueError bei anderen Werten)."""
+    try:
+        return to_date(wert)
+    except TypeError as e:
+        raise ValueError(str(e)) from None
+
+
+def parse_anteil(wert):
+    """
+    Anteil als float, None wenn leer.
+
+    Texte mit Dezimalkomma ("0,5") werden umgewandelt; andere Texte kommen
+    unverändert zurück (die Prüfung meldet "Anteil ist keine Zahl").
+    """
+    if wert is None or wert == "":
+        return None
+    if isinstance(wert, (int, float)) and not isinstance(wert, bool):
+        return float(wert)
+    try:
+        return float(str(wert).replace(",", "."))
+    except ValueError:
+        return wert
+
+
+def _csv_zeilen(filepath, spalten):
+    with open(filepath, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f, delimiter=CSV_DELIMITER)
+        kopf = next(reader, None)
+        if kopf is None:
+            return
+
+        namen = [zelle.strip().lower() for zelle in kopf]
+        if namen[0] == "datum":
+            indizes = [next((namen.index(name) for name in alias if name in namen), None) for alias in spalten]
+        else:
+            indizes = list(range(len(spalten)))
+            yield reader.line_num, [kopf[i].strip() if i < len(kopf) else "" for i in indizes]
+
+        for row in reader:
+            yield reader.line_num, [
+                row[i].strip() if i is not None and i < len(row) else "" for i in indizes
+            ]
+
+
+def _jsonl_zeilen(filepath, spalten):
+    with open(filepath, encoding="utf-8-sig") as f:
+        for zeile, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                objekt = json.loads(line)
+            except ValueError as e:
+                print(f"⚠️ Warnung: Ungültiges JSON in Zeile {zeile} - übersprungen ({e})")
+                count("warnungen", 1)
+                continue
+            if not isinstance(objekt, dict):
+                print(f"⚠️ Warnung: Zeile {zeile} ist kein JSON-Objekt - übersprungen")
+                count("warnungen", 1)
+                continue
+            yield zeile, [next((objekt[name] for name in alias if name in objekt), None) for alias in spalten]
+
+
+def iter_rows(filepath, spalten):
+    """
+    Liest eine CSV- oder JSON-Lines-Datei zeilenweise.
+
+    Liefert je Zeile (zeilennummer, werte) mit einem Wert je Eintrag in
+    spalten (PLAN_SPALTEN oder FEIERTAGE_SPALTEN); fehlende Werte sind ""
+    (CSV) bzw. None (JSON).
+    """
+    if Path(filepath).suffix.lower() == ".jsonl":
+        return _jsonl_zeilen(filepath, spalten)
+    return _csv_zeilen(filepath, spalten)
+
+
+def iter_plan(filepath, validator=None):
+    """
+    Streamt die Plan-Einträge einer CSV- oder JSON-Lines-Datei.
+
+    Liefert (datum, mitarbeiter, anteil|None) je Zeile mit Mitarbeiter
+    (None auch für Anteile außerhalb von (0, 1], die die Prüfung meldet);
+    Zeilen mit ungültigem Datum werden mit Warnung übersprungen. Ein
+    validator (PlanValidator) prüft jede Zeile im selben Durchlauf wie
+    calculate._read_plan_rows. Am Ende werden die Zähler für das Profil
+    gesetzt (plan_zeilen, plan_uebersprungen, warnungen).
+    """
+    zeilen = 0
+    uebersprungen = 0
+
+    for zeile, (datum_raw, mitarbeiter, anteil_raw) in iter_rows(filepath, PLAN_SPALTEN):
+        zeilen += 1
+        mitarbeiter = str(mitarbeiter).strip() if mitarbeiter not in (None, "") else None
+        if datum_raw in (None, ""):
+            if validator is not None and mitarbeiter:
+                validator.datum_fehlt(zeile, mitarbeiter)
+            continue
+
+        try:
+            datum = parse_datum(datum_raw)
+        except ValueError:
+            print(f"⚠️ Warnung: Ungültiges Datumsformat in Zeile {zeile}: '{datum_raw}' - übersprungen")
+            if validator is not None:
+                validator.ungueltiges_datum(zeile, datum_raw, mitarbeiter)
+            uebersprungen += 1
+            continue
+
+        anteil = parse_anteil(anteil_raw)
+        if validator is not None:
+            validator.add(zeile, datum, mitarbeiter, anteil)
+        if mitarbeiter:
+            yield datum, mitarbeiter, gueltiger_anteil(anteil)
+
+    count("plan_zeilen", zeilen)
+    count("plan_uebersprungen", uebersprungen)
+    count("warnungen", uebersprungen)
+
+
+def read_plan_text(filepath, with_anteil=False, validator=None):
+    """
+    Liest einen Plan aus CSV oder JSON-Lines als PlanEntries.
+
+    Einträge wie bei calculate._read_plan_rows: (datum, mitarbeiter) bzw.
+    mit with_anteil=True (datum, mitarbeiter, anteil|None). OSError und
+    UnicodeDecodeError beim Lesen gibt die Funktion an den Aufrufer weiter.
+    """
+    plan_data = PlanEntries(with_anteil=with_anteil)
+    for datum, mitarbeiter, anteil in iter_plan(filepath, validator):
+        plan_data.append(datum, mitarbeiter, anteil if with_anteil else None)
+    count("plan_eintraege", len(plan_data))
+    return plan_data
+
+
+def iter_holidays(filepath):
+    """
+    Streamt Feiertage (Datum;Name;BL) aus CSV oder JSON-Lines.
+
+    Liefert (datum, name, bl) je Zeile; Zeilen ohne gültiges Datum werden
+    mit Warnung übersprungen. Gefiltert nach Bundesland wird beim Aufrufer.
+    """
+    for zeile, (datum_raw, name, bl) in iter_rows(filepath, FEIERTAGE_SPALTEN):
+        if datum_raw in (None, ""):
+            continue
+        try:
+            datum = parse_datum(datum_raw)
+        except ValueError:
+            print(f"⚠️ Warnung: Ungültiges Datumsformat in Zeile {zeile}: '{datum_raw}' - übersprungen")
+            count("warnungen", 1)
+            continue
+        yield datum, name, bl
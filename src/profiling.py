@@ -0,0 +1,211 @@
+"""
+Messpunkte für die Berechnungs-Pipeline (Stufenzeiten, Zähler, Profiler)
+
+Verwendung im Code:
+
+    from profiling import count, stage
+
+    with stage("plan"):
+        ...
+    count("plan_uebersprungen", 3)
+
+Ohne aktiven Profiler sind stage() und count() wirkungslos (kein Messaufwand).
+Gemessen wird, solange ein Profiler aktiv ist:
+
+    with Profiler("datei.xlsx", cprofile=True, speicher=True) as profiler:
+        process_file("datei.xlsx")
+    profiler.record   # maschinenlesbarer Messdatensatz (dict, JSON-fähig)
+
+Hooks (add_hook) werden nach jeder Stufe mit ("stufe", {...}) und am Ende
+eines Laufs mit ("fertig", record) aufgerufen, z. B. um Messwerte an ein
+Monitoring weiterzugeben.
+"""
+
+from datetime import datetime
+import contextlib
+import time
+
+
+RECORD_VERSION = 1
+CPROFILE_TOP = 15
+
+_hooks = []
+_active = None
+
+
+def add_hook(callback):
+    """Registriert callback(ereignis, daten) für alle Profiler-Läufe."""
+    _hooks.append(callback)
+
+
+def remove_hook(callback):
+    """Entfernt einen mit add_hook registrierten Hook."""
+    if callback in _hooks:
+        _hooks.remove(callback)
+
+
+def _emit(ereignis, daten):
+    for callback in list(_hooks):
+        try:
+            callback(ereignis, daten)
+        except Exception as e:
+            print(f"⚠️ Warnung: Profiling-Hook fehlgeschlagen: {e}")
+
+
+def active():
+    """Aktiver Profiler oder None."""
+    return _active
+
+
+def stage(name):
+    """Kontextmanager, der die Dauer einer Stufe im aktiven Profiler misst."""
+    if _active is None:
+        return contextlib.nullcontext()
+    return _active.stage(name)
+
+
+def count(name, n=1):
+    """Erhöht einen Zähler im aktiven Profiler (ohne Profiler wirkungslos)."""
+    if _active is not None:
+        _active.zaehler[name] = _active.zaehler.get(name, 0) + n
+
+
+class Profiler:
+    """
+    Misst einen Lauf: Stufenzeiten, Zähler und optional cProfile/tracemalloc.
+
+    cprofile: Funktionsprofil aufzeichnen (Top-Funktionen im Datensatz,
+        vollständiges Profil über dump_cprofile speicherbar).
+    speicher: tracemalloc aktivieren; je Stufe und gesamt wird der
+        Spitzenwert des von Python allokierten Speichers erfasst.
+        tracemalloc verlangsamt den Lauf deutlich.
+    """
+
+    def __init__(self, name=None, cprofile=False, speicher=False):
+        self.name = name
+        self.stufen = {}
+        self.zaehler = {}
+        self.record = None
+        self._cprofile = None
+        self._use_cprofile = cprofile
+        self._speicher = speicher
+        self._start = None
+        self._gestartet = None
+        self._vorher = None
+
+    def __enter__(self):
+        global _active
+        self._vorher = _active
+        _active = self
+
+        if self._speicher:
+            import tracemalloc
+            tracemalloc.start()
+        if self._use_cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+        self._gestartet = datetime.now()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active
+        gesamt = time.perf_counter() - self._start
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+
+        speicher_peak = None
+        if self._speicher:
+            import tracemalloc
+            speicher_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        _active = self._vorher
+        self.record = self._build_record(gesamt, speicher_peak, exc_type)
+        _emit("fertig", self.record)
+        return False
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        tracemalloc = None
+        if self._speicher:
+            import tracemalloc
+            tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            dauer = time.perf_counter() - start
+            eintrag = self.stufen.setdefault(name, {"dauer_s": 0.0, "aufrufe": 0})
+            eintrag["dauer_s"] += dauer
+            eintrag["aufrufe"] += 1
+            if tracemalloc is not None:
+                peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                eintrag["speicher_peak_mb"] = max(eintrag.get("speicher_peak_mb", 0.0), round(peak_mb, 2))
+            _emit("stufe", {"stufe": name, "dauer_s": dauer})
+
+    def _cprofile_top(self):
+        import pstats
+
+        stats = pstats.Stats(self._cprofile)
+        eintraege = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "funktion": f"{datei}:{zeile}({funktion})",
+                "aufrufe": primitive,
+                "eigenzeit_s": round(eigenzeit, 4),
+                "gesamtzeit_s": round(gesamtzeit, 4),
+            }
+            for (datei, zeile, funktion), (primitive, _, eigenzeit, gesamtzeit, _) in eintraege[:CPROFILE_TOP]
+        ]
+
+    def _build_record(self, gesamt, speicher_peak, exc_type):
+        gemessen = sum(eintrag["dauer_s"] for eintrag in self.stufen.values())
+        return {
+            "version": RECORD_VERSION,
+            "name": self.name,
+            "start": self._gestartet.isoformat(timespec="seconds"),
+            "gesamt_s": round(gesamt, 4),
+            "ohne_stufe_s": round(max(0.0, gesamt - gemessen), 4),
+            "stufen": {
+                name: {**eintrag, "dauer_s": round(eintrag["dauer_s"], 4)}
+                for name, eintrag in self.stufen.items()
+            },
+            "zaehler": dict(self.zaehler),
+            "speicher_peak_mb": round(speicher_peak / (1024 * 1024), 2) if speicher_peak is not None else None,
+            "cprofile_top": self._cprofile_top() if self._cprofile is not None else None,
+            "fehler": exc_type.__name__ if exc_type is not None else None,
+        }
+
+    def dump_cprofile(self, path):
+        """Speichert das vollständige cProfile-Profil (für pstats/snakeviz)."""
+        if self._cprofile is None:
+            raise ValueError("Profiler wurde ohne cprofile=True gestartet")
+        self._cprofile.dump_stats(str(path))
+
+
+def print_record(record):
+    """Zeigt einen Messdatensatz als Tabelle auf der Konsole."""
+    print(f"\n{'='*70}")
+    print(f"⏱️ Profil: {record['name'] or '-'} ({record['gesamt_s']:.3f} s gesamt)")
+    print(f"{'='*70}")
+    print(f"{'Stufe':<24} {'Dauer (s)':>10} {'Anteil':>8} {'Aufrufe':>8} {'Speicher':>12}")
+    for name, eintrag in record["stufen"].items():
+        anteil = eintrag["dauer_s"] / record["gesamt_s"] * 100 if record["gesamt_s"] else 0.0
+        speicher = f"{eintrag['speicher_peak_mb']:.1f} MB" if "speicher_peak_mb" in eintrag else "–"
+        print(f"{name:<24} {eintrag['dauer_s']:>10.4f} {anteil:>7.1f}% {eintrag['aufrufe']:>8} {speicher:>12}")
+    print(f"{'(ohne Stufe)':<24} {record['ohne_stufe_s']:>10.4f}")
+
+    if record["zaehler"]:
+        print("Zähler: " + ", ".join(f"{name}={wert}" for name, wert in record["zaehler"].items()))
+    if record["speicher_peak_mb"] is not None:
+        print(f"Speicher-Peak (tracemalloc): {record['speicher_peak_mb']:.1f} MB")
+    if record["cprofile_top"]:
+        print("Top-Funktionen (kumulierte Zeit):")
+        for eintrag in record["cprofile_top"][:10]:
+            print(f"   {eintrag['gesamtzeit_s']:>8.3f} s  {eintrag['aufrufe']:>9}x  {eintrag['funktion']}")
+    print(f"{'='*70}")
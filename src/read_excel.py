@@ -1,14 +1,44 @@
 """
 Excel-Datei einlesen und Inhalt anzeigen
+
+Ohne Optionen wird der Inhalt aller Blätter als Tabelle und zusätzlich als
+JSON ausgegeben (kleine Dateien, die ganze Arbeitsmappe im Speicher).
+
+Mit --ndjson wird gestreamt: Arbeitsmappen werden schreibgeschützt
+geöffnet, Blätter und Zeilen einzeln gelesen und je Zeile ein JSON-Objekt
+ausgegeben ({"datei", "blatt", "zeile", "werte"}; Datumswerte als
+ISO-String). Ein Verzeichnis wird Datei für Datei verarbeitet, es ist immer
+nur eine Arbeitsmappe offen – der Speicherbedarf hängt nicht von der Größe
+des Archivs ab. Meldungen gehen dabei nach stderr.
+
+Verwendung:
+    python src/read_excel.py output/Dienstplan_2025_11_NRW.xlsx
+    python src/read_excel.py archiv/2025/ --ndjson --blatt Plan --zeilen 2-500 > plan.jsonl
+    python src/read_excel.py archiv/2025/ --output archiv_2025.jsonl
 """
 
-from openpyxl import load_workbook
-import json
+from datetime import date, datetime, time, timedelta
 from pathlib import Path
+import argparse
+import json
+import sys
+
+
+EXCEL_SUFFIXES = (".xlsx", ".xlsm")
+
+
+def _json_default(value):
+    """JSON-Darstellung für Zellwerte, die json nicht kennt (Datum, Uhrzeit, Dauer)."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return str(value)
 
 
 def read_excel_to_dict(filepath):
     """Liest eine Excel-Datei und gibt die Daten als Dictionary zurück."""
+    from openpyxl import load_workbook
 
     try:
         wb = load_workbook(filepath, data_only=True)
@@ -75,7 +105,7 @@ def print_excel_content(filepath):
         # Als JSON ausgeben
         print("📄 JSON-Format:")
         try:
-            print(json.dumps(data, indent=2, ensure_ascii=False))
+            print(json.dumps(data, indent=2, ensure_ascii=False, default=_json_default))
         except (TypeError, ValueError) as e:
             print(f"❌ Fehler beim Konvertieren zu JSON: {e}")
             raise
@@ -86,23 +116,152 @@ def print_excel_content(filepath):
     return data
 
 
-if __name__ == "__main__":
-    import sys
-    
-    if len(sys.argv) > 1:
+def collect_workbooks(spec):
+    """Arbeitsmappen aus einer Datei oder einem Verzeichnis (sortiert, ohne Excel-Sperrdateien ~$)."""
+    path = Path(spec)
+    if not path.is_dir():
+        return [path]
+    return sorted(
+        f for f in path.iterdir()
+        if f.suffix.lower() in EXCEL_SUFFIXES and f.is_file() and not f.name.startswith("~$")
+    )
+
+
+def iter_rows(filepath, sheets=None, min_row=1, max_row=None):
+    """
+    Streamt die Zeilen einer Arbeitsmappe als Dicts (read-only, Blatt für Blatt).
+
+    sheets beschränkt auf diese Blätter (Reihenfolge der Arbeitsmappe),
+    min_row/max_row auf einen Zeilenbereich (1-basiert wie in Excel). Leere
+    Zeilen werden übersprungen, leere Zellen am Zeilenende abgeschnitten.
+    Liefert {"datei", "blatt", "zeile", "werte"}; die Werte sind noch
+    Python-Objekte (siehe _json_default für die Ausgabe).
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        for sheet_name in wb.sheetnames:
+            if sheets is not None and sheet_name not in sheets:
+                continue
+            ws = wb[sheet_name]
+            if not hasattr(ws, "iter_rows"):  # Diagrammblatt
+                continue
+            for row_num, row in enumerate(ws.iter_rows(min_row=min_row, max_row=max_row, values_only=True),
+                                          start=min_row):
+                werte = list(row)
+                while werte and werte[-1] is None:
+                    werte.pop()
+                if werte:
+                    yield {"datei": str(filepath), "blatt": sheet_name, "zeile": row_num, "werte": werte}
+    finally:
+        wb.close()
+
+
+def dump_ndjson(spec, out, sheets=None, min_row=1, max_row=None):
+    """
+    Schreibt alle Zeilen der Arbeitsmappen aus spec (Datei oder Verzeichnis)
+    als NDJSON nach out (Textdatei oder sys.stdout).
+
+    Fehlerhafte Dateien werden mit Meldung auf stderr übersprungen. Gibt
+    (zeilen, dateien_ok, dateien_fehler) zurück.
+    """
+    zeilen = 0
+    ok = 0
+    fehler = 0
+    for filepath in collect_workbooks(spec):
+        try:
+            for zeile in iter_rows(filepath, sheets, min_row, max_row):
+                out.write(json.dumps(zeile, ensure_ascii=False, default=_json_default))
+                out.write("\n")
+                zeilen += 1
+        except FileNotFoundError:
+            print(f"❌ Fehler: Datei '{filepath}' nicht gefunden", file=sys.stderr)
+            fehler += 1
+            continue
+        except PermissionError:
+            print(f"❌ Fehler: Keine Berechtigung zum Lesen der Datei '{filepath}'", file=sys.stderr)
+            fehler += 1
+            continue
+        except Exception as e:
+            print(f"❌ Fehler beim Lesen der Excel-Datei '{filepath}': {e}", file=sys.stderr)
+            fehler += 1
+            continue
+        ok += 1
+    return zeilen, ok, fehler
+
+
+def _zeilenbereich(text):
+    """'2-100' -> (2, 100), '5' -> (5, 5), '10-' -> (10, None)."""
+    start, trenner, ende = text.partition("-")
+    try:
+        min_row = int(start) if start else 1
+        max_row = (int(ende) if ende else None) if trenner else min_row
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ungültiger Zeilenbereich '{text}' (z. B. 2-100)")
+    if min_row < 1 or (max_row is not None and max_row < min_row):
+        raise argparse.ArgumentTypeError(f"Ungültiger Zeilenbereich '{text}' (z. B. 2-100)")
+    return min_row, max_row
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Inhalt von Excel-Dateien anzeigen oder als NDJSON exportieren")
+    parser.add_argument("datei", nargs="?",
+                        help="Excel-Datei oder (mit --ndjson) Verzeichnis (Standard: neueste Datei in output/)")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="Je Zeile ein JSON-Objekt ausgeben (gestreamt, read-only)")
+    parser.add_argument("--output", help="NDJSON in diese Datei statt nach stdout schreiben (aktiviert --ndjson)")
+    parser.add_argument("--blatt", action="append", metavar="NAME",
+                        help="Nur dieses Blatt (mehrfach möglich)")
+    parser.add_argument("--zeilen", type=_zeilenbereich, metavar="VON-BIS",
+                        help="Nur diese Zeilen, z. B. 2-100 oder 10- (1-basiert wie in Excel)")
+    args = parser.parse_args(argv)
+    args.ndjson = args.ndjson or bool(args.output)
+    return args
+
+
+def main(argv=None):
+    """Kommandozeile (auch `dienstplan read`); gibt den Exit-Code zurück."""
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.datei:
         # Datei als Argument übergeben
-        filepath = sys.argv[1]
+        filepath = Path(args.datei)
     else:
         # Nach neuester Datei im output-Ordner suchen
         output_dir = Path("output")
         excel_files = list(output_dir.glob("*.xlsx"))
-        
+
         if not excel_files:
-            print("❌ Keine Excel-Dateien im output-Ordner gefunden!")
-            print("Verwendung: python src/read_excel.py <pfad-zur-datei>")
-            sys.exit(1)
-        
+            print("❌ Keine Excel-Dateien im output-Ordner gefunden!", file=sys.stderr if args.ndjson else sys.stdout)
+            print("Verwendung: python src/read_excel.py <pfad-zur-datei>", file=sys.stderr if args.ndjson else sys.stdout)
+            return 1
+
         # Neueste Datei verwenden
         filepath = max(excel_files, key=lambda p: p.stat().st_mtime)
-    
-    print_excel_content(filepath)
+
+    if not args.ndjson:
+        if filepath.is_dir() or args.blatt or args.zeilen:
+            print("❌ Verzeichnisse, --blatt und --zeilen nur mit --ndjson")
+            return 1
+        print_excel_content(filepath)
+        return 0
+
+    min_row, max_row = args.zeilen or (1, None)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as out:
+            zeilen, ok, fehler = dump_ndjson(filepath, out, args.blatt, min_row, max_row)
+    else:
+        zeilen, ok, fehler = dump_ndjson(filepath, sys.stdout, args.blatt, min_row, max_row)
+
+    ziel = f" nach {args.output}" if args.output else ""
+    print(f"✅ {zeilen} Zeilen aus {ok} Arbeitsmappen{ziel} exportiert", file=sys.stderr)
+    if ok + fehler == 0:
+        print(f"❌ Keine Excel-Dateien gefunden: {filepath}", file=sys.stderr)
+        return 1
+    return 0 if fehler == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
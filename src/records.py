@@ -0,0 +1,185 @@
+"""
+Kompakte Plan-Einträge für große Pläne
+
+PlanEntries hält die Einträge eines Plans spaltenweise in array-Spalten
+statt als Liste von Tupeln: das Datum als Ordinalzahl, Mitarbeiter und
+Anteil als Code in einer Wertetabelle (wie die Spalten eines Snapshots).
+Jedes Datum und jeder Name existiert damit nur einmal – Namen über
+sys.intern auch planübergreifend, z. B. in Batch-Workern und im Dienst.
+Ein Eintrag kostet rund 13 Bytes statt rund 180 Bytes für Tupel, date- und
+str-Objekt je Zeile (1 Mio. Einträge: bench_records.py).
+
+Nach außen verhält sich PlanEntries wie die bisherige Liste: len(),
+Iteration und Index liefern (datum, mitarbeiter) bzw. mit with_anteil
+(datum, mitarbeiter, anteil|None). Die Tupel entstehen erst beim Lesen
+(über zip/map ohne Python-Schleife), die Engines bleiben unverändert.
+
+VerguetungResult ist das Ergebnis je Mitarbeiter (bzw. Mitarbeiter und
+Monat) mit __slots__ statt eines eigenen Dicts je Zeile. Es ist ein
+Mapping mit den bisherigen Schlüsseln (result['auszahlung_gesamt'],
+dict(result), Vergleich mit Dicts); für JSON wird es mit dict() umgewandelt.
+"""
+
+from array import array
+from collections.abc import Mapping
+import math
+import sys
+
+
+# Schlüssel eines Ergebnisses in Ausgabereihenfolge; 'jahr'/'monat' nur bei Monatsergebnissen
+ERGEBNIS_FELDER = (
+    'mitarbeiter', 'wt_einheiten', 'we_freitag', 'we_andere', 'we_gesamt', 'schwelle_erreicht',
+    'abzug_freitag', 'abzug_andere', 'we_bezahlt', 'auszahlung_wt', 'auszahlung_we', 'auszahlung_gesamt',
+)
+MONATS_FELDER = ('jahr', 'monat')
+_FELDER = frozenset(ERGEBNIS_FELDER + MONATS_FELDER)
+
+
+class PlanEntries:
+    """Plan-Einträge als Spalten (Ordinalzahl, Namens-Code, Anteil-Code)."""
+
+    __slots__ = (
+        "with_anteil", "ordinale", "namen_codes", "anteil_codes",
+        "namen", "anteile", "_daten", "_namen_index", "_anteile_index",
+    )
+
+    def __init__(self, eintraege=(), with_anteil=False):
+        self.with_anteil = with_anteil
+        self.ordinale = array("i")
+        self.namen_codes = array("i")
+        self.anteil_codes = array("i")
+        self.namen = []
+        self.anteile = [None]  # Code 0 = kein Anteil eingetragen
+        self._daten = {}  # Ordinalzahl -> date (ein Objekt je Tag)
+        self._namen_index = {}
+        self._anteile_index = {None: 0}
+        for eintrag in eintraege:
+            self.append(*eintrag)
+
+    @classmethod
+    def from_columns(cls, ordinale, namen_codes, namen, anteile=None):
+        """
+        Übernimmt Spalten eines Snapshots (siehe snapshot.Snapshot).
+
+        ordinale und namen_codes sind int32-Spalten, namen die Namenstabelle;
+        anteile (optional) eine float64-Spalte mit NaN für leere Zellen.
+        Die Spalten werden kopiert, der Snapshot darf danach geschlossen werden.
+        """
+        from datetime import date
+
+        entries = cls(with_anteil=anteile is not None)
+        entries.ordinale.frombytes(memoryview(ordinale).cast("B"))
+        entries.namen_codes.frombytes(memoryview(namen_codes).cast("B"))
+        entries.namen = [sys.intern(name) for name in namen]
+        entries._namen_index = {name: code for code, name in enumerate(entries.namen)}
+        entries._daten = {ordinal: date.fromordinal(ordinal) for ordinal in set(entries.ordinale)}
+        if anteile is None:
+            entries.anteil_codes = array("i", bytes(4 * len(entries.ordinale)))
+        else:
+            for anteil in anteile:
+                entries.anteil_codes.append(entries._anteil_code(None if math.isnan(anteil) else anteil))
+        return entries
+
+    def _anteil_code(self, anteil):
+        code = self._anteile_index.get(anteil)
+        if code is None:
+            code = self._anteile_index[anteil] = len(self.anteile)
+            self.anteile.append(anteil)
+        return code
+
+    def append(self, datum, mitarbeiter, anteil=None):
+        ordinal = datum.toordinal()
+        if ordinal not in self._daten:
+            self._daten[ordinal] = datum
+        code = self._namen_index.get(mitarbeiter)
+        if code is None:
+            code = self._namen_index[mitarbeiter] = len(self.namen)
+            self.namen.append(sys.intern(mitarbeiter) if type(mitarbeiter) is str else mitarbeiter)
+        self.ordinale.append(ordinal)
+        self.namen_codes.append(code)
+        self.anteil_codes.append(self._anteil_code(anteil) if anteil is not None else 0)
+
+    def ohne_anteil(self):
+        """Ansicht mit (datum, mitarbeiter)-Einträgen; teilt die Spalten mit diesem Plan."""
+        ansicht = PlanEntries.__new__(PlanEntries)
+        for name in PlanEntries.__slots__:
+            setattr(ansicht, name, getattr(self, name))
+        ansicht.with_anteil = False
+        return ansicht
+
+    def __len__(self):
+        return len(self.ordinale)
+
+    def __iter__(self):
+        daten = map(self._daten.__getitem__, self.ordinale)
+        namen = map(self.namen.__getitem__, self.namen_codes)
+        if self.with_anteil:
+            return zip(daten, namen, map(self.anteile.__getitem__, self.anteil_codes))
+        return zip(daten, namen)
+
+    def __getitem__(self, index):
+        datum = self._daten[self.ordinale[index]]
+        mitarbeiter = self.namen[self.namen_codes[index]]
+        if self.with_anteil:
+            return datum, mitarbeiter, self.anteile[self.anteil_codes[index]]
+        return datum, mitarbeiter
+
+    def __repr__(self):
+        return f"<PlanEntries {len(self)} Einträge, {len(self.namen)} Mitarbeiter, {len(self._daten)} Tage>"
+
+
+def ohne_anteil(plan_data):
+    """(datum, mitarbeiter)-Einträge eines Plans, egal ob mit oder ohne Anteil gelesen."""
+    if isinstance(plan_data, PlanEntries):
+        return plan_data.ohne_anteil()
+    if plan_data and len(plan_data[0]) > 2:
+        return [(datum, mitarbeiter) for datum, mitarbeiter, _ in plan_data]
+    return plan_data
+
+
+class VerguetungResult(Mapping):
+    """Ergebnis eines Mitarbeiters (Schlüssel wie ERGEBNIS_FELDER, bei Monatsergebnissen zusätzlich jahr/monat)."""
+
+    __slots__ = ERGEBNIS_FELDER + MONATS_FELDER
+
+    def __init__(self, mitarbeiter, wt_einheiten, we_freitag, we_andere, we_gesamt, schwelle_erreicht,
+                 abzug_freitag, abzug_andere, we_bezahlt, auszahlung_wt, auszahlung_we, auszahlung_gesamt,
+                 jahr=None, monat=None):
+        self.mitarbeiter = mitarbeiter
+        self.wt_einheiten = wt_einheiten
+        self.we_freitag = we_freitag
+        self.we_andere = we_andere
+        self.we_gesamt = we_gesamt
+        self.schwelle_erreicht = schwelle_erreicht
+        self.abzug_freitag = abzug_freitag
+        self.abzug_andere = abzug_andere
+        self.we_bezahlt = we_bezahlt
+        self.auszahlung_wt = auszahlung_wt
+        self.auszahlung_we = auszahlung_we
+        self.auszahlung_gesamt = auszahlung_gesamt
+        self.jahr = jahr
+        self.monat = monat
+
+    def __getitem__(self, key):
+        if key not in _FELDER:
+            raise KeyError(key)
+        wert = getattr(self, key)
+        if wert is None and key in MONATS_FELDER:
+            raise KeyError(key)
+        return wert
+
+    def __setitem__(self, key, wert):
+        if key not in _FELDER:
+            raise KeyError(key)
+        setattr(self, key, wert)
+
+    def __iter__(self):
+        yield from ERGEBNIS_FELDER
+        if self.jahr is not None:
+            yield from MONATS_FELDER
+
+    def __len__(self):
+        return len(ERGEBNIS_FELDER) + (len(MONATS_FELDER) if self.jahr is not None else 0)
+
+    def __repr__(self):
+        return f"VerguetungResult({dict(self)!r})"
@@ -0,0 +1,510 @@
+"""
+Lokaler Berechnungsdienst (HTTP/JSON) mit warmen Plänen und Feiertagen
+
+Der Dienst hält importierte Module, Feiertagskalender (feiertage.py,
+day_calendar.py) und eingelesene Pläne im Speicher. Änderungen am Plan
+werden als Delta geschickt; neu berechnet werden nur die Mitarbeiter, die an
+einem geänderten Datum Dienst haben (der Anteil hängt von allen Einträgen
+des Datums ab), und zwar nur für die geänderten Monate über die Einträge
+ihrer Diensttage. Schwelle und Abzug gelten wie in calculate.py je Person
+und Monat; die Antwort enthält die Summen je Mitarbeiter ("auswertung")
+und die Ergebnisse je Mitarbeiter und Monat ("monate").
+
+Endpunkte (JSON, Datum als "YYYY-MM-DD" oder "DD.MM.YYYY"):
+
+    PUT    /plaene/<id>   Plan anlegen/ersetzen
+                          {"bundesland": "NRW", "eintraege": [["2025-11-03", "Anna"], ...],
+                           "feiertage": ["2025-12-24", ...]}
+                          Ein Eintrag darf als drittes Element einen Anteil
+                          haben (["2025-11-03", "Anna", 0.75], wie Spalte C)
+    PATCH  /plaene/<id>   Delta anwenden
+                          {"hinzufuegen": [[datum, name(, anteil)], ...], "entfernen": [[datum, name(, anteil)], ...]}
+                          entfernen löscht je Angabe einen Eintrag des Namens am
+                          Datum, mit Anteil genau einen Eintrag mit diesem Anteil
+    GET    /plaene/<id>   Aktuelle Auswertung
+    DELETE /plaene/<id>   Plan verwerfen
+    POST   /berechnen     {"datei": "output/Dienstplan_2025_11_NRW.xlsx"} - Datei
+                          berechnen; unveränderte Dateien (mtime/Größe) kommen aus dem Speicher
+    GET    /metrics       Latenzen je Endpunkt (p50/p95/p99, ms) und Anzahl Anfragen
+    GET    /health        Status
+
+Verwendung:
+    python src/service.py [--host 127.0.0.1] [--port 8765] [--engine python] [plan.xlsx ...]
+"""
+
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+import argparse
+import contextlib
+import io
+import json
+import math
+import sys
+import threading
+import time
+
+from calculate import ENGINES, combine_monate, get_monats_engine, read_plan_data
+from datum import to_date
+from feiertage import holiday_dates, normalize_bundesland
+from validation import gueltiger_anteil
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+METRIK_FENSTER = 10000  # Anzahl Latenzwerte je Endpunkt für die Perzentile
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+class RequestError(Exception):
+    """Fehlerhafte Anfrage (wird als JSON mit HTTP-Status beantwortet)."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_datum(value):
+    if isinstance(value, str):
+        try:
+            return to_date(value)
+        except ValueError:
+            pass
+    raise RequestError(f"Ungültiges Datum: {value!r} (erwartet YYYY-MM-DD oder DD.MM.YYYY)")
+
+
+def _parse_anteil(value):
+    if value is None:
+        return None
+    if gueltiger_anteil(value) is None:
+        raise RequestError(f"Ungültiger Anteil: {value!r} (erwartet Zahl > 0 und ≤ 1 oder null)")
+    return float(value)
+
+
+def _parse_eintraege(values, feld):
+    """[datum, mitarbeiter(, anteil)] -> (date, str) bzw. (date, str, float|None)."""
+    if not isinstance(values, list):
+        raise RequestError(f"'{feld}' muss eine Liste von [datum, mitarbeiter] sein")
+    eintraege = []
+    for value in values:
+        if not isinstance(value, (list, tuple)) or len(value) < 2 or not value[1]:
+            raise RequestError(f"Ungültiger Eintrag in '{feld}': {value!r}")
+        eintrag = (_parse_datum(value[0]), str(value[1]))
+        eintraege.append(eintrag + (_parse_anteil(value[2]),) if len(value) > 2 else eintrag)
+    return eintraege
+
+
+class PlanState:
+    """
+    Ein Plan im Speicher mit Ergebnis je Mitarbeiter und Monat.
+
+    tage: Datum -> Liste (Mitarbeiter, Anteil|None) (Mehrfacheinträge möglich)
+    dienste: Mitarbeiter -> Counter der Diensttage
+    results: Mitarbeiter -> {(jahr, monat): Ergebnis}
+    """
+
+    def __init__(self, eintraege, bundesland="NRW", sheet_holidays=(), engine="python"):
+        self.bundesland = normalize_bundesland(bundesland)
+        self.sheet_holidays = frozenset(sheet_holidays)
+        self.engine = get_monats_engine(engine)
+        self.tage = defaultdict(list)
+        self.dienste = defaultdict(Counter)
+        self.results = {}
+        self._holiday_years = None
+        self._holidays = None
+
+        for datum, mitarbeiter, *anteil in eintraege:
+            self._add(datum, mitarbeiter, *anteil)
+        self.recalculate(set(self.dienste))
+
+    def __len__(self):
+        return sum(len(namen) for namen in self.tage.values())
+
+    def _add(self, datum, mitarbeiter, anteil=None):
+        self.tage[datum].append((mitarbeiter, anteil))
+        self.dienste[mitarbeiter][datum] += 1
+
+    def _remove(self, datum, mitarbeiter, *anteil):
+        """Entfernt einen Eintrag des Mitarbeiters am Datum (mit anteil genau diesen)."""
+        dienste = self.tage[datum]
+        if anteil:
+            dienste.remove((mitarbeiter, anteil[0]))
+        else:
+            del dienste[next(i for i, (name, _) in enumerate(dienste) if name == mitarbeiter)]
+        if not dienste:
+            del self.tage[datum]
+        self.dienste[mitarbeiter][datum] -= 1
+        if not self.dienste[mitarbeiter][datum]:
+            del self.dienste[mitarbeiter][datum]
+            if not self.dienste[mitarbeiter]:
+                del self.dienste[mitarbeiter]
+
+    def holidays(self):
+        """
+        Berechnete Feiertage aller Planjahre (+ Folgejahr) und Zusatzfeiertage, zwischengespeichert.
+
+        Wie calculation_holidays: Heiligabend und Silvester nur, wenn sie
+        unter 'feiertage' übergeben wurden.
+        """
+        years = {datum.year for datum in self.tage}
+        years |= {year + 1 for year in years}
+        if years != self._holiday_years:
+            self._holidays = holiday_dates(years, self.bundesland) | self.sheet_holidays
+            self._holiday_years = years
+        return self._holidays
+
+    def recalculate(self, mitarbeiter, monate=None):
+        """
+        Berechnet die Ergebnisse der angegebenen Mitarbeiter neu.
+
+        monate ({(jahr, monat)}) beschränkt die Neuberechnung auf diese
+        Monate; die übrigen Monatsergebnisse bleiben gültig, da Schwelle und
+        Abzug je Monat gelten.
+        """
+        tage = set()
+        for name in mitarbeiter:
+            if monate is None:
+                self.results.pop(name, None)
+            elif name in self.results:
+                for monat in monate:
+                    self.results[name].pop(monat, None)
+            for datum in self.dienste.get(name, ()):
+                if monate is None or (datum.year, datum.month) in monate:
+                    tage.add(datum)
+
+        # Alle Einträge dieser Tage, damit die Anteile (1/n je Datum) stimmen;
+        # sortiert, damit die Summen unabhängig von der Änderungsreihenfolge
+        # bitgleich zu einer vollständigen Berechnung des sortierten Plans sind.
+        # Eingetragene Anteile ersetzen 1/n wie in calculate.accumulate_monate.
+        plan_data = [
+            (datum, name, anteil) for datum in sorted(tage) for name, anteil in self.tage[datum]
+        ]
+        for result in self.engine(plan_data, self.holidays(), self.bundesland, mitarbeiter_filter=mitarbeiter):
+            self.results.setdefault(result['mitarbeiter'], {})[(result['jahr'], result['monat'])] = result
+        for name in mitarbeiter:
+            if not self.results.get(name, True):
+                del self.results[name]
+        return len(mitarbeiter)
+
+    def apply_delta(self, hinzufuegen=(), entfernen=()):
+        """
+        Wendet ein Delta an und berechnet die betroffenen Mitarbeiter neu.
+
+        Ein Eintrag in entfernen, der nicht im Plan steht, bricht die
+        gesamte Änderung ab (der Plan bleibt unverändert).
+        """
+        vorhanden = Counter()
+        for datum, mitarbeiter, *anteil in entfernen:
+            vorhanden[(datum, mitarbeiter)] += 1
+            if anteil:
+                vorhanden[(datum, mitarbeiter, anteil[0])] += 1
+            if (self.dienste.get(mitarbeiter, {}).get(datum, 0) < vorhanden[(datum, mitarbeiter)]
+                    or anteil and self.tage.get(datum, []).count((mitarbeiter, anteil[0]))
+                    < vorhanden[(datum, mitarbeiter, anteil[0])]):
+                angabe = f" (Anteil {anteil[0]})" if anteil else ""
+                raise RequestError(f"Eintrag nicht im Plan: {datum.isoformat()} {mitarbeiter}{angabe}", status=409)
+
+        geaenderte_tage = set()
+        betroffen = set()
+        # Einträge mit Anteil zuerst, damit Angaben ohne Anteil sie nicht vorher entfernen
+        for datum, mitarbeiter, *anteil in sorted(entfernen, key=len, reverse=True):
+            self._remove(datum, mitarbeiter, *anteil)
+            geaenderte_tage.add(datum)
+            betroffen.add(mitarbeiter)
+        for datum, mitarbeiter, *anteil in hinzufuegen:
+            self._add(datum, mitarbeiter, *anteil)
+            geaenderte_tage.add(datum)
+
+        for datum in geaenderte_tage:
+            betroffen.update(name for name, _ in self.tage.get(datum, ()))
+        return self.recalculate(betroffen, {(datum.year, datum.month) for datum in geaenderte_tage})
+
+    def monats_auswertung(self):
+        """Ergebnisse je Mitarbeiter und Monat (sortiert nach Mitarbeiter, Monat)."""
+        return [
+            self.results[name][monat] for name in sorted(self.results) for monat in sorted(self.results[name])
+        ]
+
+    def auswertung(self):
+        """Summen je Mitarbeiter über alle Monate (wie calculate.combine_monate)."""
+        return combine_monate(self.monats_auswertung())
+
+
+class PlanStore:
+    """
+    Pläne des Dienstes (nach ID) und Cache für Dateien (nach mtime/Größe).
+
+    Zugriffe auf Pläne laufen unter lock; die Berechnung ist ohnehin an den
+    GIL gebunden, parallele Anfragen würden sich nur gegenseitig bremsen.
+    """
+
+    def __init__(self, engine="python"):
+        self.engine = engine
+        self.plaene = {}
+        self.dateien = {}
+        self.lock = threading.RLock()
+
+    def put(self, plan_id, eintraege, bundesland, feiertage=()):
+        plan = PlanState(eintraege, bundesland, feiertage, self.engine)
+        self.plaene[plan_id] = plan
+        return plan
+
+    def get(self, plan_id):
+        plan = self.plaene.get(plan_id)
+        if plan is None:
+            raise RequestError(f"Plan '{plan_id}' nicht gefunden", status=404)
+        return plan
+
+    def delete(self, plan_id):
+        if self.plaene.pop(plan_id, None) is None:
+            raise RequestError(f"Plan '{plan_id}' nicht gefunden", status=404)
+
+    def load_file(self, filepath):
+        """
+        Liefert (plan, neu_geladen) für eine Plan-Datei.
+
+        Solange sich mtime und Größe nicht ändern, wird die Datei nicht erneut
+        eingelesen.
+        """
+        path = Path(filepath).resolve()
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            raise RequestError(f"Datei '{filepath}' nicht gefunden", status=404)
+        kennung = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self.dateien.get(path)
+        if cached is not None and cached[0] == kennung:
+            return cached[1], False
+
+        # read_plan_data meldet Fehler über die Konsole
+        ausgabe = io.StringIO()
+        with contextlib.redirect_stdout(ausgabe):
+            loaded = read_plan_data(path, with_anteil=True)
+        if loaded is None:
+            fehler = [line.strip() for line in ausgabe.getvalue().splitlines() if line.startswith("❌")]
+            raise RequestError(fehler[0] if fehler else f"Datei '{filepath}' konnte nicht gelesen werden")
+        holidays, plan_data, bundesland = loaded
+
+        plan = PlanState(plan_data, bundesland, holidays, self.engine)
+        self.dateien[path] = (kennung, plan)
+        self.plaene[str(path)] = plan
+        return plan, True
+
+
+def _percentile(sorted_values, p):
+    """Perzentil nach Nearest-Rank-Methode."""
+    if not sorted_values:
+        return None
+    rank = math.ceil(p / 100 * len(sorted_values))
+    return sorted_values[max(0, rank - 1)]
+
+
+class Metrics:
+    """Latenzen der letzten METRIK_FENSTER Anfragen je Endpunkt."""
+
+    def __init__(self):
+        self.latenzen = defaultdict(lambda: deque(maxlen=METRIK_FENSTER))
+        self.anzahl = Counter()
+        self.fehler = Counter()
+        self.lock = threading.Lock()
+        self.start = time.time()
+
+    def record(self, route, dauer_ms, ok):
+        with self.lock:
+            self.latenzen[route].append(dauer_ms)
+            self.anzahl[route] += 1
+            if not ok:
+                self.fehler[route] += 1
+
+    def snapshot(self):
+        with self.lock:
+            daten = {route: sorted(werte) for route, werte in self.latenzen.items()}
+            anzahl = dict(self.anzahl)
+            fehler = dict(self.fehler)
+
+        return {
+            "laufzeit_s": round(time.time() - self.start, 1),
+            "endpunkte": {
+                route: {
+                    "anfragen": anzahl[route],
+                    "fehler": fehler.get(route, 0),
+                    "p50_ms": round(_percentile(werte, 50), 3),
+                    "p95_ms": round(_percentile(werte, 95), 3),
+                    "p99_ms": round(_percentile(werte, 99), 3),
+                    "max_ms": round(werte[-1], 3),
+                }
+                for route, werte in daten.items()
+            },
+        }
+
+
+def _plan_response(plan_id, plan, neu_berechnet):
+    return {
+        "plan": plan_id,
+        "bundesland": plan.bundesland,
+        "eintraege": len(plan),
+        "neu_berechnet": neu_berechnet,
+        "auswertung": [dict(result) for result in plan.auswertung()],
+        "monate": [dict(result) for result in plan.monats_auswertung()],
+    }
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """HTTP-Handler; store und metrics werden in make_server gesetzt."""
+
+    store = None
+    metrics = None
+    verbose = False
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise RequestError("Anfrage zu groß", status=413)
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            raise RequestError(f"Ungültiges JSON: {e}")
+        if not isinstance(body, dict):
+            raise RequestError("JSON-Objekt erwartet")
+        return body
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self, method):
+        start = time.perf_counter()
+        teile = [teil for teil in urlparse(self.path).path.split("/") if teil]
+        route = f"{method} /{teile[0]}" if teile else f"{method} /"
+        status = 200
+
+        try:
+            if teile in (["health"], ["metrics"]):
+                payload = self._handle(method, teile)
+            else:
+                with self.store.lock:
+                    payload = self._handle(method, teile)
+        except RequestError as e:
+            status, payload = e.status, {"fehler": str(e)}
+        except ValueError as e:
+            status, payload = 400, {"fehler": str(e)}
+        except Exception as e:
+            status, payload = 500, {"fehler": f"Unerwarteter Fehler: {e}"}
+
+        dauer_ms = (time.perf_counter() - start) * 1000
+        if route != "GET /metrics":
+            self.metrics.record(route, dauer_ms, status < 400)
+        payload["dauer_ms"] = round(dauer_ms, 3)
+        self._send(status, payload)
+
+    def _handle(self, method, teile):
+        store = self.store
+
+        if teile == ["health"] and method == "GET":
+            return {"status": "ok", "plaene": len(store.plaene)}
+        if teile == ["metrics"] and method == "GET":
+            return self.metrics.snapshot()
+
+        if teile == ["berechnen"] and method == "POST":
+            body = self._read_json()
+            if not body.get("datei"):
+                raise RequestError("'datei' fehlt")
+            plan, neu = store.load_file(body["datei"])
+            return _plan_response(str(Path(body["datei"]).resolve()), plan, len(plan.results) if neu else 0)
+
+        if len(teile) == 2 and teile[0] == "plaene":
+            plan_id = teile[1]
+            if method == "GET":
+                return _plan_response(plan_id, store.get(plan_id), 0)
+            if method == "DELETE":
+                store.delete(plan_id)
+                return {"plan": plan_id, "geloescht": True}
+            if method == "PUT":
+                body = self._read_json()
+                eintraege = _parse_eintraege(body.get("eintraege", []), "eintraege")
+                feiertage = [_parse_datum(value) for value in body.get("feiertage", [])]
+                plan = store.put(plan_id, eintraege, body.get("bundesland", "NRW"), feiertage)
+                return _plan_response(plan_id, plan, len(plan.results))
+            if method == "PATCH":
+                body = self._read_json()
+                hinzufuegen = _parse_eintraege(body.get("hinzufuegen", []), "hinzufuegen")
+                entfernen = _parse_eintraege(body.get("entfernen", []), "entfernen")
+                plan = store.get(plan_id)
+                neu_berechnet = plan.apply_delta(hinzufuegen, entfernen)
+                return _plan_response(plan_id, plan, neu_berechnet)
+
+        raise RequestError(f"Unbekannter Endpunkt: {method} {self.path}", status=404)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, engine="python", verbose=False):
+    """Erstellt den HTTP-Server (noch nicht gestartet) mit eigenem PlanStore."""
+    handler = type("Handler", (ServiceHandler,), {
+        "store": PlanStore(engine),
+        "metrics": Metrics(),
+        "verbose": verbose,
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Lokaler Berechnungsdienst (HTTP/JSON).")
+    parser.add_argument("dateien", nargs="*", help="Plan-Dateien, die beim Start vorgeladen werden")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Adresse (Standard: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (Standard: {DEFAULT_PORT})")
+    parser.add_argument("--engine", choices=ENGINES, default="python", help="Berechnungs-Engine")
+    parser.add_argument("--verbose", action="store_true", help="Jede Anfrage protokollieren")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Kommandozeile (auch `dienstplan serve`); gibt den Exit-Code zurück."""
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    server = make_server(args.host, args.port, args.engine, args.verbose)
+
+    for datei in args.dateien:
+        try:
+            plan, _ = server.RequestHandlerClass.store.load_file(datei)
+            print(f"📋 Vorgeladen: {datei} ({len(plan)} Einträge, {len(plan.results)} Mitarbeiter)")
+        except RequestError as e:
+            print(f"⚠️ Warnung: {e}")
+
+    print(f"🚀 Berechnungsdienst läuft auf http://{args.host}:{args.port} (Strg+C beendet)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n✅ Dienst beendet")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,350 @@
+"""
+Spaltenorientierter Binär-Snapshot für Plan, Feiertage und Auswertung
+
+Eine .dpsnap-Datei enthält dieselben Daten wie die Blätter Plan, Feiertage
+und Auswertung, aber als kompakte Spalten fester Breite statt als gezipptes
+XML. Die Datei wird per mmap geöffnet; Spalten sind memoryviews direkt auf
+den Dateiinhalt, es wird nichts geparst außer einem kleinen JSON-Kopf.
+
+Aufbau (Byte-Reihenfolge der erzeugenden Maschine, im Kopf vermerkt):
+
+    8 Byte   Magic b"DPSNAP01"
+    4 Byte   Länge des JSON-Kopfs (uint32, little-endian)
+    n Byte   JSON-Kopf: Bundesland, Wörterbücher (Mitarbeiter, Feiertagsnamen,
+             BL-Kürzel) und Offset/Typ/Länge jeder Spalte
+    ...      Spalten, jeweils auf 8 Byte ausgerichtet
+
+Spalten:
+    plan_datum            int32   date.toordinal()
+    plan_mitarbeiter      int32   Index in "mitarbeiter"
+    plan_anteil           float64 Spalte C (NaN = leer)
+    feiertage_datum       int32   date.toordinal()
+    feiertage_name        int32   Index in "feiertagsnamen"
+    feiertage_bl          int32   Index in "bundeslaender"
+    auswertung_mitarbeiter int32  Index in "mitarbeiter"
+    auswertung_werte      float64 10 Werte je Zeile (siehe WERTE_SPALTEN)
+    auswertung_schwelle   int8    1 = JA, 0 = NEIN
+
+Verwendung:
+    python src/snapshot.py export <plan.xlsx> <plan.dpsnap>
+    python src/snapshot.py import <plan.dpsnap> <plan.xlsx>
+"""
+
+from array import array
+from datetime import date
+from pathlib import Path
+import json
+import math
+import mmap
+import struct
+import sys
+
+from datum import EXCEL_EPOCHE, to_date
+from records import PlanEntries
+
+
+MAGIC = b"DPSNAP01"
+SNAPSHOT_SUFFIX = ".dpsnap"
+_ALIGN = 8
+
+# Reihenfolge der Zahlenwerte einer Auswertungszeile
+WERTE_SPALTEN = (
+    'wt_einheiten', 'we_freitag', 'we_andere', 'we_gesamt',
+    'abzug_freitag', 'abzug_andere', 'we_bezahlt',
+    'auszahlung_wt', 'auszahlung_we', 'auszahlung_gesamt',
+)
+
+
+def _to_date(value, epoche=EXCEL_EPOCHE[False]):
+    """Wandelt einen Zellwert in ein date um (None wenn nicht möglich, siehe datum.to_date)."""
+    try:
+        return to_date(value, epoche)
+    except (TypeError, ValueError):
+        return None
+
+
+def _read_workbook_sheets(xlsx_path):
+    """Liest Plan, Feiertage, Auswertung und BL_Auswahl read-only aus einer Arbeitsmappe."""
+    from openpyxl import load_workbook
+    from calculate import _read_plan_rows, read_bundesland
+
+    wb = load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        bundesland = read_bundesland(wb)
+
+        plan = _read_plan_rows(wb["Plan"], with_anteil=True, epoche=wb.epoch) if "Plan" in wb.sheetnames else []
+
+        feiertage = []
+        if "Feiertage" in wb.sheetnames:
+            for row in wb["Feiertage"].iter_rows(min_row=2, max_col=3, values_only=True):
+                datum = _to_date(row[0], wb.epoch) if row else None
+                if datum is not None:
+                    name = row[1] if len(row) > 1 and row[1] else ""
+                    bl = row[2] if len(row) > 2 and row[2] else ""
+                    feiertage.append((datum, str(name), str(bl)))
+
+        auswertung = []
+        if "Auswertung" in wb.sheetnames:
+            for row in wb["Auswertung"].iter_rows(min_row=2, max_col=12, values_only=True):
+                # Nur von calculate.py geschriebene Zeilen (Zahlen in B–E, G–L)
+                if not row or not row[0] or len(row) < 12:
+                    continue
+                werte = row[1:5] + row[6:12]
+                if not all(isinstance(v, (int, float)) for v in werte):
+                    continue
+                result = {'mitarbeiter': str(row[0]), 'schwelle_erreicht': 'JA' if row[5] == 'JA' else 'NEIN'}
+                result.update(zip(WERTE_SPALTEN, (float(v) for v in werte)))
+                auswertung.append(result)
+    finally:
+        wb.close()
+
+    return plan, feiertage, auswertung, bundesland
+
+
+def write_snapshot(path, plan, feiertage=(), auswertung=(), bundesland="NRW"):
+    """
+    Schreibt einen Snapshot.
+
+    plan: (datum, mitarbeiter[, anteil]); feiertage: (datum, name, bl);
+    auswertung: Ergebnis-Dictionaries wie von calculate_verguetung.
+    """
+    mitarbeiter_codes = {}
+    namen_codes = {}
+    bl_codes = {}
+
+    def code(codes, value):
+        return codes.setdefault(value, len(codes))
+
+    spalten = {
+        "plan_datum": array("i"),
+        "plan_mitarbeiter": array("i"),
+        "plan_anteil": array("d"),
+        "feiertage_datum": array("i"),
+        "feiertage_name": array("i"),
+        "feiertage_bl": array("i"),
+        "auswertung_mitarbeiter": array("i"),
+        "auswertung_werte": array("d"),
+        "auswertung_schwelle": array("b"),
+    }
+
+    for entry in plan:
+        datum, mitarbeiter = entry[0], entry[1]
+        anteil = entry[2] if len(entry) > 2 else None
+        spalten["plan_datum"].append(datum.toordinal())
+        spalten["plan_mitarbeiter"].append(code(mitarbeiter_codes, mitarbeiter))
+        spalten["plan_anteil"].append(math.nan if anteil is None else float(anteil))
+
+    for datum, name, bl in feiertage:
+        spalten["feiertage_datum"].append(datum.toordinal())
+        spalten["feiertage_name"].append(code(namen_codes, name))
+        spalten["feiertage_bl"].append(code(bl_codes, bl))
+
+    for result in auswertung:
+        spalten["auswertung_mitarbeiter"].append(code(mitarbeiter_codes, result['mitarbeiter']))
+        spalten["auswertung_werte"].extend(float(result[key]) for key in WERTE_SPALTEN)
+        spalten["auswertung_schwelle"].append(1 if result['schwelle_erreicht'] == 'JA' else 0)
+
+    # Kopf zweimal aufbauen: die Offsets hängen von der Kopflänge ab
+    def build_header(offset_base):
+        layout = {}
+        offset = offset_base
+        for name, values in spalten.items():
+            offset += -offset % _ALIGN
+            layout[name] = {"offset": offset, "typ": values.typecode, "laenge": len(values)}
+            offset += len(values) * values.itemsize
+        header = {
+            "version": 1,
+            "byteorder": sys.byteorder,
+            "bundesland": bundesland,
+            "mitarbeiter": list(mitarbeiter_codes),
+            "feiertagsnamen": list(namen_codes),
+            "bundeslaender": list(bl_codes),
+            "spalten": layout,
+        }
+        return json.dumps(header, ensure_ascii=False).encode("utf-8")
+
+    header = build_header(0)
+    while True:
+        base = len(MAGIC) + 4 + len(header)
+        new_header = build_header(base)
+        if len(new_header) == len(header):
+            header = new_header
+            break
+        header = new_header
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        position = len(MAGIC) + 4 + len(header)
+        for name, values in spalten.items():
+            padding = -position % _ALIGN
+            f.write(b"\0" * padding)
+            position += padding
+            values.tofile(f)
+            position += len(values) * values.itemsize
+
+
+class Snapshot:
+    """Per mmap geöffneter Snapshot; Spalten sind memoryviews auf die Datei."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # leere Datei
+            self._file.close()
+            raise ValueError(f"'{path}' ist kein gültiger Snapshot")
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"'{path}' ist kein gültiger Snapshot")
+
+        (header_len,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(self._mmap[start:start + header_len].decode("utf-8"))
+        self.bundesland = self.header["bundesland"]
+        self.mitarbeiter = self.header["mitarbeiter"]
+
+        self._view = memoryview(self._mmap)
+        self.columns = {name: self._column(name, info) for name, info in self.header["spalten"].items()}
+
+    def _column(self, name, info):
+        itemsize = array(info["typ"]).itemsize
+        raw = self._view[info["offset"]:info["offset"] + info["laenge"] * itemsize]
+        if self.header["byteorder"] == sys.byteorder:
+            return raw.cast(info["typ"])
+        # Fremde Byte-Reihenfolge: Kopie mit vertauschten Bytes
+        values = array(info["typ"], raw.tobytes())
+        values.byteswap()
+        return values
+
+    def __len__(self):
+        return len(self.columns["plan_datum"])
+
+    def plan_data(self):
+        """Plan-Einträge als (datum, mitarbeiter) für calculate_verguetung (PlanEntries)."""
+        return PlanEntries.from_columns(
+            self.columns["plan_datum"], self.columns["plan_mitarbeiter"], self.mitarbeiter,
+        )
+
+    def plan_rows(self):
+        """Plan-Einträge inkl. Anteil als (datum, mitarbeiter, anteil|None) (PlanEntries)."""
+        return PlanEntries.from_columns(
+            self.columns["plan_datum"], self.columns["plan_mitarbeiter"], self.mitarbeiter,
+            self.columns["plan_anteil"],
+        )
+
+    def holidays(self, bundesland=None):
+        """Feiertage (datum, name, bl); mit bundesland nur die Einträge dieses Lands."""
+        namen = self.header["feiertagsnamen"]
+        laender = self.header["bundeslaender"]
+        rows = []
+        for ordinal, name_code, bl_code in zip(
+            self.columns["feiertage_datum"], self.columns["feiertage_name"], self.columns["feiertage_bl"]
+        ):
+            if bundesland is None or laender[bl_code] == bundesland:
+                rows.append((date.fromordinal(ordinal), namen[name_code], laender[bl_code]))
+        return rows
+
+    def auswertung(self):
+        """Gespeicherte Auswertung als Ergebnis-Dictionaries."""
+        werte = self.columns["auswertung_werte"]
+        anzahl = len(WERTE_SPALTEN)
+        results = []
+        for idx, (code, schwelle) in enumerate(zip(
+            self.columns["auswertung_mitarbeiter"], self.columns["auswertung_schwelle"]
+        )):
+            result = {'mitarbeiter': self.mitarbeiter[code], 'schwelle_erreicht': 'JA' if schwelle else 'NEIN'}
+            result.update(zip(WERTE_SPALTEN, werte[idx * anzahl:(idx + 1) * anzahl]))
+            results.append(result)
+        return results
+
+    def close(self):
+        if getattr(self, "columns", None):
+            for column in self.columns.values():
+                if isinstance(column, memoryview):
+                    column.release()
+            self.columns = {}
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+            self._view = None
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_snapshot(xlsx_path, snapshot_path):
+    """Konvertiert Plan, Feiertage und Auswertung einer Arbeitsmappe in einen Snapshot."""
+    plan, feiertage, auswertung, bundesland = _read_workbook_sheets(xlsx_path)
+    write_snapshot(snapshot_path, plan, feiertage, auswertung, bundesland)
+    return len(plan), len(feiertage), len(auswertung)
+
+
+def import_snapshot(snapshot_path, xlsx_path):
+    """Schreibt die Blätter Regeln (BL), Feiertage, Plan und Auswertung aus einem Snapshot als Arbeitsmappe."""
+    from openpyxl import Workbook
+    from auswertung_writer import AUSWERTUNG_HEADERS, auswertung_row
+
+    with Snapshot(snapshot_path) as snap:
+        wb = Workbook(write_only=True)
+
+        regeln_ws = wb.create_sheet("Regeln")
+        regeln_ws.append(["Parameter", "Wert", "Beschreibung"])
+        regeln_ws.append(["BL_Auswahl", snap.bundesland, "Bundesland (steuert Feiertage)"])
+
+        feiertage_ws = wb.create_sheet("Feiertage")
+        feiertage_ws.append(["Datum", "Name", "BL"])
+        for row in snap.holidays():
+            feiertage_ws.append(list(row))
+
+        plan_ws = wb.create_sheet("Plan")
+        plan_ws.append(["Datum", "Mitarbeiter", "Anteil"])
+        for row in snap.plan_rows():
+            plan_ws.append(list(row))
+
+        auswertung_ws = wb.create_sheet("Auswertung")
+        auswertung_ws.append(AUSWERTUNG_HEADERS)
+        for result in snap.auswertung():
+            auswertung_ws.append(auswertung_row(result))
+
+        counts = (len(snap), len(snap.columns["feiertage_datum"]), len(snap.columns["auswertung_schwelle"]))
+
+    wb.save(xlsx_path)
+    return counts
+
+
+def main(argv=None):
+    """Kommandozeile (auch `dienstplan snapshot`); gibt den Exit-Code zurück."""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3 or argv[0] not in ("export", "import"):
+        print("Verwendung: python src/snapshot.py export <plan.xlsx> <plan.dpsnap>")
+        print("            python src/snapshot.py import <plan.dpsnap> <plan.xlsx>")
+        return 1
+
+    command, source, target = argv
+    try:
+        if command == "export":
+            plan_count, holiday_count, result_count = export_snapshot(source, target)
+        else:
+            plan_count, holiday_count, result_count = import_snapshot(source, target)
+    except FileNotFoundError:
+        print(f"❌ Fehler: Datei '{source}' nicht gefunden")
+        return 1
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Fehler beim Konvertieren von '{source}': {e}")
+        return 1
+
+    print(f"✅ {source} → {target}")
+    print(f"   {plan_count} Plan-Einträge, {holiday_count} Feiertage, {result_count} Auswertungszeilen")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,138 @@
+"""
+Prüfungen des Plans (Fehlerliste und Ampel laut SPECIFICATION.md)
+
+PlanValidator wird beim Einlesen Zeile für Zeile gefüttert (siehe
+calculate._read_plan_rows) und baut dabei Hash-Indizes über Datum und
+(Datum, Mitarbeiter) auf. Jede Zeile kostet O(1), der ganze Plan O(n):
+
+- Datum außerhalb des gewählten Monats (Regeln!Monat_Auswahl)
+- Anteil ≤ 0 oder > 1 bzw. kein Zahlwert
+- Leerer Mitarbeiter (Anteil eingetragen, aber kein Name)
+- Mitarbeiter ohne Datum, ungültiges Datum
+- Doppelte Einträge (gleiches Datum und gleicher Mitarbeiter)
+- Summe der Anteile je Datum ≠ 1,0 (Ampel)
+
+Vorbefüllte Zeilen mit Datum, aber ohne Mitarbeiter und Anteil, sind keine
+Fehler.
+"""
+
+ANTEIL_TOLERANZ = 0.0001  # Abweichung der Anteilsumme je Datum von 1,0 (Blatt 'Checks')
+
+# Fehlerarten der Fehlerliste
+FEHLER_MONAT = "Datum außerhalb des Monats"
+FEHLER_ANTEIL = "Anteil ≤ 0 oder > 1"
+FEHLER_ANTEIL_TYP = "Anteil ist keine Zahl"
+FEHLER_MITARBEITER = "Leerer Mitarbeiter"
+FEHLER_DATUM_FEHLT = "Datum fehlt"
+FEHLER_DATUM = "Ungültiges Datum"
+FEHLER_DOPPELT = "Doppelter Eintrag"
+
+
+def anteil_summen(plan_data):
+    """
+    Summe der Anteile je Datum in einem Durchlauf.
+
+    Einträge ohne Anteil (oder (datum, mitarbeiter)-Tupel) zählen wie in der
+    Berechnung mit 1 / Anzahl der Einträge des Tages.
+    """
+    index = {}
+    for eintrag in plan_data:
+        summe = index.get(eintrag[0])
+        if summe is None:
+            summe = index[eintrag[0]] = [0.0, 0, 0]  # eingetragene Anteile, Einträge, ohne Anteil
+        summe[1] += 1
+        if len(eintrag) > 2 and eintrag[2] is not None:
+            summe[0] += eintrag[2]
+        else:
+            summe[2] += 1
+
+    return _summen(index)
+
+
+def _summen(index):
+    return {datum: explizit + ohne / anzahl for datum, (explizit, anzahl, ohne) in index.items()}
+
+
+def check_anteile(summen):
+    """Zeilen für das Blatt Checks: (datum, summe, 'OK'|'FEHLER') nach Datum sortiert."""
+    return [
+        (datum, summe, 'OK' if abs(summe - 1.0) <= ANTEIL_TOLERANZ else 'FEHLER')
+        for datum, summe in sorted(summen.items())
+    ]
+
+
+def _ist_zahl(wert):
+    return isinstance(wert, (int, float)) and not isinstance(wert, bool)
+
+
+def gueltiger_anteil(anteil):
+    """
+    Eingetragener Anteil für die Berechnung: die Zahl bei 0 < anteil ≤ 1, sonst None.
+
+    Ungültige Werte (≤ 0, > 1, NaN, Text, Wahrheitswerte) stehen als Fehler
+    in der Fehlerliste; gerechnet wird für sie wie ohne Eintrag mit
+    1 / Anzahl des Tages, damit eine solche Zeile die Auszahlung nicht
+    vervielfacht.
+    """
+    return anteil if _ist_zahl(anteil) and 0 < anteil <= 1 else None
+
+
+class PlanValidator:
+    """
+    Sammelt Prüfungsfehler während des Einlesens.
+
+    monat: erster Tag des gewählten Monats (date) oder None (keine
+    Monatsprüfung). fehler enthält (zeile, datum, mitarbeiter, text)-Tupel
+    in Zeilenreihenfolge.
+    """
+
+    def __init__(self, monat=None):
+        self.set_monat(monat)
+        self.fehler = []
+        self._tage = {}  # datum -> [eingetragene Anteile, Einträge, ohne Anteil]
+        self._eintraege = {}  # (datum, mitarbeiter) -> erste Zeile
+
+    def set_monat(self, monat):
+        """Setzt den Monat für die Monatsprüfung (date oder None)."""
+        self.monat = (monat.year, monat.month) if monat is not None else None
+
+    def add(self, zeile, datum, mitarbeiter, anteil):
+        """Prüft eine Plan-Zeile mit gültigem Datum (anteil: Rohwert aus Spalte C)."""
+        if not mitarbeiter:
+            if anteil is not None:
+                self.fehler.append((zeile, datum, None, FEHLER_MITARBEITER))
+            return
+
+        if self.monat is not None and (datum.year, datum.month) != self.monat:
+            self.fehler.append((zeile, datum, mitarbeiter, FEHLER_MONAT))
+
+        if anteil is not None and not _ist_zahl(anteil):
+            self.fehler.append((zeile, datum, mitarbeiter, f"{FEHLER_ANTEIL_TYP} ('{anteil}')"))
+            anteil = None
+        elif anteil is not None and not 0 < anteil <= 1:
+            self.fehler.append((zeile, datum, mitarbeiter, f"{FEHLER_ANTEIL} ({anteil})"))
+
+        tag = self._tage.get(datum)
+        if tag is None:
+            tag = self._tage[datum] = [0.0, 0, 0]
+        tag[1] += 1
+        if anteil is None:
+            tag[2] += 1
+        else:
+            tag[0] += anteil
+
+        erste = self._eintraege.setdefault((datum, mitarbeiter), zeile)
+        if erste != zeile:
+            self.fehler.append((zeile, datum, mitarbeiter, f"{FEHLER_DOPPELT} (wie Zeile {erste})"))
+
+    def datum_fehlt(self, zeile, mitarbeiter):
+        """Zeile mit Mitarbeiter, aber ohne Datum."""
+        self.fehler.append((zeile, None, mitarbeiter, FEHLER_DATUM_FEHLT))
+
+    def ungueltiges_datum(self, zeile, datum_raw, mitarbeiter):
+        """Zeile, deren Datum nicht gelesen werden konnte."""
+        self.fehler.append((zeile, None, mitarbeiter, f"{FEHLER_DATUM} ('{datum_raw}')"))
+
+    def checks(self):
+        """Ampel je Datum wie check_anteile."""
+        return check_anteile(_summen(self._tage))
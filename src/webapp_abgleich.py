@@ -0,0 +1,352 @@
+"""
+Abgleich der Webapp-Daten (localStorage) mit der Python-Berechnung
+
+Die Webapp (webapp/) speichert Mitarbeiter und Dienste im localStorage des
+Browsers und rechnet mit einer eigenen Umsetzung der Regeln
+(BonusCalculator.calculateMonthlyBonus in webapp/calculator.js). Dieses
+Skript liest den Export der Webapp (Button "Exportieren") oder einen
+localStorage-Abzug und vergleicht beide Berechnungen je Mitarbeiter und
+Monat:
+
+- Python: alle Dienste aller Mitarbeiter und Monate in einem Durchlauf
+  durch calculate.accumulate_monate (eingetragene Anteile, NRW-Feiertage
+  aus feiertage.py), Schwelle und Abzug je Person und Kalendermonat.
+- Webapp: calculator.js und holidays.js laufen unverändert in einem
+  einzigen Node.js-Prozess über alle Monate, oder die Ergebnisse kommen
+  aus einer Datei (--webapp-ergebnisse, Aufbau {mitarbeiter: {"JJJJ-MM":
+  Ergebnis von calculateMonthlyBonus}}).
+
+Die Webapp speichert Datumswerte per toISOString() in UTC; der Kalendertag
+ergibt sich erst in der Zeitzone des Browsers (--zeitzone, Standard
+Europe/Berlin). Beide Seiten rechnen in derselben Zeitzone.
+
+Der Bericht listet je Abweichung Mitarbeiter, Monat, Feld und beide Werte
+(Konsole, optional --output als .csv oder .jsonl); mit Abweichungen endet
+das Skript mit Exit-Code 1.
+
+Verwendung:
+    python src/webapp_abgleich.py dienstplan-export-2025-11-30.json
+    python src/webapp_abgleich.py export.json --output output/abgleich.csv
+    python src/webapp_abgleich.py export.json --webapp-ergebnisse webapp_ergebnisse.json
+"""
+
+from datetime import date, datetime, timezone
+from pathlib import Path
+import argparse
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from auswertung_writer import CSV_DELIMITER
+from calculate import accumulate_monate, build_monats_results, calculation_holidays
+from records import PlanEntries
+
+
+WEBAPP_DIR = Path(__file__).resolve().parent.parent / "webapp"
+STORAGE_KEY_EMPLOYEES = "dienstplan_employees"
+STORAGE_KEY_DUTIES = "dienstplan_duties"
+BUNDESLAND = "NRW"  # die Webapp kennt nur NRW
+DEFAULT_ZEITZONE = "Europe/Berlin"
+
+# Feld der Webapp -> Feld des Python-Ergebnisses (None: aus schwelle_erreicht)
+FELDER = {
+    "normalDays": "wt_einheiten",
+    "qualifyingDaysFriday": "we_freitag",
+    "qualifyingDaysOther": "we_andere",
+    "thresholdReached": None,
+    "deductionFromFriday": "abzug_freitag",
+    "deductionFromOther": "abzug_andere",
+    "qualifyingDaysPaid": "we_bezahlt",
+    "bonusNormalDays": "auszahlung_wt",
+    "bonusQualifyingDays": "auszahlung_we",
+    "totalBonus": "auszahlung_gesamt",
+}
+BETRAG_FELDER = ("bonusNormalDays", "bonusQualifyingDays", "totalBonus")
+TOLERANZ_EINHEITEN = 1e-6
+TOLERANZ_BETRAG = 0.005  # halber Cent
+BERICHT_HEADERS = ["Mitarbeiter", "Monat", "Feld", "Webapp", "Python"]
+AUSGABE_MAX = 10  # Abweichungen, die auf der Konsole einzeln erscheinen
+
+# Führt calculator.js/holidays.js aus; Dienste als JSON auf stdin, Ergebnisse auf stdout
+NODE_SKRIPT = r"""
+const fs = require('fs'), path = require('path'), vm = require('vm');
+globalThis.window = globalThis;
+for (const datei of ['holidays.js', 'calculator.js']) {
+    vm.runInThisContext(fs.readFileSync(path.join(process.argv[1], datei), 'utf8'), { filename: datei });
+}
+const calculator = new window.BonusCalculator(new window.HolidayProvider());
+const { employees, duties } = JSON.parse(fs.readFileSync(0, 'utf8'));
+const ergebnisse = {};
+for (const name of employees) {
+    ergebnisse[name] = {};
+    for (const [monat, liste] of Object.entries(duties[name] || {})) {
+        const dienste = liste.map(d => ({ ...d, date: new Date(d.date) })).filter(d => !isNaN(d.date.getTime()));
+        const ergebnis = calculator.calculateMonthlyBonus(dienste);
+        delete ergebnis.dutyDetails;
+        ergebnisse[name][monat] = ergebnis;
+    }
+}
+process.stdout.write(JSON.stringify(ergebnisse));
+"""
+
+
+def _json_wert(wert):
+    # localStorage enthält JSON-Strings, der Export bereits geparste Werte
+    return json.loads(wert) if isinstance(wert, str) else wert
+
+
+def load_webapp_export(filepath):
+    """
+    Liest den Webapp-Export ({employees, duties}) oder einen localStorage-Abzug
+    ({dienstplan_employees, dienstplan_duties}, Werte auch als JSON-Strings).
+
+    Gibt (employees, duties) zurück; duties hat den Aufbau der Webapp
+    {mitarbeiter: {"JJJJ-MM": [{"date": ISO, "share": Zahl}, ...]}}.
+    Fehlt die Mitarbeiterliste, gelten alle Mitarbeiter aus duties.
+    """
+    with open(filepath, encoding="utf-8-sig") as f:
+        daten = json.load(f)
+    if not isinstance(daten, dict):
+        raise ValueError("Export ist kein JSON-Objekt")
+
+    duties = _json_wert(daten.get("duties", daten.get(STORAGE_KEY_DUTIES))) or {}
+    employees = _json_wert(daten.get("employees", daten.get(STORAGE_KEY_EMPLOYEES)))
+    if not isinstance(duties, dict):
+        raise ValueError("'duties' ist kein Objekt")
+    if employees is None:
+        employees = sorted(duties)
+    if not isinstance(employees, list):
+        raise ValueError("'employees' ist keine Liste")
+    return employees, duties
+
+
+def local_date(wert, zone):
+    """
+    Kalendertag eines gespeicherten Datums in der Zeitzone des Browsers.
+
+    toISOString() liefert UTC ("2025-11-02T23:00:00.000Z" ist in Berlin der
+    3.11.); reine Datumswerte ("2025-11-03") gelten unverändert.
+    """
+    if len(wert) == 10:
+        return date.fromisoformat(wert)
+    zeitpunkt = datetime.fromisoformat(wert.replace("Z", "+00:00"))
+    if zeitpunkt.tzinfo is None:
+        zeitpunkt = zeitpunkt.replace(tzinfo=timezone.utc)
+    return zeitpunkt.astimezone(zone).date()
+
+
+def webapp_plan(employees, duties, zone):
+    """
+    Dienste aller Mitarbeiter und Monate als PlanEntries mit (datum, mitarbeiter, anteil).
+
+    Wie in der Webapp zählen nur Mitarbeiter aus employees; Dienste ohne
+    gültiges Datum oder Anteil werden übersprungen. Jeder gespeicherte
+    Datumswert wird nur einmal umgerechnet (dieselben Tage kommen bei allen
+    Mitarbeitern vor). Gibt (plan_data, uebersprungen) zurück.
+    """
+    plan_data = PlanEntries(with_anteil=True)
+    tage = {}  # gespeicherter Wert -> date
+    uebersprungen = 0
+    for mitarbeiter in employees:
+        for liste in (duties.get(mitarbeiter) or {}).values():
+            for dienst in liste:
+                try:
+                    wert = dienst["date"]
+                    datum = tage.get(wert)
+                    if datum is None:
+                        datum = tage[wert] = local_date(wert, zone)
+                    plan_data.append(datum, mitarbeiter, float(dienst["share"]))
+                except (KeyError, TypeError, ValueError):
+                    uebersprungen += 1
+    return plan_data, uebersprungen
+
+
+def run_webapp_calculator(employees, duties, zeitzone=DEFAULT_ZEITZONE, webapp_dir=WEBAPP_DIR):
+    """
+    Berechnet alle Monate mit calculator.js der Webapp in einem Node.js-Prozess.
+
+    Gibt {mitarbeiter: {"JJJJ-MM": Ergebnis}} zurück (Ergebnis ohne
+    dutyDetails). Wirft RuntimeError, wenn node fehlt oder fehlschlägt.
+    """
+    node = shutil.which("node") or shutil.which("nodejs")
+    if node is None:
+        raise RuntimeError("Node.js nicht gefunden - Webapp-Ergebnisse mit --webapp-ergebnisse angeben")
+    proc = subprocess.run(
+        [node, "-e", NODE_SKRIPT, str(webapp_dir)],
+        input=json.dumps({"employees": employees, "duties": duties}),
+        capture_output=True, text=True, encoding="utf-8", env={**os.environ, "TZ": zeitzone},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or f"node endete mit Exit-Code {proc.returncode}")
+    return json.loads(proc.stdout)
+
+
+def _python_wert(result, feld):
+    if result is None:
+        return False if FELDER[feld] is None else 0.0
+    if FELDER[feld] is None:
+        return result['schwelle_erreicht'] == 'JA'
+    return result[FELDER[feld]]
+
+
+def _weicht_ab(feld, webapp, python):
+    if isinstance(webapp, bool) or isinstance(python, bool):
+        return bool(webapp) != bool(python)
+    toleranz = TOLERANZ_BETRAG if feld in BETRAG_FELDER else TOLERANZ_EINHEITEN
+    return abs(float(webapp) - float(python)) > toleranz
+
+
+def compare(webapp_ergebnisse, monats_results):
+    """
+    Vergleicht die Webapp-Ergebnisse mit den Python-Monatsergebnissen.
+
+    Verglichen wird jeder Monat, der auf einer der beiden Seiten vorkommt;
+    fehlt er auf einer Seite, zählt dort ein leeres Ergebnis (alles 0).
+    Gibt (anzahl_monate, abweichungen) zurück, abweichungen als Liste von
+    (mitarbeiter, monat, feld, webapp, python).
+    """
+    python = {
+        (result['mitarbeiter'], f"{result['jahr']}-{result['monat']:02d}"): result
+        for result in monats_results
+    }
+    webapp = {
+        (mitarbeiter, monat): ergebnis
+        for mitarbeiter, monate in webapp_ergebnisse.items()
+        for monat, ergebnis in monate.items()
+    }
+
+    abweichungen = []
+    schluessel = sorted(python.keys() | webapp.keys())
+    for mitarbeiter, monat in schluessel:
+        ergebnis = webapp.get((mitarbeiter, monat)) or {}
+        result = python.get((mitarbeiter, monat))
+        for feld in FELDER:
+            wert = ergebnis.get(feld, False if FELDER[feld] is None else 0)
+            python_wert = _python_wert(result, feld)
+            if _weicht_ab(feld, wert, python_wert):
+                abweichungen.append((mitarbeiter, monat, feld, wert, python_wert))
+    return len(schluessel), abweichungen
+
+
+def write_bericht(output_path, abweichungen):
+    """Schreibt die Abweichungen als CSV (Semikolon) oder, bei Endung .jsonl, als JSON-Lines."""
+    if Path(output_path).suffix.lower() == ".jsonl":
+        with open(output_path, "w", encoding="utf-8") as f:
+            for zeile in abweichungen:
+                f.write(json.dumps(dict(zip(BERICHT_HEADERS, zeile)), ensure_ascii=False) + "\n")
+        return
+
+    with open(output_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f, delimiter=CSV_DELIMITER)
+        writer.writerow(BERICHT_HEADERS)
+        writer.writerows(abweichungen)
+
+
+def abgleich(filepath, webapp_ergebnisse_path=None, output_path=None, zeitzone=DEFAULT_ZEITZONE):
+    """
+    Liest den Export, rechnet beide Seiten und gibt den Bericht aus.
+
+    Gibt eine Zusammenfassung (Monate, Abweichungen, Dauer je Seite) zurück,
+    None bei Fehlern.
+    """
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+    try:
+        zone = ZoneInfo(zeitzone)
+    except (ZoneInfoNotFoundError, ValueError):
+        print(f"❌ Fehler: Zeitzone '{zeitzone}' nicht gefunden (unter Windows: pip install tzdata)")
+        return None
+
+    try:
+        employees, duties = load_webapp_export(filepath)
+    except FileNotFoundError:
+        print(f"❌ Fehler: Datei '{filepath}' nicht gefunden")
+        return None
+    except (OSError, ValueError) as e:
+        print(f"❌ Fehler beim Laden des Webapp-Exports '{filepath}': {e}")
+        return None
+
+    ohne_liste = sorted(set(duties) - set(employees))
+    if ohne_liste:
+        print(f"⚠️ Warnung: {len(ohne_liste)} Mitarbeiter mit Diensten fehlen in der Mitarbeiterliste "
+              f"(in der Webapp unsichtbar, nicht verglichen): {', '.join(ohne_liste[:3])}")
+
+    start = time.perf_counter()
+    plan_data, uebersprungen = webapp_plan(employees, duties, zone)
+    if uebersprungen:
+        print(f"⚠️ Warnung: {uebersprungen} Dienste ohne gültiges Datum oder Anteil übersprungen")
+    holidays = calculation_holidays(plan_data, BUNDESLAND)
+    monats_results = build_monats_results(accumulate_monate(plan_data, holidays, BUNDESLAND))
+    dauer_python = time.perf_counter() - start
+    print(f"📋 {len(plan_data)} Dienste von {len(employees)} Mitarbeitern gelesen")
+
+    start = time.perf_counter()
+    try:
+        if webapp_ergebnisse_path is not None:
+            with open(webapp_ergebnisse_path, encoding="utf-8-sig") as f:
+                webapp_ergebnisse = json.load(f)
+        else:
+            webapp_ergebnisse = run_webapp_calculator(employees, duties, zeitzone)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"❌ Fehler bei den Webapp-Ergebnissen: {e}")
+        return None
+    dauer_webapp = time.perf_counter() - start
+
+    monate, abweichungen = compare(webapp_ergebnisse, monats_results)
+    betroffen = sorted({(mitarbeiter, monat) for mitarbeiter, monat, *_ in abweichungen})
+
+    print(f"\n{'='*70}")
+    print(f"Abgleich: {monate} Mitarbeiter-Monate | Python {dauer_python:.2f} s | Webapp {dauer_webapp:.2f} s")
+    print(f"{'='*70}")
+    if abweichungen:
+        print(f"❌ {len(betroffen)} Mitarbeiter-Monate weichen ab ({len(abweichungen)} Felder)")
+        for mitarbeiter, monat, feld, wert, python_wert in abweichungen[:AUSGABE_MAX]:
+            print(f"   {mitarbeiter} {monat} {feld}: Webapp {wert} / Python {python_wert}")
+        if len(abweichungen) > AUSGABE_MAX:
+            print(f"   ... weitere {len(abweichungen) - AUSGABE_MAX}")
+    else:
+        print("✅ Keine Abweichungen")
+
+    if output_path is not None:
+        try:
+            write_bericht(output_path, abweichungen)
+        except OSError as e:
+            print(f"❌ Fehler beim Speichern des Berichts '{output_path}': {e}")
+            return None
+        print(f"📄 Bericht gespeichert: {output_path}")
+
+    return {
+        'mitarbeiter_monate': monate,
+        'abweichende_monate': len(betroffen),
+        'abweichungen': len(abweichungen),
+        'dauer_python_s': round(dauer_python, 3),
+        'dauer_webapp_s': round(dauer_webapp, 3),
+    }
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Webapp-Daten (localStorage-Export) mit der Python-Berechnung abgleichen")
+    parser.add_argument("export", help="Export der Webapp (.json) oder localStorage-Abzug")
+    parser.add_argument("--webapp-ergebnisse", metavar="DATEI",
+                        help="Ergebnisse der Webapp als JSON statt Berechnung mit Node.js")
+    parser.add_argument("--output", help="Abweichungen als .csv oder .jsonl speichern")
+    parser.add_argument("--zeitzone", default=DEFAULT_ZEITZONE,
+                        help=f"Zeitzone des Browsers für gespeicherte Datumswerte (Standard: {DEFAULT_ZEITZONE})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Kommandozeile (auch `dienstplan webapp`); gibt den Exit-Code zurück."""
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    summary = abgleich(args.export, args.webapp_ergebnisse, args.output, args.zeitzone)
+    return 0 if summary is not None and summary['abweichungen'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
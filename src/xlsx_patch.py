@@ -0,0 +1,603 @@
+"""
+Blätter direkt im .xlsx-Archiv ersetzen (ohne openpyxl-Rundreise)
+
+Um die Auswertung in die Plan-Datei zu schreiben, lädt openpyxl sonst die
+ganze Arbeitsmappe (Formeln, Tabellen, Gültigkeitsprüfungen, Stile) und
+serialisiert und komprimiert beim Speichern jeden Teil neu. XlsxPatch
+ersetzt nur die Zeilen (<sheetData>) der betroffenen Blätter; alle anderen
+ZIP-Einträge werden samt komprimierter Daten Byte für Byte übernommen. Die
+Kosten hängen damit von der Größe der Ergebnisse ab, nicht von der
+Arbeitsmappe, und Inhalte, die openpyxl nicht kennt, bleiben erhalten.
+
+- Zeile 1 (Kopfzeile) bleibt unverändert oder wird ab einer Spalte ersetzt,
+  alle weiteren Zeilen werden neu geschrieben (wie delete_rows + Werte).
+- set_cells setzt dagegen nur einzelne Zellen und lässt den Rest des
+  Blatts (auch Formeln in derselben Zeile) stehen; calcChain.xml wird nur
+  entfernt, wenn dabei eine Formel überschrieben wird. Mit copy() lassen sich
+  aus einer einmal gelesenen Vorlage viele Dateien erzeugen.
+- Alles außerhalb von <sheetData> (Spaltenbreiten, bedingte Formate,
+  Gültigkeiten, Tabellen, Ansichten) bleibt wie es ist.
+- Texte werden als Inline-Strings geschrieben, sharedStrings.xml bleibt
+  unverändert.
+- Benötigte Zellformate (Füllfarbe, fett, Zahlenformat) werden in
+  styles.xml gesucht und nur wenn sie fehlen angehängt.
+- calcChain.xml (Berechnungsreihenfolge, ein reiner Cache) wird entfernt,
+  weil die ersetzten Zeilen Formeln enthalten haben können; Excel legt sie
+  beim nächsten Speichern neu an.
+
+Fälle, die sich so nicht abbilden lassen (neues Blatt, ZIP64, Strict-OOXML,
+XML mit Namensraum-Präfix), melden NichtPatchbar; der Aufrufer speichert
+dann wie bisher über openpyxl.
+"""
+
+from collections import defaultdict, namedtuple
+from datetime import date, datetime
+from pathlib import Path
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+import copy
+import os
+import posixpath
+import re
+import struct
+import tempfile
+import time
+import zipfile
+import zlib
+
+from datum import EXCEL_EPOCHE
+
+
+NS = {
+    "m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+OFFICE_DOCUMENT = "/officeDocument"
+STYLES = "/styles"
+CALC_CHAIN = "/calcChain"
+SHARED_STRINGS = "/sharedStrings"
+
+KOMPRESSION = 6  # zlib-Stufe wie zipfile.ZIP_DEFLATED
+
+# ZIP-Strukturen (PKWARE APPNOTE), Layout wie in zipfile
+_LOKAL = struct.Struct("<4s2B4HL2L2H")
+_ZENTRAL = struct.Struct("<4s4B4HL2L5H2L")
+_ENDE = struct.Struct("<4s4H2LH")
+_ZIP64_GRENZE = 0xFFFFFFFF
+
+_SHEET_DATA = re.compile(r"<sheetData\s*/>|<sheetData>(.*?)</sheetData>", re.S)
+_ZEILE = re.compile(r"<row\b[^>]*?/>|<row\b[^>]*>.*?</row>", re.S)
+_ZELLE = re.compile(r"<c\b[^>]*?/>|<c\b[^>]*>.*?</c>", re.S)
+_REF = re.compile(r'\br="([A-Z]+)(\d+)"')
+_ZEILEN_NR = re.compile(r'<row\b[^>]*?\br="(\d+)"')
+_STIL = re.compile(r'\bs="(\d+)"')
+_FORMEL = re.compile(r"<f\b")
+_ZELL_REF = re.compile(r"([A-Z]+)(\d+)")
+_DIMENSION = re.compile(r"<dimension\b[^>]*/>")
+_DIMENSION_REF = re.compile(r'<dimension\b[^>]*\bref="[A-Z]*\d*:?([A-Z]+)(\d+)"')
+
+
+Zelle = namedtuple("Zelle", "wert stil")
+Zelle.__doc__ = "Zellwert mit Zellformat (Index aus XlsxPatch.style)."
+
+
+class NichtPatchbar(ValueError):
+    """Die Arbeitsmappe lässt sich nicht direkt patchen (Aufrufer speichert über openpyxl)."""
+
+
+def _spalte(index):
+    """1 -> 'A', 27 -> 'AA'."""
+    name = ""
+    while index:
+        index, rest = divmod(index - 1, 26)
+        name = chr(65 + rest) + name
+    return name
+
+
+def _spalten_index(name):
+    """'A' -> 1, 'AA' -> 27."""
+    index = 0
+    for zeichen in name:
+        index = index * 26 + ord(zeichen) - 64
+    return index
+
+
+def _seriennummer(wert, epoche):
+    if isinstance(wert, datetime):
+        delta = wert - datetime.combine(epoche, datetime.min.time())
+        return delta.days + delta.seconds / 86400 + delta.microseconds / 86400e6
+    return (wert - epoche).days
+
+
+def _zelle_xml(ref, wert, stil, epoche):
+    """XML einer Zelle; leerer String für leere Zellen ohne Format."""
+    s = f' s="{stil}"' if stil else ""
+    if wert is None:
+        return f'<c r="{ref}"{s}/>' if stil else ""
+    if isinstance(wert, bool):
+        return f'<c r="{ref}"{s} t="b"><v>{int(wert)}</v></c>'
+    if isinstance(wert, (int, float)):
+        return f'<c r="{ref}"{s}><v>{wert!r}</v></c>'
+    if isinstance(wert, date):
+        return f'<c r="{ref}"{s}><v>{_seriennummer(wert, epoche)!r}</v></c>'
+    text = str(wert)
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    return f'<c r="{ref}"{s} t="inlineStr"><is><t{space}>{escape(text)}</t></is></c>'
+
+
+def _ziel(part, target):
+    """Absoluter Teilname (ohne führenden /) eines Relationship-Targets relativ zu part."""
+    if not target.startswith("/"):
+        target = posixpath.join(posixpath.dirname(part), target)
+    return posixpath.normpath(target).lstrip("/")
+
+
+def _rels_part(part):
+    verzeichnis, name = posixpath.split(part)
+    return posixpath.join(verzeichnis, "_rels", f"{name}.rels")
+
+
+def _dos_zeit(date_time):
+    jahr, monat, tag, stunde, minute, sekunde = date_time
+    return stunde << 11 | minute << 5 | sekunde // 2, (jahr - 1980) << 9 | monat << 5 | tag
+
+
+def _name_bytes(info):
+    return info.filename.encode("utf-8" if info.flag_bits & 0x800 else "cp437")
+
+
+def _liste_erweitern(xml, tag, element, index):
+    """Hängt element an die Liste <tag count="…"> in styles.xml an (index = Anzahl bisher)."""
+    ende = xml.find(f"</{tag}>")
+    if ende < 0:
+        raise NichtPatchbar(f"styles.xml: <{tag}> nicht gefunden")
+    start = xml.rfind(f"<{tag}", 0, ende)
+    kopf_ende = xml.index(">", start)
+    kopf = re.sub(r'\scount="\d+"', "", xml[start:kopf_ende]) + f' count="{index + 1}"'
+    return xml[:start] + kopf + xml[kopf_ende:ende] + element + xml[ende:]
+
+
+Arbeitsmappe = namedtuple("Arbeitsmappe", "part blaetter epoche styles shared_strings calc_chain")
+Arbeitsmappe.__doc__ = """
+Aufbau einer .xlsx-Datei aus workbook.xml und den Rels: Teilname der
+Arbeitsmappe, {Blattname: Teilname} in Blattreihenfolge, Basisdatum der
+Seriennummern und die Teilnamen von styles.xml, sharedStrings.xml und
+calcChain.xml (None, wenn nicht vorhanden).
+"""
+
+
+def _rels(z, part, teile):
+    """{Id: (Type, Teilname)} der Beziehungen von part ("" = Paket)."""
+    rels_part = _rels_part(part) if part else "_rels/.rels"
+    if rels_part not in teile:
+        return {}
+    root = ElementTree.fromstring(z.read(rels_part))
+    return {
+        rel.get("Id"): (rel.get("Type", ""), _ziel(part, rel.get("Target", "")))
+        for rel in root.iterfind("rel:Relationship", NS)
+        if rel.get("TargetMode") != "External"
+    }
+
+
+def workbook_info(z):
+    """Liest den Aufbau (Arbeitsmappe) aus einem geöffneten zipfile.ZipFile; NichtPatchbar bei Strict-OOXML."""
+    teile = set(z.namelist())
+    paket = _rels(z, "", teile)
+    workbook_part = next((ziel for typ, ziel in paket.values() if typ.endswith(OFFICE_DOCUMENT)), None)
+    if workbook_part not in teile:
+        raise NichtPatchbar("Arbeitsmappe (workbook.xml) nicht gefunden")
+    root = ElementTree.fromstring(z.read(workbook_part))
+    if root.tag != f"{{{NS['m']}}}workbook":
+        raise NichtPatchbar("unbekannter Namensraum der Arbeitsmappe")
+
+    pr = root.find("m:workbookPr", NS)
+    rels = _rels(z, workbook_part, teile)
+    blaetter = {}
+    for sheet in root.iterfind("m:sheets/m:sheet", NS):
+        typ, part = rels.get(sheet.get(f"{{{NS['r']}}}id"), ("", None))
+        if part in teile:
+            blaetter[sheet.get("name")] = part
+
+    def teil(endung):
+        return next((ziel for typ, ziel in rels.values() if typ.endswith(endung) and ziel in teile), None)
+
+    return Arbeitsmappe(
+        part=workbook_part,
+        blaetter=blaetter,
+        epoche=EXCEL_EPOCHE[pr is not None and pr.get("date1904") in ("1", "true")],
+        styles=teil(STYLES),
+        shared_strings=teil(SHARED_STRINGS),
+        calc_chain=teil(CALC_CHAIN),
+    )
+
+
+class XlsxPatch:
+    """
+    Ersetzt Zeilen einzelner Blätter einer .xlsx-Datei und schreibt sie neu.
+
+    Vorbereitung (replace_rows, style) liest nur workbook.xml, die Rels,
+    styles.xml und die betroffenen Blätter; save() kopiert alle übrigen
+    Einträge unverändert. Unbekannte Blätter geben KeyError.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        self._neu = {}  # Teilname -> neue Bytes
+        self._original = {}  # Teilname -> gelesene Bytes (mit Kopien geteilt)
+        self._entfernen = set()
+        self._stile = {}
+
+        with zipfile.ZipFile(self.filepath) as z:
+            self._infos = z.infolist()
+            self._kommentar = z.comment
+            if len(self._infos) >= 0xFFFF or any(
+                max(info.file_size, info.compress_size, info.header_offset) >= _ZIP64_GRENZE
+                for info in self._infos
+            ):
+                raise NichtPatchbar("ZIP64-Archiv")
+
+            mappe = workbook_info(z)
+            self._epoche = mappe.epoche
+            self._blaetter = mappe.blaetter
+            self._workbook_rels = _rels_part(mappe.part)
+            self._styles_part = mappe.styles
+            self._calc_chain = mappe.calc_chain
+
+    @property
+    def sheetnames(self):
+        return list(self._blaetter)
+
+    def copy(self):
+        """
+        Unabhängige Kopie mit allen bisherigen Änderungen, z. B. um aus einer
+        Vorlage viele Dateien zu erzeugen; gelesene Teile werden geteilt.
+        """
+        kopie = copy.copy(self)
+        kopie._neu = dict(self._neu)
+        kopie._entfernen = set(self._entfernen)
+        kopie._stile = dict(self._stile)
+        return kopie
+
+    def _lesen(self, part):
+        if part in self._neu:
+            return self._neu[part]
+        if part not in self._original:
+            with zipfile.ZipFile(self.filepath) as z:
+                self._original[part] = z.read(part)
+        return self._original[part]
+
+    # -- Zellformate ---------------------------------------------------------
+
+    def _styles_xml(self):
+        if self._styles_part is None:
+            raise NichtPatchbar("styles.xml fehlt")
+        return self._lesen(self._styles_part).decode("utf-8")
+
+    def _finden_oder_anhaengen(self, pfad, passt, tag, element):
+        """Index des ersten Elements unter pfad, für das passt() gilt; sonst element anhängen."""
+        xml = self._styles_xml()
+        elemente = ElementTree.fromstring(xml).findall(pfad, NS)
+        for index, elem in enumerate(elemente):
+            if passt(elem):
+                return index
+        self._neu[self._styles_part] = _liste_erweitern(xml, tag, element, len(elemente)).encode("utf-8")
+        return len(elemente)
+
+    def _zahlenformat(self, format_code):
+        xml = self._styles_xml()
+        formate = ElementTree.fromstring(xml).findall("m:numFmts/m:numFmt", NS)
+        for fmt in formate:
+            if fmt.get("formatCode") == format_code:
+                return int(fmt.get("numFmtId"))
+
+        num_id = max([163, *(int(fmt.get("numFmtId")) for fmt in formate)]) + 1
+        element = f'<numFmt numFmtId="{num_id}" formatCode="{escape(format_code, {chr(34): "&quot;"})}"/>'
+        if "</numFmts>" in xml:
+            xml = _liste_erweitern(xml, "numFmts", element, len(formate))
+        else:
+            # numFmts ist das erste Kind-Element von styleSheet
+            start = xml.find("<styleSheet")
+            if start < 0:
+                raise NichtPatchbar("styles.xml: <styleSheet> nicht gefunden")
+            kopf_ende = xml.index(">", start) + 1
+            xml = xml[:kopf_ende] + f'<numFmts count="1">{element}</numFmts>' + xml[kopf_ende:]
+        self._neu[self._styles_part] = xml.encode("utf-8")
+        return num_id
+
+    def style(self, fuellung=None, fett=False, zahlenformat=None):
+        """
+        Index eines Zellformats (cellXfs) mit Füllfarbe (RGB, z. B. "C6EFCE"),
+        fetter Schrift und/oder Zahlenformat; vorhandene Formate werden
+        wiederverwendet, fehlende einmal angehängt.
+        """
+        schluessel = (fuellung, fett, zahlenformat)
+        if schluessel in self._stile:
+            return self._stile[schluessel]
+
+        num_id = self._zahlenformat(zahlenformat) if zahlenformat else 0
+        font_id = 0
+        if fett:
+            font_id = self._finden_oder_anhaengen(
+                "m:fonts/m:font",
+                lambda font: [kind.tag for kind in font] == [f"{{{NS['m']}}}b"]
+                and font[0].get("val", "1") not in ("0", "false"),
+                "fonts", '<font><b val="1"/></font>',
+            )
+        fill_id = 0
+        if fuellung:
+            def passt(fill):
+                muster = fill.find("m:patternFill", NS)
+                farbe = muster.find("m:fgColor", NS) if muster is not None else None
+                return (muster.get("patternType") == "solid" and farbe is not None
+                        and farbe.get("rgb", "")[-6:].upper() == fuellung.upper())
+
+            fill_id = self._finden_oder_anhaengen(
+                "m:fills/m:fill", passt, "fills",
+                f'<fill><patternFill patternType="solid"><fgColor rgb="00{fuellung}"/>'
+                f'<bgColor rgb="00{fuellung}"/></patternFill></fill>',
+            )
+
+        def passt_xf(xf):
+            return len(xf) == 0 and xf.get("xfId", "0") == "0" and tuple(
+                int(xf.get(attr, 0)) for attr in ("numFmtId", "fontId", "fillId", "borderId")
+            ) == (num_id, font_id, fill_id, 0)
+
+        anwenden = "".join(
+            f' {attr}="1"' for attr, aktiv in
+            (("applyNumberFormat", num_id), ("applyFont", font_id), ("applyFill", fill_id)) if aktiv
+        )
+        index = self._finden_oder_anhaengen(
+            "m:cellXfs/m:xf", passt_xf, "cellXfs",
+            f'<xf numFmtId="{num_id}" fontId="{font_id}" fillId="{fill_id}" borderId="0" xfId="0"{anwenden}/>',
+        )
+        self._stile[schluessel] = index
+        return index
+
+    # -- Blätter -------------------------------------------------------------
+
+    def _kopfzeile(self, zeile, kopf, kopf_spalte):
+        """Zeile 1 mit den Zellen vor kopf_spalte aus zeile und kopf ab kopf_spalte."""
+        behalten = []
+        oeffnen = '<row r="1">'
+        if zeile is not None:
+            oeffnen = re.sub(r'\sspans="[^"]*"', "", zeile[:zeile.index(">") + 1]).replace("/>", ">")
+            for zelle in _ZELLE.findall(zeile):
+                ref = _REF.search(zelle)
+                if ref is None or _spalten_index(ref.group(1)) < kopf_spalte:
+                    behalten.append(zelle)
+        neu = []
+        for col_idx, wert in enumerate(kopf, start=kopf_spalte):
+            wert, stil = wert if isinstance(wert, Zelle) else (wert, 0)
+            neu.append(_zelle_xml(f"{_spalte(col_idx)}1", wert, stil, self._epoche))
+        return f'{oeffnen}{"".join(behalten)}{"".join(neu)}</row>'
+
+    def replace_rows(self, sheet_name, rows, kopf=None, kopf_spalte=1):
+        """
+        Ersetzt alle Zeilen ab Zeile 2 durch rows (Listen von Werten oder Zelle).
+
+        Zeile 1 bleibt unverändert; mit kopf werden ihre Zellen ab
+        kopf_spalte durch kopf ersetzt. Werte: str, int/float, bool,
+        date/datetime (als Seriennummer, Format über Zelle) oder None.
+        """
+        part = self._blaetter[sheet_name]
+        xml = self._lesen(part).decode("utf-8")
+        treffer = _SHEET_DATA.search(xml)
+        if treffer is None:
+            raise NichtPatchbar(f"Blatt '{sheet_name}': <sheetData> nicht gefunden")
+
+        erste = _ZEILE.match((treffer.group(1) or "").lstrip())
+        zeile_1 = erste.group(0) if erste is not None and re.match(r'<row\b[^>]*\br="1"', erste.group(0)) else None
+        if kopf is not None:
+            zeile_1 = self._kopfzeile(zeile_1, kopf, kopf_spalte)
+
+        breite = max((_spalten_index(ref) for ref, _ in _REF.findall(zeile_1 or "")), default=1)
+        letzte = 1
+        teile = [zeile_1 or ""]
+        epoche = self._epoche
+        for row_idx, row in enumerate(rows, start=2):
+            zellen = []
+            for col_idx, wert in enumerate(row, start=1):
+                wert, stil = wert if isinstance(wert, Zelle) else (wert, 0)
+                zelle = _zelle_xml(f"{_spalte(col_idx)}{row_idx}", wert, stil, epoche)
+                if zelle:
+                    zellen.append(zelle)
+                    breite = max(breite, col_idx)
+            if zellen:
+                teile.append(f'<row r="{row_idx}">{"".join(zellen)}</row>')
+                letzte = row_idx
+
+        xml = f'{xml[:treffer.start()]}<sheetData>{"".join(teile)}</sheetData>{xml[treffer.end():]}'
+        xml = _DIMENSION.sub(f'<dimension ref="A1:{_spalte(breite)}{letzte}"/>', xml, count=1)
+        self._neu[part] = xml.encode("utf-8")
+        self._calc_chain_entfernen()
+
+    def set_cells(self, sheet_name, werte):
+        """
+        Setzt einzelne Zellen ({"B7": wert}); alle anderen Zellen bleiben.
+
+        Fehlende Zellen und Zeilen werden an der richtigen Stelle eingefügt.
+        Ein Wert als Zelle bringt sein Zellformat mit, sonst behält die
+        Zelle ihr bisheriges. Werte wie bei replace_rows (None leert).
+        """
+        part = self._blaetter[sheet_name]
+        xml = self._lesen(part).decode("utf-8")
+        treffer = _SHEET_DATA.search(xml)
+        if treffer is None:
+            raise NichtPatchbar(f"Blatt '{sheet_name}': <sheetData> nicht gefunden")
+
+        offen = defaultdict(dict)  # Zeile -> {Spalte: Wert}
+        for ref, wert in werte.items():
+            zell_ref = _ZELL_REF.fullmatch(ref)
+            if zell_ref is None:
+                raise ValueError(f"Ungültiger Zellbezug '{ref}'")
+            offen[int(zell_ref.group(2))][_spalten_index(zell_ref.group(1))] = wert
+        breite = max(spalte for zellen in offen.values() for spalte in zellen) if offen else 1
+        letzte = max(offen, default=1)
+
+        teile = []
+        for zeile in _ZEILE.finditer(treffer.group(1) or ""):
+            zeile = zeile.group(0)
+            nummer = _ZEILEN_NR.match(zeile)
+            if nummer is None:
+                raise NichtPatchbar(f"Blatt '{sheet_name}': Zeile ohne Nummer")
+            nummer = int(nummer.group(1))
+            for neu in sorted(r for r in offen if r < nummer):
+                teile.append(self._zeile_setzen(f'<row r="{neu}"/>', neu, offen.pop(neu)))
+            teile.append(self._zeile_setzen(zeile, nummer, offen.pop(nummer)) if nummer in offen else zeile)
+        for neu in sorted(offen):
+            teile.append(self._zeile_setzen(f'<row r="{neu}"/>', neu, offen[neu]))
+
+        xml = f'{xml[:treffer.start()]}<sheetData>{"".join(teile)}</sheetData>{xml[treffer.end():]}'
+        dimension = _DIMENSION_REF.search(xml)
+        if dimension is not None:
+            breite = max(breite, _spalten_index(dimension.group(1)))
+            letzte = max(letzte, int(dimension.group(2)))
+            xml = _DIMENSION.sub(f'<dimension ref="A1:{_spalte(breite)}{letzte}"/>', xml, count=1)
+        self._neu[part] = xml.encode("utf-8")
+
+    def _zeile_setzen(self, zeile, nummer, werte):
+        """Zeile (XML) mit den Zellen aus werte ({Spalte: Wert}), übrige Zellen bleiben."""
+        kopf_ende = zeile.index(">") + 1
+        oeffnen = re.sub(r'\sspans="[^"]*"', "", zeile[:kopf_ende]).replace("/>", ">")
+        zellen = []
+        for zelle in _ZELLE.findall(zeile):
+            ref = _REF.search(zelle[:zelle.index(">")])
+            if ref is None:
+                raise NichtPatchbar(f"Zeile {nummer}: Zelle ohne Bezug")
+            zellen.append((_spalten_index(ref.group(1)), zelle))
+
+        for spalte, wert in werte.items():
+            alt = next((i for i, (s, _) in enumerate(zellen) if s == spalte), None)
+            if isinstance(wert, Zelle):
+                wert, stil = wert
+            else:
+                stil_alt = _STIL.search(zellen[alt][1][:zellen[alt][1].index(">")]) if alt is not None else None
+                stil = int(stil_alt.group(1)) if stil_alt else 0
+            zelle = (spalte, _zelle_xml(f"{_spalte(spalte)}{nummer}", wert, stil, self._epoche))
+            if alt is not None:
+                if _FORMEL.search(zellen[alt][1]):
+                    self._calc_chain_entfernen()  # calcChain verweist auf die ersetzte Formel
+                zellen[alt] = zelle
+            else:
+                zellen.append(zelle)
+        zellen.sort(key=lambda eintrag: eintrag[0])
+        return f'{oeffnen}{"".join(zelle for _, zelle in zellen)}</row>'
+
+    def _calc_chain_entfernen(self):
+        if self._calc_chain is None or self._calc_chain in self._entfernen:
+            return
+        self._entfernen.add(self._calc_chain)
+
+        name = posixpath.basename(self._calc_chain)
+        rels = self._lesen(self._workbook_rels).decode("utf-8")
+        rels = re.sub(rf'<Relationship\b[^>]*Target="[^"]*{re.escape(name)}"[^>]*/>', "", rels)
+        self._neu[self._workbook_rels] = rels.encode("utf-8")
+
+        typen = self._lesen("[Content_Types].xml").decode("utf-8")
+        typen = re.sub(rf'<Override\b[^>]*PartName="/{re.escape(self._calc_chain)}"[^>]*/>', "", typen)
+        self._neu["[Content_Types].xml"] = typen.encode("utf-8")
+
+    # -- Schreiben -----------------------------------------------------------
+
+    def save(self, target_path=None):
+        """
+        Schreibt die Arbeitsmappe mit den ersetzten Teilen nach target_path
+        (Standard: die Eingabedatei).
+
+        Geschrieben wird in eine temporäre Datei im Zielverzeichnis, die
+        danach die Zieldatei ersetzt; bei Fehlern bleibt das Ziel unverändert.
+        """
+        ziel = Path(target_path) if target_path is not None else self.filepath
+        fd, tmp = tempfile.mkstemp(prefix=f".{ziel.name}.", suffix=".tmp", dir=ziel.parent)
+        try:
+            with open(self.filepath, "rb") as quelle, os.fdopen(fd, "wb") as aus:
+                zentral = []
+                for info in self._infos:
+                    if info.filename in self._entfernen:
+                        continue
+                    offset = aus.tell()
+                    daten = self._neu.get(info.filename)
+                    if daten is None:
+                        self._kopieren(quelle, aus, info)
+                    else:
+                        info = self._schreiben(aus, info, daten)
+                    zentral.append(self._zentral_eintrag(info, offset))
+
+                start = aus.tell()
+                for eintrag in zentral:
+                    aus.write(eintrag)
+                aus.write(_ENDE.pack(b"PK\x05\x06", 0, 0, len(zentral), len(zentral),
+                                     aus.tell() - start, start, len(self._kommentar)))
+                aus.write(self._kommentar)
+            if ziel.exists():
+                os.chmod(tmp, ziel.stat().st_mode & 0o777)
+            os.replace(tmp, ziel)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _kopieren(quelle, aus, info):
+        """Lokaler Header, komprimierte Daten und ggf. Data Descriptor unverändert übernehmen."""
+        quelle.seek(info.header_offset)
+        kopf = quelle.read(_LOKAL.size)
+        if len(kopf) != _LOKAL.size or kopf[:4] != b"PK\x03\x04":
+            raise zipfile.BadZipFile(f"Ungültiger Eintrag '{info.filename}'")
+        *_, name_laenge, extra_laenge = _LOKAL.unpack(kopf)
+        laenge = _LOKAL.size + name_laenge + extra_laenge + info.compress_size
+        if info.flag_bits & 0x08:
+            quelle.seek(info.header_offset + laenge)
+            laenge += 16 if quelle.read(4) == b"PK\x07\x08" else 12
+
+        quelle.seek(info.header_offset)
+        while laenge:
+            block = quelle.read(min(laenge, 1 << 20))
+            if not block:
+                raise zipfile.BadZipFile(f"Eintrag '{info.filename}' ist abgeschnitten")
+            aus.write(block)
+            laenge -= len(block)
+
+    @staticmethod
+    def _schreiben(aus, info, daten):
+        """Neuen Inhalt komprimiert schreiben; gibt die ZipInfo für das Verzeichnis zurück."""
+        kompressor = zlib.compressobj(KOMPRESSION, zlib.DEFLATED, -15)
+        komprimiert = kompressor.compress(daten) + kompressor.flush()
+
+        info = copy.copy(info)
+        info.date_time = time.localtime()[:6]
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.flag_bits &= 0x800
+        info.extract_version = max(info.extract_version, 20)
+        info.CRC = zlib.crc32(daten)
+        info.file_size = len(daten)
+        info.compress_size = len(komprimiert)
+        info.extra = b""
+
+        name = _name_bytes(info)
+        zeit, datum = _dos_zeit(info.date_time)
+        aus.write(_LOKAL.pack(
+            b"PK\x03\x04", info.extract_version, info.reserved, info.flag_bits, info.compress_type,
+            zeit, datum, info.CRC, info.compress_size, info.file_size, len(name), 0,
+        ))
+        aus.write(name)
+        aus.write(komprimiert)
+        return info
+
+    @staticmethod
+    def _zentral_eintrag(info, offset):
+        name = _name_bytes(info)
+        zeit, datum = _dos_zeit(info.date_time)
+        return b"".join((
+            _ZENTRAL.pack(
+                b"PK\x01\x02", info.create_version, info.create_system, info.extract_version, info.reserved,
+                info.flag_bits, info.compress_type, zeit, datum, info.CRC, info.compress_size, info.file_size,
+                len(name), len(info.extra), len(info.comment), 0, info.internal_attr, info.external_attr, offset,
+            ),
+            name,
+            info.extra,
+            info.comment,
+        ))
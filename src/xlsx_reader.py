@@ -0,0 +1,332 @@
+"""
+Blätter direkt aus dem .xlsx-Archiv lesen (ohne openpyxl)
+
+openpyxl baut auch im read-only-Modus für jede Zeile Zellobjekte auf und
+wandelt jeden Wert einzeln um. Für die Berechnung werden aber nur die
+ersten Spalten von Plan, Feiertage und Regeln gebraucht. XmlArbeitsmappe
+liest die Blatt-XML mit einem inkrementellen expat-Parser, übernimmt nur
+Zellen bis max_col und löst Shared Strings, Zahlen und Datumswerte
+(Seriennummern in Zellen mit Datumsformat, 1900- oder 1904-System) selbst
+auf.
+
+Die Schnittstelle ist die Teilmenge einer read-only-Arbeitsmappe, die
+calculate.read_plan_data braucht (sheetnames, wb[name].iter_rows(min_row,
+max_row, max_col, values_only=True), close()). Prüfung, Warnungen und
+Zeilennummern bleiben damit dieselben wie beim Lesen über openpyxl.
+
+Große Blätter (ab PARALLEL_MIN_BYTES XML) werden mit workers > 1 an
+Zeilengrenzen geteilt und in einem Prozesspool geparst – expat hält das
+GIL, Threads würden nicht parallel rechnen. Mit einem Worker wird das
+Blatt blockweise gestreamt.
+"""
+
+from datetime import datetime
+from xml.etree import ElementTree
+from xml.parsers import expat
+import os
+import re
+import zipfile
+
+from datum import from_excel
+from xlsx_patch import NS, workbook_info
+
+
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024  # kleinere Blätter lohnen den Prozessstart nicht
+BLOCK = 1024 * 1024  # Lesegröße beim Streamen
+
+# Eingebaute Zahlenformate mit Datum/Uhrzeit (ECMA-376, 18.8.30)
+DATUMSFORMATE = frozenset(range(14, 23)) | frozenset(range(45, 48))
+
+_FORMAT_LITERALE = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.|[_*].')  # Texte, Farben/Bedingungen, Füllzeichen
+_DATUM_ZEICHEN = re.compile(r"[dmyhs]", re.I)
+_PRAEFIX = re.compile(rb"<(\w+:)?worksheet\b")
+_BUCHSTABEN = re.compile(r"[A-Z]+")
+
+
+def is_date_format(format_code):
+    """Prüft ob ein benutzerdefiniertes Zahlenformat ein Datum oder eine Uhrzeit darstellt."""
+    if not format_code or format_code.lower() == "general":
+        return False
+    return bool(_DATUM_ZEICHEN.search(_FORMAT_LITERALE.sub("", format_code)))
+
+
+def _spalten_nummer(ref):
+    """'C12' -> 3."""
+    nummer = 0
+    for zeichen in _BUCHSTABEN.match(ref).group():
+        nummer = nummer * 26 + ord(zeichen) - 64
+    return nummer
+
+
+def _datums_stile(z, part):
+    """Indizes der Zellformate (cellXfs) mit Datumsformat."""
+    if part is None:
+        return frozenset()
+    root = ElementTree.fromstring(z.read(part))
+    formate = {
+        int(fmt.get("numFmtId")): fmt.get("formatCode")
+        for fmt in root.iterfind("m:numFmts/m:numFmt", NS)
+    }
+    stile = set()
+    for index, xf in enumerate(root.iterfind("m:cellXfs/m:xf", NS)):
+        num = int(xf.get("numFmtId", 0))
+        if is_date_format(formate[num]) if num in formate else num in DATUMSFORMATE:
+            stile.add(index)
+    return frozenset(stile)
+
+
+def _shared_strings(z, part):
+    """Liest sharedStrings.xml (Text je <si>, ohne Lautschrift <rPh>)."""
+    if part is None:
+        return []
+    strings = []
+    teile = []
+    zustand = {"lesen": False, "rph": False}
+
+    def start(name, attrs):
+        name = name.rpartition(":")[2]
+        if name == "si":
+            teile.clear()
+        elif name == "t" and not zustand["rph"]:
+            zustand["lesen"] = True
+        elif name == "rPh":
+            zustand["rph"] = True
+
+    def ende(name):
+        name = name.rpartition(":")[2]
+        if name == "t":
+            zustand["lesen"] = False
+        elif name == "rPh":
+            zustand["rph"] = False
+        elif name == "si":
+            strings.append("".join(teile))
+
+    def text(daten):
+        if zustand["lesen"]:
+            teile.append(daten)
+
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = start
+    parser.EndElementHandler = ende
+    parser.CharacterDataHandler = text
+    with z.open(part) as f:
+        parser.ParseFile(f)
+    return strings
+
+
+def _zeilen_parser(zeilen, max_col, praefix=""):
+    """
+    expat-Parser, der je <row> (nummer|None, [rohwert|None] * max_col) an
+    zeilen anhängt. Ein Rohwert ist (typ, stil, text) der Zelle; Zellen
+    rechts von max_col werden nicht gelesen.
+    """
+    ROW, C, V, T, RPH = (praefix + name for name in ("row", "c", "v", "t", "rPh"))
+    zeile = None
+    werte = None
+    spalte = 0
+    naechste = 1
+    aktiv = False
+    lesen = False
+    rph = False
+    typ = stil = None
+    teile = []
+
+    def start(name, attrs):
+        nonlocal zeile, werte, spalte, naechste, aktiv, lesen, rph, typ, stil
+        if name == C:
+            ref = attrs.get("r")
+            spalte = _spalten_nummer(ref) if ref else naechste
+            naechste = spalte + 1
+            aktiv = spalte <= max_col
+            if aktiv:
+                typ = attrs.get("t")
+                stil = attrs.get("s")
+                teile.clear()
+        elif aktiv:
+            if name == V or (name == T and not rph):
+                lesen = True
+            elif name == RPH:
+                rph = True
+        elif name == ROW:
+            r = attrs.get("r")
+            zeile = int(r) if r else None
+            werte = [None] * max_col
+            naechste = 1
+
+    def ende(name):
+        nonlocal aktiv, lesen, rph
+        if lesen and (name == V or name == T):
+            lesen = False
+        elif name == C:
+            if aktiv:
+                werte[spalte - 1] = (typ, stil, "".join(teile))
+                aktiv = False
+        elif name == RPH:
+            rph = False
+        elif name == ROW:
+            zeilen.append((zeile, werte))
+
+    def text(daten):
+        if lesen:
+            teile.append(daten)
+
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = start
+    parser.EndElementHandler = ende
+    parser.CharacterDataHandler = text
+    return parser
+
+
+def _parse_teil(auftrag):
+    """Parst einen Ausschnitt aus <sheetData> im Worker-Prozess."""
+    daten, max_col, praefix = auftrag
+    zeilen = []
+    parser = _zeilen_parser(zeilen, max_col, praefix)
+    parser.Parse(b"<teil>", False)
+    parser.Parse(daten, False)
+    parser.Parse(b"</teil>", True)
+    return zeilen
+
+
+def _teile(daten, praefix, anzahl):
+    """Teilt den Inhalt von <sheetData> an <row>-Grenzen in höchstens anzahl Stücke."""
+    tag = praefix.encode()
+    start = daten.find(b"<" + tag + b"sheetData")
+    ende = daten.rfind(b"</" + tag + b"sheetData>")
+    if start < 0 or ende < 0:  # <sheetData/>
+        return []
+    start = daten.index(b">", start) + 1
+    zeile = b"<" + tag + b"row"
+    schritt = max(1, (ende - start) // anzahl)
+
+    grenzen = [start]
+    while True:
+        pos = daten.find(zeile, grenzen[-1] + schritt, ende)
+        if pos < 0:
+            break
+        grenzen.append(pos)
+    grenzen.append(ende)
+    return [daten[a:b] for a, b in zip(grenzen, grenzen[1:])]
+
+
+class XmlBlatt:
+    """Ein Tabellenblatt einer XmlArbeitsmappe (nur iter_rows)."""
+
+    def __init__(self, mappe, part):
+        self._mappe = mappe
+        self._part = part
+
+    def _rohzeilen(self, max_col):
+        """(nummer|None, rohwerte) je <row> in Dateireihenfolge."""
+        z = self._mappe._zip
+        workers = self._mappe.workers
+        if workers > 1 and z.getinfo(self._part).file_size >= PARALLEL_MIN_BYTES:
+            yield from self._parallel(z.read(self._part), max_col, workers)
+            return
+
+        zeilen = []
+        with z.open(self._part) as f:
+            block = f.read(BLOCK)
+            treffer = _PRAEFIX.search(block)
+            parser = _zeilen_parser(zeilen, max_col, (treffer.group(1) or b"").decode() if treffer else "")
+            while block:
+                parser.Parse(block, False)
+                yield from zeilen
+                zeilen.clear()
+                block = f.read(BLOCK)
+            parser.Parse(b"", True)
+            yield from zeilen
+
+    def _parallel(self, daten, max_col, workers):
+        from concurrent.futures import ProcessPoolExecutor
+
+        treffer = _PRAEFIX.search(daten)
+        praefix = (treffer.group(1) or b"").decode() if treffer else ""
+        teile = _teile(daten, praefix, workers)
+        del daten
+        if len(teile) < 2:
+            for teil in teile:
+                yield from _parse_teil((teil, max_col, praefix))
+            return
+        with ProcessPoolExecutor(max_workers=min(workers, len(teile))) as pool:
+            for zeilen in pool.map(_parse_teil, ((teil, max_col, praefix) for teil in teile)):
+                yield from zeilen
+
+    def iter_rows(self, min_row=1, max_row=None, max_col=None, values_only=True):
+        """
+        Zeilen ab min_row als Tupel der Länge max_col (wie openpyxl read-only).
+
+        Fehlende Zeilen innerhalb des Bereichs werden als leere Tupel
+        (lauter None) geliefert. Nur values_only=True und ein festes max_col
+        werden unterstützt.
+        """
+        if not values_only or not max_col:
+            raise ValueError("XmlBlatt.iter_rows unterstützt nur values_only=True mit max_col")
+        wert = self._mappe._wert
+        leer = (None,) * max_col
+        zaehler = min_row
+        nummer = 0
+        for r, rohwerte in self._rohzeilen(max_col):
+            nummer = r or nummer + 1
+            if max_row is not None and nummer > max_row:
+                break
+            while zaehler < nummer:
+                zaehler += 1
+                yield leer
+            if zaehler <= nummer:
+                zaehler += 1
+                yield tuple(wert(roh) for roh in rohwerte)
+
+
+class XmlArbeitsmappe:
+    """
+    Schreibgeschützte Arbeitsmappe über der rohen Blatt-XML.
+
+    workers > 1 parst große Blätter parallel (Standard: Anzahl CPU-Kerne).
+    Strict-OOXML meldet NichtPatchbar (ValueError) wie xlsx_patch.
+    """
+
+    def __init__(self, filepath, workers=None):
+        self._zip = zipfile.ZipFile(filepath)
+        try:
+            mappe = workbook_info(self._zip)
+            self._shared = _shared_strings(self._zip, mappe.shared_strings)
+            self._datums_stile = _datums_stile(self._zip, mappe.styles)
+        except BaseException:
+            self._zip.close()
+            raise
+        self._blaetter = mappe.blaetter
+        self.epoch = datetime(mappe.epoche.year, mappe.epoche.month, mappe.epoche.day)  # wie openpyxl wb.epoch
+        self.workers = workers or os.cpu_count() or 1
+
+    @property
+    def sheetnames(self):
+        return list(self._blaetter)
+
+    def __getitem__(self, name):
+        return XmlBlatt(self, self._blaetter[name])
+
+    def close(self):
+        self._zip.close()
+
+    def _wert(self, roh):
+        """Rohwert (typ, stil, text) -> Python-Wert wie openpyxl mit data_only=True."""
+        if roh is None:
+            return None
+        typ, stil, text = roh
+        if typ == "s":
+            return self._shared[int(text)] if text else None
+        if typ in ("inlineStr", "str", "e"):
+            return text
+        if not text:
+            return None
+        if typ == "b":
+            return text == "1"
+        if typ == "d":
+            return datetime.fromisoformat(text.rstrip("Z"))
+        zahl = float(text) if "." in text or "e" in text or "E" in text else int(text)
+        if stil is not None and int(stil) in self._datums_stile:
+            return from_excel(zahl, self.epoch)
+        return zahl